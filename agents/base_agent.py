@@ -1,11 +1,12 @@
 ﻿from __future__ import annotations
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator
 import asyncio
 
 from models import AgentMessage, MessageType, InterviewSession
-from tools.llm_client import LLMClient, ChatMessage
+from tools.llm_client import ChatMessage, get_llm_client
 from utils.logging import get_logger
+from utils.metrics import get_metrics
 
 
 class BaseAgent:
@@ -14,11 +15,88 @@ class BaseAgent:
         self.role = role
         self.logger = get_logger(f"agent.{name}")
         self.state: Dict[str, Any] = {}
-        self.llm = LLMClient()
+        self.llm = get_llm_client()
 
-    async def acomplete(self, system_prompt: str, user_content: str, temperature: float = 0.2) -> str:
-        messages = [ChatMessage(role="user", content=user_content)]
-        return await self.llm.acomplete(system_prompt, messages, temperature=temperature)
+    async def acomplete(
+        self,
+        system_prompt: str,
+        user_content: str,
+        temperature: float = 0.2,
+        use_cache: bool = True,
+        prefix: Optional[str] = None,
+        route: Optional[str] = None,
+        session: Optional[InterviewSession] = None,
+        priority: Optional[int] = None,
+    ) -> str:
+        # route selects a sub-route such as "interviewer.rephrase"; it defaults to the agent's own.
+        # session and priority decide the call's place in the LLM admission queue
+        messages = self._messages(user_content, prefix)
+        self._count_call(session)
+        return await self.llm.acomplete(
+            system_prompt,
+            messages,
+            temperature=temperature,
+            use_cache=use_cache,
+            agent=route or self.name,
+            session_id=session.session_id if session else None,
+            priority=priority,
+        )
+
+    async def astream(
+        self,
+        system_prompt: str,
+        user_content: str,
+        temperature: float = 0.2,
+        use_cache: bool = True,
+        prefix: Optional[str] = None,
+        route: Optional[str] = None,
+        session: Optional[InterviewSession] = None,
+        priority: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        messages = self._messages(user_content, prefix)
+        self._count_call(session)
+        async for delta in self.llm.astream(
+            system_prompt,
+            messages,
+            temperature=temperature,
+            use_cache=use_cache,
+            agent=route or self.name,
+            session_id=session.session_id if session else None,
+            priority=priority,
+        ):
+            yield delta
+
+    @staticmethod
+    def _count_call(session: Optional[InterviewSession]) -> None:
+        # Requests made on the session's behalf, including speculative ones and cache hits
+        if session is not None:
+            session.metrics["llm_calls"] = session.metrics.get("llm_calls", 0) + 1
+
+    @staticmethod
+    def _messages(user_content: str, prefix: Optional[str]) -> List[ChatMessage]:
+        # The prefix holds what stays identical across a session's calls, so providers can reuse it from cache
+        if not prefix:
+            return [ChatMessage(role="user", content=user_content)]
+        return [ChatMessage(role="user", content=prefix, cache=True), ChatMessage(role="user", content=user_content)]
+
+    def note_fallback(self, error: Exception) -> None:
+        self.logger.info(f"Using {self.name} fallback: {error}")
+        get_metrics().inc("agent_fallbacks_total", help="Canned outputs used instead of the LLM", agent=self.name)
+
+    def note_avoided(self, reason: str) -> None:
+        # A call this agent would have made, answered locally instead (e.g. for a pre-screened answer)
+        get_metrics().inc(
+            "llm_calls_avoided_total", help="LLM calls skipped by local checks", agent=self.name, reason=reason
+        )
+
+    def note_fused(self, used: bool) -> None:
+        # used=False: fused evaluation was on but left this agent's field empty, so it made its own call
+        get_metrics().inc(
+            "fused_evaluation_total",
+            help="Hint/rephrase outputs taken from the fused evaluation",
+            agent=self.name,
+            result="used" if used else "missing",
+        )
 
     async def handle(self, message: AgentMessage, session: InterviewSession) -> Optional[AgentMessage]:
         raise NotImplementedError
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import json
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 from models import AgentMessage, MessageType, InterviewSession
 from models import Evaluation
+from tools.answer_screen import screen_answer
+from utils.config import load_config
+from utils.metrics import get_metrics
 from .base_agent import BaseAgent
 
 
@@ -14,24 +17,61 @@ EVALUATOR_SYSTEM = (
     "strengths (list), improvements (list), follow_up_question (string). "
     "If score < 8, provide a specific follow_up_question. If score >= 8, follow_up_question should be empty."
 )
+# Same contract plus the hints agent's and the rephrase call's outputs, so one round trip covers all three
+EVALUATOR_FUSED_SYSTEM = (
+    "You are a strict but fair technical interviewer. Evaluate answers concisely. "
+    "Return strict JSON with keys: score (0-10), brief_feedback (<=40 words), "
+    "strengths (list), improvements (list), follow_up_question (string), hint (string), "
+    "rephrased_question (string). "
+    "If score < 8, provide a specific follow_up_question. If score >= 8, follow_up_question should be empty. "
+    "hint is ONE short coaching hint (<=20 words) that nudges the candidate toward a stronger answer "
+    "without revealing it. If score < 4, rephrased_question restates the original question more clearly "
+    "and simply, focused on its core concept; otherwise it is empty."
+)
+FUSED_FIELDS = ("hint", "rephrased_question")
 
 
 class EvaluatorAgent(BaseAgent):
+    def __init__(self, name: str, role: str):
+        super().__init__(name, role)
+        config = load_config()
+        self.fused = config.fused_evaluation
+        self.screening = config.answer_screening
+        self.answer_token_budget = config.answer_token_budget
+
     async def handle(self, message: AgentMessage, session: InterviewSession) -> Optional[AgentMessage]:
         if message.type != MessageType.EVALUATE_RESPONSE:
             return None
 
+        question = message.metadata.get("question", "")
+        screened = screen_answer(
+            question, message.content, message.topic or "", self.answer_token_budget, checks=self.screening
+        )
+        get_metrics().inc("answer_screen_total", help="Answers by local pre-screen outcome", result=screened.result)
+        if screened.evaluation is not None:
+            self.note_avoided(screened.result)
+            # The hints agent and the rephrase step read "screened" and skip their LLM calls too
+            return self._evaluation_message(
+                message, screened.evaluation, {"screened": screened.result, "hint": screened.hint}
+            )
+
+        # A short profile lets the score reflect the candidate's seniority without resending the resume;
+        # it is the same for every answer in a session, so it goes first as a cacheable prefix
+        profile = session.resume_digest.summary(max_items=6) if session.resume_digest else ""
+        prefix = f"Target Role: {session.target_role}\nCandidate profile:\n{profile}\n" if profile else None
         user = (
-            f"Question: {message.metadata.get('question','')}\n"
-            f"Answer: {message.content}\n"
+            f"Question: {question}\n"
+            f"Answer: {screened.answer}\n"
             f"Topic: {message.topic}\n"
             "Respond in JSON only."
         )
+        extras: Dict[str, str] = {}
         try:
-            raw = await self.acomplete(EVALUATOR_SYSTEM, user)
-            evaluation = self._parse_json_or_fallback(raw)
+            system = EVALUATOR_FUSED_SYSTEM if self.fused else EVALUATOR_SYSTEM
+            raw = await self.acomplete(system, user, prefix=prefix, session=session)
+            evaluation, extras = self._parse(raw)
         except Exception as e:
-            self.logger.info(f"Using evaluator fallback: {e}")
+            self.note_fallback(e)
             evaluation = Evaluation(
                 score=6.0,
                 brief_feedback="Decent answer with room for specifics and tradeoffs.",
@@ -39,7 +79,12 @@ class EvaluatorAgent(BaseAgent):
                 improvements=["Add concrete examples", "Discuss tradeoffs"],
                 follow_up_question="What were the key tradeoffs you considered?",
             )
+        # Only present in fused mode, and only when the model filled them in
+        return self._evaluation_message(message, evaluation, extras if self.fused else {})
 
+    def _evaluation_message(
+        self, message: AgentMessage, evaluation: Evaluation, extras: Dict[str, str]
+    ) -> AgentMessage:
         return AgentMessage.create(
             sender=self.name,
             recipient=message.sender,
@@ -51,10 +96,15 @@ class EvaluatorAgent(BaseAgent):
                 "strengths": evaluation.strengths,
                 "improvements": evaluation.improvements,
                 "follow_up_question": evaluation.follow_up_question,
+                **extras,
             },
         )
 
     def _parse_json_or_fallback(self, raw: str) -> Evaluation:
+        return self._parse(raw)[0]
+
+    def _parse(self, raw: str) -> Tuple[Evaluation, Dict[str, str]]:
+        # Returns the evaluation plus any non-empty extra string fields (the fused hint/rephrase)
         try:
             # Strip code fences or trailing text if present
             text = raw.strip()
@@ -73,13 +123,14 @@ class EvaluatorAgent(BaseAgent):
             strengths = list(data.get("strengths", []))
             improvements = list(data.get("improvements", []))
             follow_up = str(data.get("follow_up_question", ""))
+            extras = {k: str(data[k]).strip() for k in FUSED_FIELDS if data.get(k) and str(data[k]).strip()}
             return Evaluation(
                 score=score,
                 brief_feedback=brief,
                 strengths=strengths,
                 improvements=improvements,
                 follow_up_question=follow_up,
-            )
+            ), extras
         except Exception:
             return Evaluation(
                 score=5.0,
@@ -87,6 +138,6 @@ class EvaluatorAgent(BaseAgent):
                 strengths=[],
                 improvements=["Provide more detail"],
                 follow_up_question="Could you give a concrete example?",
-            )
+            ), {}
 
 
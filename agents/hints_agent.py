@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
 
 from models import AgentMessage, MessageType, InterviewSession
+from utils.config import load_config
 from .base_agent import BaseAgent
 
 
@@ -10,29 +11,99 @@ HINTS_SYSTEM = (
     "You are a helpful interview coach. Based on the feedback and topic, give ONE short hint (<=20 words) "
     "that nudges the candidate toward a stronger answer. Do NOT reveal the full answer."
 )
+HINTS_FALLBACK = "Be specific: cite an example, metrics, and tradeoffs."
 
 
 class HintsAgent(BaseAgent):
+    def __init__(self, name: str, role: str):
+        super().__init__(name, role)
+        self.fused = load_config().fused_evaluation
+
     async def handle(self, message: AgentMessage, session: InterviewSession) -> Optional[AgentMessage]:
         if message.type != MessageType.EVALUATION:
             return None
-        topic = message.topic or (session.topic_plan.current().topic.name if session.topic_plan.current() else "General")
-        feedback = message.content
-        user = (
+        topic = self._topic(message, session)
+        prepared = self._prepared_hint(message)
+        if prepared:
+            return self._hint_message(message, topic, prepared)
+        try:
+            raw = await self.acomplete(
+                HINTS_SYSTEM, self._prompt(message, topic), prefix=self._prefix(session), session=session
+            )
+            hint = self._trim(raw)
+        except Exception as e:
+            self.note_fallback(e)
+            hint = HINTS_FALLBACK
+        return self._hint_message(message, topic, hint)
+
+    async def handle_stream(self, message: AgentMessage, session: InterviewSession) -> AsyncIterator[Any]:
+        # Yields hint text deltas as they arrive, then the final HINT AgentMessage
+        if message.type != MessageType.EVALUATION:
+            return
+        topic = self._topic(message, session)
+        prepared = self._prepared_hint(message)
+        if prepared:
+            yield prepared
+            yield self._hint_message(message, topic, prepared)
+            return
+        parts = []
+        try:
+            async for delta in self.astream(
+                HINTS_SYSTEM, self._prompt(message, topic), prefix=self._prefix(session), session=session
+            ):
+                parts.append(delta)
+                yield delta
+            hint = self._trim("".join(parts))
+        except Exception as e:
+            if parts:
+                hint = self._trim("".join(parts))
+            else:
+                self.note_fallback(e)
+                hint = HINTS_FALLBACK
+                yield hint
+        yield self._hint_message(message, topic, hint)
+
+    def _prepared_hint(self, message: AgentMessage) -> Optional[str]:
+        # Answers scored by the local pre-screen come with a canned hint; in fused mode the evaluator already
+        # wrote one. Only ask the LLM when neither applies
+        screened = message.metadata.get("screened")
+        if screened:
+            self.note_avoided(str(screened))
+            return self._trim(str(message.metadata.get("hint") or "")) or HINTS_FALLBACK
+        if not self.fused:
+            return None
+        hint = self._trim(str(message.metadata.get("hint") or ""))
+        self.note_fused(bool(hint))
+        return hint or None
+
+    @staticmethod
+    def _topic(message: AgentMessage, session: InterviewSession) -> str:
+        return message.topic or (session.topic_plan.current().topic.name if session.topic_plan.current() else "General")
+
+    @staticmethod
+    def _prefix(session: InterviewSession) -> Optional[str]:
+        digest = session.resume_digest
+        background = ", ".join(digest.technologies[:8]) if digest else ""
+        return f"Candidate background: {background}\n" if background else None
+
+    @staticmethod
+    def _prompt(message: AgentMessage, topic: str) -> str:
+        return (
             f"Topic: {topic}\n"
-            f"Feedback: {feedback}\n"
+            f"Feedback: {message.content}\n"
             f"Strengths: {message.metadata.get('strengths', [])}\n"
             f"Improvements: {message.metadata.get('improvements', [])}\n"
             "Return ONE hint only."
         )
-        try:
-            hint = await self.acomplete(HINTS_SYSTEM, user)
-            hint = (hint or "").strip()
-            if len(hint) > 140:
-                hint = hint[:137] + "..."
-        except Exception as e:
-            self.logger.info(f"Using hints fallback: {e}")
-            hint = "Be specific: cite an example, metrics, and tradeoffs."
+
+    @staticmethod
+    def _trim(hint: str) -> str:
+        hint = (hint or "").strip()
+        if len(hint) > 140:
+            hint = hint[:137] + "..."
+        return hint
+
+    def _hint_message(self, message: AgentMessage, topic: str, hint: str) -> AgentMessage:
         return AgentMessage.create(
             sender=self.name,
             recipient=message.sender,
@@ -40,10 +111,3 @@ class HintsAgent(BaseAgent):
             content=hint,
             topic=topic,
         )
-
-
-
-
-
-
-
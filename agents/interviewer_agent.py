@@ -1,8 +1,15 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import json
 
-from models import AgentMessage, MessageType, InterviewSession
+from models import AgentMessage, MessageType, InterviewSession, Topic, TopicProgress
+from tools.prompt_builder import PromptBuilder, keywords, split_relevant
+from tools.question_bank import count_lookup, get_question_bank, role_terms, session_turn
+from tools.rate_limit import PRIORITY_BACKGROUND
+from utils.config import load_config
+from utils.metrics import get_metrics
 from .base_agent import BaseAgent
 
 
@@ -10,65 +17,337 @@ INTERVIEWER_SYSTEM = (
     "You are a senior technical interviewer. Ask focused, concise questions (one at a time). "
     "Adapt depth based on the current topic and depth level. Prefer behavioral evidence when relevant."
 )
+PLANNER_SYSTEM = (
+    "You are a senior technical interviewer planning an interview in advance. For every topic and depth "
+    "listed, write distinct, concise questions ranked best first; deeper levels probe further into the same "
+    "topic. Prefer behavioral evidence when relevant. "
+    'Return strict JSON only, shaped like {"<topic>": {"<depth>": ["question", ...]}}.'
+)
 
 
 class InterviewerAgent(BaseAgent):
+    def __init__(self, name: str, role: str):
+        super().__init__(name, role)
+        config = load_config()
+        self.token_budget = config.token_budget(name)
+        self.fused = config.fused_evaluation
+        self.plan_per_depth = max(1, config.question_plan_per_depth)
+        self.plan_topics_per_call = max(1, config.question_plan_topics_per_call)
+        self.bank = get_question_bank()
+        self.dedup_threshold = config.question_dedup_threshold
+        self.dedup_retries = max(0, config.question_dedup_retries)
+        # Each document contributes up to half the provider minimum to the cached prefix
+        self.prefix_document_tokens = max(0, config.prompt_cache_min_tokens) // 2
+
     async def handle(self, message: AgentMessage, session: InterviewSession) -> Optional[AgentMessage]:
         if message.type != MessageType.REQUEST_QUESTION:
             return None
 
         if message.content == "rephrase":
-            original_question = message.metadata.get("question", "")
-            feedback = message.metadata.get("feedback", "")
-            user_prompt = (
-                f"The candidate is struggling with this question: '{original_question}'\n"
-                f"The feedback was: '{feedback}'\n"
-                "Rephrase the question to be clearer or simpler. Focus on the core concept."
-            )
-            rephrased = await self.acomplete(INTERVIEWER_SYSTEM, user_prompt)
-            return AgentMessage.create(
-                sender=self.name,
-                recipient=message.sender,
-                type=MessageType.QUESTION,
-                content=rephrased.strip() if rephrased else original_question,
-                topic=message.topic,
+            return await self._rephrase(message, session)
+
+        topic_prog = session.topic_plan.current()
+        topic_name = topic_prog.topic.name if topic_prog else "General"
+        prepared = self._prepared_question(session, topic_prog)
+        if prepared:
+            return self._question_message(message, topic_prog, topic_name, prepared)
+        prefix, user = self._question_prompt(session, topic_prog)
+
+        try:
+            # Fresh questions rely on sampling for variety, so never serve them from the cache
+            raw = await self.acomplete(
+                INTERVIEWER_SYSTEM, user, use_cache=False, prefix=prefix, session=session
             )
+            question = await self._replace_repeat(session, self._normalize_question(raw), prefix, user)
+        except Exception as e:
+            self.note_fallback(e)
+            question = self._fallback_question(topic_name)
+
+        return self._question_message(message, topic_prog, topic_name, question)
+
+    async def handle_stream(self, message: AgentMessage, session: InterviewSession) -> AsyncIterator[Any]:
+        # Yields question text deltas as they arrive, then the final QUESTION AgentMessage
+        if message.type != MessageType.REQUEST_QUESTION:
+            return
+
+        if message.content == "rephrase":
+            msg = await self._rephrase(message, session)
+            yield msg.content
+            yield msg
+            return
 
         topic_prog = session.topic_plan.current()
         topic_name = topic_prog.topic.name if topic_prog else "General"
-        depth = topic_prog.depth if topic_prog else 0
-        rounds = topic_prog.rounds_on_topic if topic_prog else 0
-
-        # Collect recent and explicitly avoided questions to reduce repetition
-        recent_qs = [i.question for i in session.interactions if i.topic == topic_name][-3:]
-        avoid_qs = []
-        if message.metadata and isinstance(message.metadata.get("avoid_questions"), list):
-            avoid_qs = [str(x) for x in message.metadata.get("avoid_questions")][:5]
-        prev_block = "\nPrevious questions on this topic:\n- " + "\n- ".join(recent_qs) if recent_qs else ""
+        prepared = self._prepared_question(session, topic_prog)
+        if prepared:
+            yield prepared
+            yield self._question_message(message, topic_prog, topic_name, prepared)
+            return
+        prefix, user = self._question_prompt(session, topic_prog)
 
-        user = (
-            f"Candidate: {session.candidate_name}\n"
-            f"Target Role: {session.target_role}\n"
-            f"Topic: {topic_name} (depth {depth})\n"
-            f"Resume:\n{session.resume_text}\n\n"
-            f"Job Description:\n{session.job_description_text}\n\n"
-            f"Constraints: Do NOT repeat any previous question. Ask a new angle.{prev_block}\n"
-            + ("\nAvoid these as well:\n- " + "\n- ".join(avoid_qs) if avoid_qs else "")
-            + "Produce ONE question only. Be specific, grounded in resume/JD."
+        parts = []
+        try:
+            async for delta in self.astream(
+                INTERVIEWER_SYSTEM, user, use_cache=False, prefix=prefix, session=session
+            ):
+                parts.append(delta)
+                yield delta
+            # The final message replaces the streamed text, so a repeat can still be swapped out here
+            question = await self._replace_repeat(session, self._normalize_question("".join(parts)), prefix, user)
+        except Exception as e:
+            if parts:
+                self.logger.info(f"Interviewer stream interrupted, keeping partial question: {e}")
+                question = self._normalize_question("".join(parts))
+            else:
+                self.note_fallback(e)
+                question = self._fallback_question(topic_name)
+                yield question
+
+        yield self._question_message(message, topic_prog, topic_name, question)
+
+    async def _rephrase(self, message: AgentMessage, session: InterviewSession) -> AgentMessage:
+        original_question = message.metadata.get("question", "")
+        feedback = message.metadata.get("feedback", "")
+        if self.fused:
+            # Fused evaluation may have rephrased it already; the call below is the fallback
+            fused = str(message.metadata.get("rephrased_question") or "").strip()
+            self.note_fused(bool(fused))
+            if fused:
+                return self._rephrased_message(message, fused)
+        user_prompt = (
+            f"The candidate is struggling with this question: '{original_question}'\n"
+            f"The feedback was: '{feedback}'\n"
+            "Rephrase the question to be clearer or simpler. Focus on the core concept."
+        )
+        # Rephrasing is a small edit, so it has its own route and can run on a cheaper model
+        rephrased = await self.acomplete(
+            INTERVIEWER_SYSTEM, user_prompt, route=f"{self.name}.rephrase", session=session
         )
+        return self._rephrased_message(message, rephrased.strip() if rephrased else original_question)
 
+    def _rephrased_message(self, message: AgentMessage, question: str) -> AgentMessage:
+        return AgentMessage.create(
+            sender=self.name,
+            recipient=message.sender,
+            type=MessageType.QUESTION,
+            content=question,
+            topic=message.topic,
+        )
+
+    async def speculate(self, session: InterviewSession, topic_prog: TopicProgress, depth: int) -> Optional[str]:
+        # Side-effect free generation for a predicted (topic, depth); None lets the live path retry
+        prefix, user = self._question_prompt(session, topic_prog, depth=depth)
         try:
-            question = await self.acomplete(INTERVIEWER_SYSTEM, user)
-            question = (question or "").strip()
-            if not question.endswith("?"):
-                question = question.rstrip(".") + "?"
+            # Speculative work only uses capacity live requests leave over
+            raw = await self.acomplete(
+                INTERVIEWER_SYSTEM,
+                user,
+                use_cache=False,
+                prefix=prefix,
+                session=session,
+                priority=PRIORITY_BACKGROUND,
+            )
+            return await self._replace_repeat(
+                session, self._normalize_question(raw), prefix, user, priority=PRIORITY_BACKGROUND
+            )
         except Exception as e:
-            self.logger.info(f"Using interviewer fallback: {e}")
-            base = "Tell me about a challenging project you worked on related to "
-            question = f"{base}{topic_name.lower()} and what you learned?"
+            self.logger.info(f"Speculative question failed: {e}")
+            return None
+
+    async def plan(self, session: InterviewSession) -> int:
+        # Fills session.question_pool for every (topic, depth) in the plan, a few topics per call, all calls
+        # concurrent; returns how many questions were planned. Topics whose call fails are asked live.
+        topics = [p.topic for p in session.topic_plan.progress]
+        size = self.plan_topics_per_call
+        chunks = [topics[i:i + size] for i in range(0, len(topics), size)]
+        results = await asyncio.gather(*(self._plan_chunk(session, chunk) for chunk in chunks), return_exceptions=True)
+        planned = 0
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, BaseException):
+                self.logger.info(f"Question planning failed for {', '.join(t.name for t in chunk)}: {result}")
+                continue
+            for (topic_name, depth), questions in result.items():
+                session.plan_questions(topic_name, depth, questions)
+                planned += len(questions)
+        get_metrics().inc("planned_questions_total", planned, help="Questions generated by up-front planning")
+        return planned
+
+    async def _plan_chunk(self, session: InterviewSession, topics: List[Topic]) -> Dict[Tuple[str, int], List[str]]:
+        terms = keywords(*(t.name for t in topics), *(tag for t in topics for tag in t.tags))
+        builder = PromptBuilder(agent=self.name, budget=self.token_budget, model=self.llm.model_for(self.name))
+        rest = self._add_profile(builder, session)
+        builder.add(plan_topics_block(topics))
+        excerpt_cap = self.token_budget // 4 if session.resume_digest else None
+        for label, text in rest.items():
+            builder.add_document(label, text, terms, max_tokens=excerpt_cap)
+        builder.add(
+            f"Write {self.plan_per_depth} questions for every depth of every topic above. "
+            "Each question is ONE question, specific and grounded in the resume/JD."
+        )
+        built = builder.build()
+        raw = await self.acomplete(
+            PLANNER_SYSTEM, built.text, use_cache=False, prefix=built.prefix, route=f"{self.name}.plan", session=session
+        )
+        return parse_question_plan(raw, topics, self.plan_per_depth)
+
+    def has_prepared_question(self, session: InterviewSession, topic_prog: TopicProgress, depth: int) -> bool:
+        # Whether a planned or banked question would be served for (topic, depth) without an LLM call
+        if session.has_planned_question(topic_prog.topic.name, depth):
+            return True
+        return self._banked_question(session, topic_prog, depth) is not None
+
+    def _prepared_question(self, session: InterviewSession, topic_prog: Optional[TopicProgress]) -> Optional[str]:
+        # The session's planned pool first, then the offline bank; None means generate one
+        if topic_prog is None:
+            return None
+        if session.question_pool:
+            question = session.take_planned_question(topic_prog.topic.name, topic_prog.depth, self.dedup_threshold)
+            get_metrics().inc("question_pool_total", help="Question pool lookups", result="hit" if question else "miss")
+            if question:
+                return question
+        if self.bank is None:
+            return None
+        question = self._banked_question(session, topic_prog, topic_prog.depth)
+        count_lookup(question is not None)
+        return question
+
+    def _banked_question(self, session: InterviewSession, topic_prog: TopicProgress, depth: int) -> Optional[str]:
+        if self.bank is None:
+            return None
+        topic = topic_prog.topic
+        stats = session.topic_stats.get(topic.name)
+        return self.bank.lookup(
+            topic.name,
+            topic.tags,
+            depth,
+            role_terms(session.target_role),
+            exclude=session.recent_questions(topic.name),
+            turn=session_turn(session.session_id, stats.questions if stats else 0),
+            skip=lambda question: session.similar_question(question, self.dedup_threshold) is not None,
+        )
+
+    async def _replace_repeat(
+        self, session: InterviewSession, question: str, prefix: str, user: str, priority: Optional[int] = None
+    ) -> str:
+        # Regenerates a question that near-duplicates one already asked in the session; the last attempt is
+        # kept if every retry repeats too. Only a rejected question is named in the prompt, never the history.
+        for _ in range(self.dedup_retries):
+            asked = session.similar_question(question, self.dedup_threshold)
+            if asked is None:
+                return question
+            self._count_duplicate("rejected")
+            try:
+                raw = await self.acomplete(
+                    INTERVIEWER_SYSTEM,
+                    f"{user}\nAsk about a different aspect than: {asked}",
+                    use_cache=False,
+                    prefix=prefix,
+                    session=session,
+                    priority=priority,
+                )
+            except Exception as e:
+                self.logger.info(f"Regenerating a repeated question failed: {e}")
+                break
+            question = self._normalize_question(raw)
+        if session.similar_question(question, self.dedup_threshold) is not None:
+            self._count_duplicate("kept")
+        return question
+
+    def _avoid_block(self, session: InterviewSession, topic_name: str) -> str:
+        if self.dedup_threshold > 0:
+            return ""
+        recent_qs = session.recent_questions(topic_name, limit=3)
+        avoid_qs = [q for q in session.recent_questions() if q not in recent_qs]
+        prev_block = "\nPrevious questions on this topic:\n- " + "\n- ".join(recent_qs) if recent_qs else ""
+        return (
+            f"Constraints: Do NOT repeat any previous question. Ask a new angle.{prev_block}\n"
+            + ("\nAvoid these as well:\n- " + "\n- ".join(avoid_qs) + "\n" if avoid_qs else "")
+        )
+
+    @staticmethod
+    def _count_duplicate(result: str) -> None:
+        get_metrics().inc("duplicate_questions_total", help="Generated questions repeating an asked one", result=result)
+
+    def accept_question(self, message: AgentMessage, session: InterviewSession, question: str) -> AgentMessage:
+        topic_prog = session.topic_plan.current()
+        topic_name = topic_prog.topic.name if topic_prog else "General"
+        return self._question_message(message, topic_prog, topic_name, question)
+
+    def _question_prompt(
+        self,
+        session: InterviewSession,
+        topic_prog: Optional[TopicProgress],
+        depth: Optional[int] = None,
+    ) -> Tuple[str, str]:
+        # Returns (prefix, tail): the prefix is identical for every question in a session, so it leads the
+        # prompt where provider prompt caching can reuse it; topic-dependent parts follow
+        topic_name = topic_prog.topic.name if topic_prog else "General"
+        if depth is None:
+            depth = topic_prog.depth if topic_prog else 0
 
+        # Only the resume/JD sections relevant to this topic are sent once the prompt exceeds the token budget
+        topic = topic_prog.topic if topic_prog else None
+        terms = keywords(topic_name, *(topic.tags if topic else []), topic.description if topic else "")
+        builder = PromptBuilder(agent=self.name, budget=self.token_budget, model=self.llm.model_for(self.name))
+        rest = self._add_profile(builder, session)
+        builder.add(f"Topic: {topic_name} (depth {depth})\n")
+        # With a digest in the prompt, the rest of the documents only contributes topic-relevant excerpts
+        excerpt_cap = self.token_budget // 4 if session.resume_digest else None
+        for label, text in rest.items():
+            builder.add_document(label, text, terms, max_tokens=excerpt_cap)
+        # With dedup on, repeats are caught locally against every asked question (_replace_repeat); otherwise
+        # the recent questions are listed so the model can avoid them
+        avoid = self._avoid_block(session, topic_name)
+        builder.add(f"{avoid}Produce ONE question only. Be specific, grounded in resume/JD.")
+        built = builder.build()
+        return built.prefix, built.text
+
+    def _add_profile(self, builder: PromptBuilder, session: InterviewSession) -> Dict[str, str]:
+        # Shared by question and planning prompts, so both reuse the same cached prefix. Returns the parts of
+        # the resume and JD left out of the prefix, for the caller's topic-relevant excerpts.
+        builder.add(f"Candidate: {session.candidate_name}\nTarget Role: {session.target_role}\n", cacheable=True)
+        if session.resume_digest:
+            builder.add(f"Candidate profile:\n{session.resume_digest.summary()}\n\n", cacheable=True)
+        if session.jd_digest:
+            builder.add(f"Role requirements:\n{session.jd_digest.summary()}\n\n", cacheable=True)
+        documents = {"Resume": session.resume_text or "", "Job Description": session.job_description_text or ""}
+        if not self.prefix_document_tokens:
+            return documents
+        # The digests alone are far below the provider caching minimum, so role-relevant (never topic-relevant)
+        # sections of the documents go in the prefix too; they are the same for every call in the session
+        terms = keywords(session.target_role, session.jd_digest.summary() if session.jd_digest else "")
+        rest: Dict[str, str] = {}
+        for label, text in documents.items():
+            kept, remainder = split_relevant(
+                text, terms, self.prefix_document_tokens, builder.model, fill=True
+            )
+            if kept:
+                builder.add(f"{label}:\n{kept}\n\n", cacheable=True)
+            if remainder:
+                rest[f"{label} (more)" if kept else label] = remainder
+        return rest
+
+    @staticmethod
+    def _normalize_question(raw: str) -> str:
+        question = (raw or "").strip()
+        if not question.endswith("?"):
+            question = question.rstrip(".") + "?"
+        return question
+
+    @staticmethod
+    def _fallback_question(topic_name: str) -> str:
+        base = "Tell me about a challenging project you worked on related to "
+        return f"{base}{topic_name.lower()} and what you learned?"
+
+    def _question_message(
+        self,
+        message: AgentMessage,
+        topic_prog: Optional[TopicProgress],
+        topic_name: str,
+        question: str,
+    ) -> AgentMessage:
         if topic_prog:
-            topic_prog.rounds_on_topic = rounds + 1
+            topic_prog.rounds_on_topic += 1
 
         return AgentMessage.create(
             sender=self.name,
@@ -79,3 +358,36 @@ class InterviewerAgent(BaseAgent):
         )
 
 
+def plan_topics_block(topics: List[Topic]) -> str:
+    lines = [f"- {t.name} (depths 0-{t.max_depth}): {t.description}" for t in topics]
+    return "Topics:\n" + "\n".join(lines) + "\n"
+
+
+def parse_question_plan(raw: str, topics: List[Topic], per_depth: int) -> Dict[Tuple[str, int], List[str]]:
+    # {"<topic>": {"<depth>": [questions]}} -> {(topic, depth): questions}; unknown topics and depths are dropped
+    text = (raw or "").strip()
+    start, end = text.find("{"), text.rfind("}")
+    data = json.loads(text[start:end + 1] if start != -1 and end != -1 else text)
+    by_name = {str(k).strip().lower(): v for k, v in data.items()} if isinstance(data, dict) else {}
+    plan: Dict[Tuple[str, int], List[str]] = {}
+    for topic in topics:
+        depths = by_name.get(topic.name.lower())
+        if not isinstance(depths, dict):
+            continue
+        for key, questions in depths.items():
+            try:
+                depth = int(key)
+            except (TypeError, ValueError):
+                continue
+            if not 0 <= depth <= topic.max_depth or not isinstance(questions, list):
+                continue
+            unique: List[str] = []
+            for q in questions:
+                question = InterviewerAgent._normalize_question(str(q))
+                if len(question) > 1 and question not in unique:
+                    unique.append(question)
+            if unique:
+                plan[(topic.name, depth)] = unique[:per_depth]
+    if not plan:
+        raise ValueError("no usable questions in plan")
+    return plan
@@ -1,31 +1,76 @@
 from __future__ import annotations
 
 import asyncio
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
 
-from models import AgentMessage, MessageType, InterviewSession, Topic, Evaluation
+from models import AgentMessage, MessageType, InterviewSession, Interaction, Topic, Evaluation
+from utils.config import AppConfig
 from utils.logging import get_logger
+from utils.metrics import get_metrics
 from utils.telemetry import Telemetry
+from tools.llm_client import record_llm_stats
 from .interviewer_agent import InterviewerAgent
 from .topic_manager_agent import TopicManagerAgent
 from .evaluator_agent import EvaluatorAgent
 from .hints_agent import HintsAgent
+from .registry import AgentRegistry, get_agent_registry
+from .round_pipeline import RoundPipeline
+
+
+@dataclass
+class AnswerOutcome:
+    evaluation: Optional[AgentMessage]
+    hint: Optional[AgentMessage] = None
+    topic_update: Optional[AgentMessage] = None
 
 
 class OrchestratorAgent:
-    def __init__(self):
-        self.logger = get_logger("agent.orchestrator")
+    # Thin per-session context: shared agents come from the registry, only telemetry is per instance
+    __slots__ = ("registry", "telemetry", "planning")
+    logger = get_logger("agent.orchestrator")
+
+    def __init__(self, registry: Optional[AgentRegistry] = None):
+        self.registry = registry or get_agent_registry()
         self.telemetry = Telemetry()
-        self.interviewer = InterviewerAgent("interviewer", "Generates contextual interview questions")
-        self.topic_manager = TopicManagerAgent("topic_manager", "Controls topic flow and depth")
-        self.evaluator = EvaluatorAgent("evaluator", "Evaluates responses and provides feedback")
-        self.hints = HintsAgent("hints", "Provides a short hint before follow-ups")
+        self.planning: Optional[asyncio.Future] = None
+
+    @property
+    def config(self) -> AppConfig:
+        return self.registry.config
+
+    @property
+    def interviewer(self) -> InterviewerAgent:
+        return self.registry.interviewer
+
+    @property
+    def topic_manager(self) -> TopicManagerAgent:
+        return self.registry.topic_manager
+
+    @property
+    def evaluator(self) -> EvaluatorAgent:
+        return self.registry.evaluator
 
-    async def start_session(self, session: InterviewSession) -> None:
+    @property
+    def hints(self) -> HintsAgent:
+        return self.registry.hints
+
+    async def start_session(self, session: InterviewSession, wait_for_plan: bool = True) -> None:
         self.logger.info(
             f"Starting session {session.session_id} for {session.candidate_name} targeting {session.target_role}"
         )
         self.telemetry.incr("sessions_started")
+        get_metrics().inc("sessions_started_total", help="Interview sessions started")
+        if self.config.question_planning:
+            if wait_for_plan:
+                await self._plan(session)
+            else:
+                # Questions asked before the plan lands are generated live
+                self.planning = asyncio.ensure_future(self._plan(session))
+
+    async def _plan(self, session: InterviewSession) -> None:
+        with self.telemetry.timer("question_plan_ms"):
+            await self.interviewer.plan(session)
 
     async def run_round(
         self,
@@ -39,16 +84,12 @@ class OrchestratorAgent:
         current = session.topic_plan.current()
         topic_name = current.topic.name
 
-        # Suggest avoiding the last few questions (any topic) to improve variety
-        avoid_questions = [i.question for i in session.interactions][-5:]
-
         req = AgentMessage.create(
             sender="orchestrator",
             recipient="interviewer",
             type=MessageType.REQUEST_QUESTION,
             content="next",
             topic=topic_name,
-            metadata={"avoid_questions": avoid_questions} if avoid_questions else {},
         )
         with self.telemetry.timer("question_gen_ms"):
             q_msg = await self.interviewer.handle(req, session)
@@ -89,71 +130,22 @@ class OrchestratorAgent:
                 if verbose:
                     print(f"-- Switching to topic: {new_current.topic.name} --")
             return True
-        interaction = session.record_interaction(topic_name, question, answer)
+        interaction = session.record_interaction(topic_name, question, answer, depth=current.depth)
         interaction.answered_at = asyncio.get_event_loop().time()
 
-        # Evaluate or handle empty answer with a manual low score
-        if not answer.strip():
-            e_msg = AgentMessage.create(
-                sender="evaluator",
-                recipient="orchestrator",
-                type=MessageType.EVALUATION,
-                content="No answer provided.",
-                topic=topic_name,
-                metadata={
-                    "score": 1.0,
-                    "strengths": [],
-                    "improvements": ["Provide a specific, detailed answer"],
-                    "follow_up_question": "Could you share a concrete example, including metrics and tradeoffs?",
-                },
-            )
-            eval_req = None  # type: ignore[assignment]
-        else:
-            eval_req = AgentMessage.create(
-                sender="orchestrator",
-                recipient="evaluator",
-                type=MessageType.EVALUATE_RESPONSE,
-                content=answer,
-                topic=topic_name,
-                metadata={"question": question},
-            )
-            with self.telemetry.timer("evaluation_ms"):
-                e_msg = await self.evaluator.handle(eval_req, session)
+        # Evaluation first; hint, low-score rephrase and (in scripted mode) the topic decision run concurrently
+        decide_topic = pre_supplied_answer is not None
+        outcome = await self.process_answer(session, interaction, decide_topic=decide_topic)
+        e_msg = outcome.evaluation
         if e_msg:
             score = float(e_msg.metadata.get("score", 0))
             if verbose:
                 print(f"Feedback: {e_msg.content} (score: {score:.1f}/10)")
-            follow = e_msg.metadata.get("follow_up_question", "")
-            if follow and verbose:
-                print(f"Follow-up: {follow}")
-            interaction.evaluation = Evaluation(
-                score=score,
-                brief_feedback=e_msg.content,
-                strengths=list(e_msg.metadata.get("strengths", [])),
-                improvements=list(e_msg.metadata.get("improvements", [])),
-                follow_up_question=str(e_msg.metadata.get("follow_up_question", "")),
-            )
-            # Ask HintsAgent for a nudge before follow-up
-            try:
-                hint_msg = await self.hints.handle(e_msg, session)
-                if hint_msg and verbose and hint_msg.content:
-                    print(f"Hint: {hint_msg.content}")
-            except Exception:
-                pass
-
-            # If score is low, consider rephrasing instead of just following up
-            if score < 4.0:
-                rephrase_req = AgentMessage.create(
-                    sender="orchestrator",
-                    recipient="interviewer",
-                    type=MessageType.REQUEST_QUESTION,
-                    content="rephrase",
-                    topic=topic_name,
-                    metadata={"question": question, "feedback": e_msg.content},
-                )
-                rephrased_msg = await self.interviewer.handle(rephrase_req, session)
-                if rephrased_msg:
-                    e_msg.metadata["follow_up_question"] = rephrased_msg.content
+                if outcome.hint and outcome.hint.content:
+                    print(f"Hint: {outcome.hint.content}")
+                follow = e_msg.metadata.get("follow_up_question", "")
+                if follow:
+                    print(f"Follow-up: {follow}")
 
         # If there is a follow-up question, handle it immediately in the same round (interactive mode only)
         final_eval_msg = e_msg
@@ -204,7 +196,7 @@ class OrchestratorAgent:
                         },
                     )
                 else:
-                    fu_interaction = session.record_interaction(topic_name, fu_prompt, fu_answer)
+                    fu_interaction = session.record_interaction(topic_name, fu_prompt, fu_answer, depth=current.depth)
                     fu_interaction.answered_at = asyncio.get_event_loop().time()
                     fu_eval_req = AgentMessage.create(
                         sender="orchestrator",
@@ -227,7 +219,10 @@ class OrchestratorAgent:
                     if fu_score >= 8 or not fu_eval_msg.metadata.get("follow_up_question") or follow_ups_done >= 3:
                         break
 
-        topic_update = await self.topic_manager.handle(final_eval_msg or eval_req, session)
+        if decide_topic:
+            topic_update = outcome.topic_update
+        else:
+            topic_update = await self.topic_manager.handle(final_eval_msg, session) if final_eval_msg else None
         if topic_update and topic_update.content == "next":
             new_current = session.topic_plan.current()
             if new_current is None:
@@ -238,7 +233,88 @@ class OrchestratorAgent:
             if verbose:
                 print("-- Going deeper on the same topic --")
         self.telemetry.incr("rounds_completed")
+        get_metrics().inc("rounds_completed_total", help="Interview rounds completed")
+        record_llm_stats(self.telemetry)
 
         return True
 
+    async def process_answer(
+        self,
+        session: InterviewSession,
+        interaction: Interaction,
+        decide_topic: bool = True,
+        include_hint: bool = True,
+    ) -> AnswerOutcome:
+        topic_name = interaction.topic
+        question = interaction.question
+        answer = interaction.answer
+        pipeline = RoundPipeline(self.telemetry)
+
+        async def evaluate(_: Dict[str, Any]) -> Optional[AgentMessage]:
+            # Empty and garbage answers are scored by the evaluator's local pre-screen without an LLM call
+            eval_req = AgentMessage.create(
+                sender="orchestrator",
+                recipient="evaluator",
+                type=MessageType.EVALUATE_RESPONSE,
+                content=answer,
+                topic=topic_name,
+                metadata={"question": question},
+            )
+            with self.telemetry.timer("evaluation_ms"):
+                e_msg = await self.evaluator.handle(eval_req, session)
+            if e_msg:
+                session.attach_evaluation(interaction, Evaluation(
+                    score=float(e_msg.metadata.get("score", 0)),
+                    brief_feedback=e_msg.content,
+                    strengths=list(e_msg.metadata.get("strengths", [])),
+                    improvements=list(e_msg.metadata.get("improvements", [])),
+                    follow_up_question=str(e_msg.metadata.get("follow_up_question", "")),
+                ))
+            return e_msg
+
+        async def hint(deps: Dict[str, Any]) -> Optional[AgentMessage]:
+            e_msg = deps["evaluate"]
+            return await self.hints.handle(e_msg, session) if e_msg else None
+
+        async def rephrase(deps: Dict[str, Any]) -> Optional[AgentMessage]:
+            # If score is low, consider rephrasing instead of just following up
+            e_msg = deps["evaluate"]
+            if not e_msg or float(e_msg.metadata.get("score", 0)) >= 4.0:
+                return None
+            if e_msg.metadata.get("screened"):
+                # The question was not the problem with a trivial or garbage answer; keep the canned follow-up
+                self.interviewer.note_avoided(str(e_msg.metadata["screened"]))
+                return None
+            rephrase_req = AgentMessage.create(
+                sender="orchestrator",
+                recipient="interviewer",
+                type=MessageType.REQUEST_QUESTION,
+                content="rephrase",
+                topic=topic_name,
+                metadata={
+                    "question": question,
+                    "feedback": e_msg.content,
+                    "rephrased_question": e_msg.metadata.get("rephrased_question", ""),
+                },
+            )
+            return await self.interviewer.handle(rephrase_req, session)
+
+        async def decide(deps: Dict[str, Any]) -> Optional[AgentMessage]:
+            e_msg = deps["evaluate"]
+            return await self.topic_manager.handle(e_msg, session) if e_msg else None
+
+        pipeline.add("evaluate", evaluate)
+        if include_hint:
+            pipeline.add("hint", hint, deps=("evaluate",), timeout=self.config.hint_timeout_seconds)
+        pipeline.add("rephrase", rephrase, deps=("evaluate",), timeout=self.config.rephrase_timeout_seconds)
+        if decide_topic:
+            pipeline.add("topic", decide, deps=("evaluate",))
+        results = await pipeline.run()
+
+        e_msg = results.get("evaluate")
+        rephrased_msg = results.get("rephrase")
+        if e_msg and rephrased_msg and rephrased_msg.content:
+            e_msg.metadata["follow_up_question"] = rephrased_msg.content
+        return AnswerOutcome(evaluation=e_msg, hint=results.get("hint"), topic_update=results.get("topic"))
+
 
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+from utils.config import AppConfig, load_config
+from .base_agent import BaseAgent
+from .interviewer_agent import InterviewerAgent
+from .topic_manager_agent import TopicManagerAgent
+from .evaluator_agent import EvaluatorAgent
+from .hints_agent import HintsAgent
+
+
+class AgentRegistry:
+    # Agents keep all per-interview state on InterviewSession, so one instance of each serves every session
+    def __init__(self, config: Optional[AppConfig] = None):
+        self.config = config or load_config()
+        self.interviewer = InterviewerAgent("interviewer", "Generates contextual interview questions")
+        self.topic_manager = TopicManagerAgent("topic_manager", "Controls topic flow and depth")
+        self.evaluator = EvaluatorAgent("evaluator", "Evaluates responses and provides feedback")
+        self.hints = HintsAgent("hints", "Provides a short hint before follow-ups")
+
+    def agents(self) -> List[BaseAgent]:
+        return [self.interviewer, self.topic_manager, self.evaluator, self.hints]
+
+
+_shared_registry: Optional[AgentRegistry] = None
+
+
+def get_agent_registry() -> AgentRegistry:
+    global _shared_registry
+    if _shared_registry is None:
+        _shared_registry = AgentRegistry()
+    return _shared_registry
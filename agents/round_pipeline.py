@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import time
+
+from utils.logging import get_logger
+from utils.metrics import get_metrics
+from utils.telemetry import Telemetry
+
+
+StepFn = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+@dataclass
+class PipelineStep:
+    name: str
+    run: StepFn
+    deps: Tuple[str, ...] = ()
+    timeout: Optional[float] = None
+
+
+class RoundPipeline:
+    # Runs each step as soon as its dependencies finish; a failed or timed-out step yields None
+    def __init__(self, telemetry: Telemetry, name: str = "round"):
+        self.telemetry = telemetry
+        self.name = name
+        self.logger = get_logger(f"pipeline.{name}")
+        self.steps: List[PipelineStep] = []
+
+    def add(self, name: str, run: StepFn, deps: Tuple[str, ...] = (), timeout: Optional[float] = None) -> None:
+        known = {s.name for s in self.steps}
+        missing = [d for d in deps if d not in known]
+        if missing:
+            raise ValueError(f"step {name} depends on unknown steps: {missing}")
+        self.steps.append(PipelineStep(name=name, run=run, deps=tuple(deps), timeout=timeout))
+
+    async def run(self) -> Dict[str, Any]:
+        tasks: Dict[str, asyncio.Future] = {}
+        step_ms: Dict[str, float] = {}
+        metrics = get_metrics()
+
+        async def run_step(step: PipelineStep) -> Any:
+            inputs = {d: await tasks[d] for d in step.deps}
+            start = time.perf_counter()
+            outcome = "ok"
+            try:
+                if step.timeout is not None:
+                    return await asyncio.wait_for(step.run(inputs), timeout=step.timeout)
+                return await step.run(inputs)
+            except asyncio.TimeoutError:
+                self.logger.info(f"Step {step.name} timed out after {step.timeout}s")
+                self.telemetry.incr(f"{self.name}_step_timeouts.{step.name}")
+                outcome = "timeout"
+                return None
+            except Exception as e:
+                self.logger.info(f"Step {step.name} failed: {e}")
+                self.telemetry.incr(f"{self.name}_step_failures.{step.name}")
+                outcome = "error"
+                return None
+            finally:
+                elapsed = (time.perf_counter() - start) * 1000.0
+                step_ms[step.name] = elapsed
+                self.telemetry.observe_ms(f"{self.name}_step.{step.name}_ms", elapsed)
+                metrics.observe(
+                    "pipeline_step_duration_seconds",
+                    elapsed / 1000.0,
+                    help="Pipeline step latency",
+                    pipeline=self.name,
+                    step=step.name,
+                )
+                metrics.inc(
+                    "pipeline_steps_total",
+                    help="Pipeline steps by outcome",
+                    pipeline=self.name,
+                    step=step.name,
+                    outcome=outcome,
+                )
+
+        start = time.perf_counter()
+        for step in self.steps:
+            tasks[step.name] = asyncio.ensure_future(run_step(step))
+        values = await asyncio.gather(*tasks.values())
+        critical_ms = (time.perf_counter() - start) * 1000.0
+        self.telemetry.observe_ms(f"{self.name}_critical_path_ms", critical_ms)
+        metrics.observe(
+            "pipeline_duration_seconds", critical_ms / 1000.0, help="End-to-end pipeline latency", pipeline=self.name
+        )
+        self.telemetry.observe_ms(f"{self.name}_steps_sum_ms", sum(step_ms.values()))
+        return dict(zip(tasks.keys(), values))
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+import asyncio
+
+from models import InterviewSession
+from utils.logging import get_logger
+from utils.metrics import get_metrics
+from utils.telemetry import Telemetry
+from .interviewer_agent import InterviewerAgent
+from .topic_manager_agent import TopicManagerAgent
+
+
+@dataclass
+class SpeculativeQuestion:
+    topic_index: int
+    depth: int
+    # Number of recorded interactions the prompt was built from; anything recorded since makes it stale
+    basis: int
+    task: asyncio.Task
+
+
+class QuestionSpeculator:
+    # Pre-generates the next question for every branch the topic manager can take after an answer
+    logger = get_logger("agent.speculation")
+
+    def __init__(self, interviewer: InterviewerAgent, telemetry: Telemetry):
+        self.interviewer = interviewer
+        self.telemetry = telemetry
+        self._pending: Dict[Tuple[int, int], SpeculativeQuestion] = {}
+
+    def launch(self, session: InterviewSession) -> None:
+        self.discard()
+        basis = len(session.interactions)
+        for topic_index, depth in TopicManagerAgent.predict_next_states(session):
+            topic_prog = session.topic_plan.progress[topic_index]
+            if self.interviewer.has_prepared_question(session, topic_prog, depth):
+                # The interviewer will serve this one from the planned pool or the question bank
+                continue
+            task = asyncio.ensure_future(self.interviewer.speculate(session, topic_prog, depth))
+            self._pending[(topic_index, depth)] = SpeculativeQuestion(topic_index, depth, basis, task)
+            self._count("launched")
+
+    def prune(self, session: InterviewSession) -> None:
+        # Once the topic decision is known, drop branches that can no longer be served
+        key = self._state(session)
+        for other in [k for k in self._pending if k != key]:
+            self._drop(other)
+
+    async def take(self, session: InterviewSession) -> Optional[str]:
+        spec = self._pending.pop(self._state(session), None)
+        self.discard()
+        cur = session.topic_plan.current()
+        if spec is None and cur is not None and self.interviewer.has_prepared_question(session, cur, cur.depth):
+            return None
+        if spec is None or spec.basis != len(session.interactions):
+            if spec is not None:
+                spec.task.cancel()
+                self._count("discarded")
+            self._count("misses")
+            return None
+        try:
+            question = await spec.task
+        except Exception as e:
+            self.logger.info(f"Speculative question unavailable: {e}")
+            question = None
+        self._count("hits" if question else "misses")
+        return question
+
+    def discard(self) -> None:
+        for key in list(self._pending):
+            self._drop(key)
+
+    def hit_rate(self) -> float:
+        hits = self.telemetry.counters.get("speculation_hits", 0)
+        total = hits + self.telemetry.counters.get("speculation_misses", 0)
+        return (hits / total) if total else 0.0
+
+    def _count(self, result: str) -> None:
+        self.telemetry.incr(f"speculation_{result}")
+        get_metrics().inc("speculation_total", help="Speculative questions by result", result=result)
+
+    def _drop(self, key: Tuple[int, int]) -> None:
+        spec = self._pending.pop(key, None)
+        if spec is not None:
+            spec.task.cancel()
+            self._count("discarded")
+
+    @staticmethod
+    def _state(session: InterviewSession) -> Tuple[int, int]:
+        cur = session.topic_plan.current()
+        return (session.topic_plan.current_index, cur.depth if cur else 0)
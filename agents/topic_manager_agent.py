@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import List, Optional, Tuple
 
 from models import AgentMessage, MessageType, InterviewSession
 from models import TopicProgress
@@ -30,13 +30,13 @@ class TopicManagerAgent(BaseAgent):
                 current.depth += 1
                 action = "deepen"
             elif current.rounds_on_topic >= 2:
-                current.completed = True
+                plan.complete(current)
                 plan.next_topic()
                 action = "next"
         else:
             # External control can force next
             if message.metadata.get("command") == "next":
-                current.completed = True
+                plan.complete(current)
                 plan.next_topic()
                 action = "next"
 
@@ -50,4 +50,20 @@ class TopicManagerAgent(BaseAgent):
             topic=topic_name,
         )
 
-
+    @staticmethod
+    def predict_next_states(session: InterviewSession) -> List[Tuple[int, int]]:
+        # (topic_index, depth) pairs reachable after the next evaluation, mirroring the decision rule above
+        plan = session.topic_plan
+        current = plan.current()
+        if current is None:
+            return []
+        states: List[Tuple[int, int]] = []
+        if current.depth < current.topic.max_depth:
+            states.append((plan.current_index, current.depth + 1))
+        if current.rounds_on_topic >= 2:
+            nxt = plan.current_index + 1
+            if nxt < len(plan.progress):
+                states.append((nxt, plan.progress[nxt].depth))
+        else:
+            states.append((plan.current_index, current.depth))
+        return states
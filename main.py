@@ -9,6 +9,7 @@ from agents.orchestrator_agent import OrchestratorAgent
 from parsers import parse_resume, parse_job_description, load_topics
 from dotenv import load_dotenv, find_dotenv
 from tools.export import save_session_json
+from tools.llm_client import record_llm_stats
 
 load_dotenv(find_dotenv(), override=False)
 
@@ -55,19 +56,24 @@ async def run_cli() -> None:
 
     session.finalize()
     print("\nSession complete. Summary:")
-    scores = [i.evaluation.score for i in session.interactions if i.evaluation]
-    if scores:
-        avg = sum(scores) / len(scores)
-        print(f"Average score: {avg:.2f}/10 across {len(scores)} questions")
+    if session.scored:
+        print(f"Average score: {session.average_score:.2f}/10 across {session.scored} questions")
     else:
         print("No evaluations recorded.")
     # Display telemetry from orchestrator instance
     if orch.telemetry.timings_ms:
         print("\nTiming (aggregate):")
-        for name, total in orch.telemetry.timings_ms.items():
-            count = orch.telemetry.counters.get(f"{name}:count", 0)
-            avg_ms = (total / count) if count else 0.0
-            print(f"- {name}: {total:.0f} ms over {count} ops (~{avg_ms:.0f} ms/op)")
+        for name, stats in orch.telemetry.summary().items():
+            print(
+                f"- {name}: {stats['total_ms']:.0f} ms over {stats['count']:.0f} ops "
+                f"(~{stats['avg_ms']:.0f} ms/op, p50 {stats['p50_ms']:.0f}, p99 {stats['p99_ms']:.0f})"
+            )
+    record_llm_stats(orch.telemetry)
+    if orch.telemetry.gauges:
+        print("\nLLM pool/cache:")
+        for name, value in sorted(orch.telemetry.gauges.items()):
+            # Ratios are 0-1; everything else is a count
+            print(f"- {name}: {value:.3f}" if "ratio" in name else f"- {name}: {value:.0f}")
     # Save transcript for review
     try:
         save_session_json(session, "session_transcript.json")
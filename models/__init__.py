@@ -1,7 +1,7 @@
 from .messages import AgentMessage, MessageType
 from .topic import Topic, TopicPlan, TopicProgress
 from .evaluation import Evaluation
-from .session import InterviewSession, Interaction
+from .session import InterviewSession, Interaction, TopicStats
 
 __all__ = [
     "AgentMessage",
@@ -12,6 +12,7 @@ __all__ = [
     "Evaluation",
     "InterviewSession",
     "Interaction",
+    "TopicStats",
 ]
 
 
@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+from collections import deque
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, Deque, List, Dict, Optional, Tuple
 import time
 import uuid
 
+from utils.similarity import DEFAULT_THRESHOLD, SimilarityIndex
 from .topic import Topic, TopicPlan
 from .evaluation import Evaluation
 
+if TYPE_CHECKING:
+    from parsers.digest import DocumentDigest
+
+# Questions remembered per topic (and across topics) for summaries and question bank rotation
+RECENT_QUESTIONS = 5
+
 
 @dataclass
 class Interaction:
@@ -17,6 +25,21 @@ class Interaction:
     evaluation: Optional[Evaluation] = None
     asked_at: float = field(default_factory=time.time)
     answered_at: Optional[float] = None
+    depth: int = 0
+
+
+@dataclass
+class TopicStats:
+    questions: int = 0
+    scored: int = 0
+    score_sum: float = 0.0
+    best: Optional[float] = None
+    worst: Optional[float] = None
+    recent: Deque[str] = field(default_factory=lambda: deque(maxlen=RECENT_QUESTIONS))
+
+    @property
+    def average(self) -> float:
+        return self.score_sum / self.scored if self.scored else 0.0
 
 
 @dataclass
@@ -31,6 +54,24 @@ class InterviewSession:
     started_at: float = field(default_factory=time.time)
     ended_at: Optional[float] = None
     metrics: Dict[str, float] = field(default_factory=dict)
+    # Structured summaries of the documents, shared with every session that uploaded the same text
+    resume_digest: Optional["DocumentDigest"] = None
+    jd_digest: Optional["DocumentDigest"] = None
+    # Questions planned up front, best first, per (topic, depth); drawn before asking the LLM for a new one
+    question_pool: Dict[Tuple[str, int], List[str]] = field(default_factory=dict)
+    # Running aggregates so summaries and prompts do not rescan every interaction; derived, never stored
+    scored: int = field(default=0, init=False)
+    score_sum: float = field(default=0.0, init=False)
+    topic_stats: Dict[str, TopicStats] = field(default_factory=dict, init=False, repr=False)
+    _recent: Deque[str] = field(default_factory=lambda: deque(maxlen=RECENT_QUESTIONS), init=False, repr=False)
+    # Every question asked, for rejecting near-duplicates of any of them without listing them in prompts.
+    # Filled lazily, so sessions restored from a store only pay for it when a question is checked
+    asked: SimilarityIndex = field(default_factory=SimilarityIndex, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # Sessions restored from a store arrive with their interactions already filled in
+        if self.interactions:
+            self.rebuild_aggregates()
 
     @staticmethod
     def new(
@@ -40,6 +81,9 @@ class InterviewSession:
         job_description_text: str,
         topics: List[Topic],
     ) -> "InterviewSession":
+        # parsers imports models, so resolve the digest builder lazily
+        from parsers.digest import build_digest
+
         return InterviewSession(
             session_id=uuid.uuid4().hex,
             candidate_name=candidate_name,
@@ -47,13 +91,96 @@ class InterviewSession:
             resume_text=resume_text,
             job_description_text=job_description_text,
             topic_plan=TopicPlan(topics=topics),
+            resume_digest=build_digest(resume_text, "resume"),
+            jd_digest=build_digest(job_description_text, "jd"),
         )
 
-    def record_interaction(self, topic: str, question: str, answer: str) -> Interaction:
-        interaction = Interaction(topic=topic, question=question, answer=answer)
+    def record_interaction(self, topic: str, question: str, answer: str, depth: int = 0) -> Interaction:
+        interaction = Interaction(topic=topic, question=question, answer=answer, depth=depth)
         self.interactions.append(interaction)
+        self._count_question(interaction)
         return interaction
 
+    def attach_evaluation(self, interaction: Interaction, evaluation: Evaluation) -> None:
+        # Replacing an earlier evaluation swaps its score out of the sums; best/worst keep the old extremes
+        stats = self._stats(interaction.topic)
+        if interaction.evaluation is not None:
+            self.scored -= 1
+            self.score_sum -= interaction.evaluation.score
+            stats.scored -= 1
+            stats.score_sum -= interaction.evaluation.score
+        interaction.evaluation = evaluation
+        self._count_score(stats, evaluation.score)
+
+    def plan_questions(self, topic: str, depth: int, questions: List[str]) -> None:
+        self.question_pool.setdefault((topic, depth), []).extend(questions)
+
+    def has_planned_question(self, topic: str, depth: int) -> bool:
+        return bool(self.question_pool.get((topic, depth)))
+
+    def take_planned_question(self, topic: str, depth: int, threshold: float = DEFAULT_THRESHOLD) -> Optional[str]:
+        pool = self.question_pool.get((topic, depth))
+        # Without similarity checks, only exact repeats of the topic's recent questions are skipped
+        recent = set(self.recent_questions(topic)) if threshold <= 0 else set()
+        while pool:
+            question = pool.pop(0)
+            if question not in recent and self.similar_question(question, threshold) is None:
+                return question
+        return None
+
+    def similar_question(self, question: str, threshold: float = DEFAULT_THRESHOLD) -> Optional[str]:
+        # An already asked question the given one near-duplicates, if any; a threshold of 0 disables the check
+        if threshold <= 0:
+            return None
+        for interaction in self.interactions[len(self.asked):]:
+            self.asked.add(interaction.question)
+        match = self.asked.match(question, threshold)
+        return match[0] if match else None
+
+    @property
+    def average_score(self) -> float:
+        return self.score_sum / self.scored if self.scored else 0.0
+
+    def recent_questions(self, topic: Optional[str] = None, limit: int = RECENT_QUESTIONS) -> List[str]:
+        # Oldest first, like slicing the tail of the interaction list
+        if topic is None:
+            recent = self._recent
+        else:
+            stats = self.topic_stats.get(topic)
+            recent = stats.recent if stats else ()
+        return list(recent)[-limit:] if limit > 0 else []
+
+    def rebuild_aggregates(self) -> None:
+        self.scored = 0
+        self.score_sum = 0.0
+        self.topic_stats = {}
+        self._recent.clear()
+        self.asked.clear()
+        for interaction in self.interactions:
+            self._count_question(interaction)
+            if interaction.evaluation is not None:
+                self._count_score(self._stats(interaction.topic), interaction.evaluation.score)
+
+    def _stats(self, topic: str) -> TopicStats:
+        stats = self.topic_stats.get(topic)
+        if stats is None:
+            stats = self.topic_stats[topic] = TopicStats()
+        return stats
+
+    def _count_question(self, interaction: Interaction) -> None:
+        stats = self._stats(interaction.topic)
+        stats.questions += 1
+        stats.recent.append(interaction.question)
+        self._recent.append(interaction.question)
+
+    def _count_score(self, stats: TopicStats, score: float) -> None:
+        self.scored += 1
+        self.score_sum += score
+        stats.scored += 1
+        stats.score_sum += score
+        stats.best = score if stats.best is None else max(stats.best, score)
+        stats.worst = score if stats.worst is None else min(stats.worst, score)
+
     def finalize(self) -> None:
         self.ended_at = time.time()
 
@@ -25,10 +25,13 @@ class TopicPlan:
     topics: List[Topic]
     current_index: int = 0
     progress: List[TopicProgress] = field(default_factory=list)
+    # Kept in step by complete(), so is_finished() does not scan the plan
+    completed_count: int = field(default=0, init=False)
 
     def __post_init__(self) -> None:
         if not self.progress:
             self.progress = [TopicProgress(topic=t) for t in self.topics]
+        self.completed_count = sum(1 for p in self.progress if p.completed)
 
     def current(self) -> Optional[TopicProgress]:
         if 0 <= self.current_index < len(self.progress):
@@ -41,7 +44,12 @@ class TopicPlan:
             return None
         return self.progress[self.current_index]
 
+    def complete(self, progress: TopicProgress) -> None:
+        if not progress.completed:
+            progress.completed = True
+            self.completed_count += 1
+
     def is_finished(self) -> bool:
-        return all(p.completed for p in self.progress)
+        return self.completed_count >= len(self.progress)
 
 
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import re
+import threading
+
+from utils.metrics import get_metrics
+
+
+# Canonical spelling -> pattern; matched case-insensitively on word boundaries
+TECHNOLOGIES: Dict[str, str] = {
+    "Python": r"python", "Java": r"java(?!script)", "Go": r"golang|go(?= |,|/|$)", "Rust": r"rust",
+    "C++": r"c\+\+", "C#": r"c#", "JavaScript": r"javascript|js(?= |,|$)", "TypeScript": r"typescript",
+    "Node.js": r"node(?:\.js|js)?", "React": r"react", "Django": r"django", "Flask": r"flask",
+    "FastAPI": r"fastapi", "Spring": r"spring", "SQL": r"sql", "PostgreSQL": r"postgres(?:ql)?",
+    "MySQL": r"mysql", "MongoDB": r"mongo(?:db)?", "Redis": r"redis", "Kafka": r"kafka",
+    "RabbitMQ": r"rabbitmq", "Elasticsearch": r"elasticsearch", "GraphQL": r"graphql", "gRPC": r"grpc",
+    "REST": r"rest(?:ful)?(?= |,|$| api)", "AWS": r"aws|amazon web services", "GCP": r"gcp|google cloud",
+    "Azure": r"azure", "Docker": r"docker", "Kubernetes": r"kubernetes|k8s", "Terraform": r"terraform",
+    "CI/CD": r"ci/cd", "Linux": r"linux", "Spark": r"spark", "Airflow": r"airflow",
+    "PyTorch": r"pytorch", "TensorFlow": r"tensorflow", "Microservices": r"micro-?services",
+    "Distributed Systems": r"distributed systems?", "System Design": r"system design",
+}
+_TECH_RE = [(name, re.compile(rf"(?<![\w.+#-])(?:{pattern})", re.IGNORECASE)) for name, pattern in TECHNOLOGIES.items()]
+
+SECTION_NAMES = {
+    "summary", "profile", "objective", "skills", "technical skills", "experience", "work experience",
+    "employment", "projects", "education", "certifications", "publications", "awards", "requirements",
+    "qualifications", "responsibilities", "about", "about us", "benefits", "nice to have", "preferred",
+}
+_HEADER_RE = re.compile(r"^\s*(#+\s*)?([A-Za-z][A-Za-z /&]{1,40}?)\s*(?::\s*(.*))?$")
+_YEARS_RE = re.compile(r"(\d{1,2}(?:\.\d)?)\s*\+?\s*(?:years?|yrs)", re.IGNORECASE)
+_RANGE_RE = re.compile(r"((?:19|20)\d{2})\s*(?:-|–|to)\s*((?:19|20)\d{2}|present|current|now)", re.IGNORECASE)
+_BULLET_RE = re.compile(r"^\s*(?:[-*•·]|\d+[.)])\s+")
+_SPLIT_RE = re.compile(r"[,;|•·]|\s/\s")
+_ITEM_SECTIONS = {"experience", "work experience", "employment", "projects", "requirements", "responsibilities"}
+# Keeps digests of very long documents small; the section index still covers everything
+_MAX_ITEMS = 50
+
+
+@dataclass
+class DocumentSection:
+    name: str
+    # UTF-8 byte offsets into the source text, end exclusive
+    start: int
+    end: int
+
+
+@dataclass
+class DocumentDigest:
+    content_hash: str
+    kind: str
+    skills: List[str] = field(default_factory=list)
+    technologies: List[str] = field(default_factory=list)
+    projects: List[str] = field(default_factory=list)
+    years: Optional[float] = None
+    sections: List[DocumentSection] = field(default_factory=list)
+
+    def section(self, text: str, name: str) -> str:
+        raw = text.encode("utf-8")
+        return "".join(_slice(raw, s) for s in self.sections if s.name == name)
+
+    def summary(self, max_items: int = 12) -> str:
+        # Compact, stable rendering used in agent prompts instead of the raw document
+        lines = []
+        if self.years is not None:
+            label = "Years of experience" if self.kind == "resume" else "Years required"
+            lines.append(f"{label}: {self.years:g}")
+        if self.technologies:
+            lines.append("Technologies: " + ", ".join(self.technologies[:max_items]))
+        extra_skills = [s for s in self.skills if s not in self.technologies]
+        if extra_skills:
+            lines.append("Skills: " + ", ".join(extra_skills[:max_items]))
+        if self.projects:
+            label = "Experience/projects" if self.kind == "resume" else "Key points"
+            lines.append(f"{label}:\n- " + "\n- ".join(self.projects[:max_items // 2 or 1]))
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "DocumentDigest":
+        return DocumentDigest(
+            content_hash=data["content_hash"],
+            kind=data["kind"],
+            skills=list(data.get("skills") or []),
+            technologies=list(data.get("technologies") or []),
+            projects=list(data.get("projects") or []),
+            years=data.get("years"),
+            sections=[DocumentSection(**s) for s in data.get("sections") or []],
+        )
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _slice(raw: bytes, section: DocumentSection) -> str:
+    return raw[section.start:section.end].decode("utf-8", errors="ignore")
+
+
+def _header(line: str) -> Optional[Tuple[str, str]]:
+    # "Skills:", "Skills: a, b", "## Experience" or "EXPERIENCE" for a known section name
+    m = _HEADER_RE.match(line)
+    if not m:
+        return None
+    name = m.group(2).strip().lower()
+    if name not in SECTION_NAMES:
+        return None
+    if m.group(3) is None and not m.group(1) and not line.strip().isupper():
+        return None
+    return name, (m.group(3) or "").strip()
+
+
+def _sections(text: str) -> List[DocumentSection]:
+    sections: List[DocumentSection] = []
+    offset = 0
+    current: Optional[DocumentSection] = None
+    for line in text.splitlines(keepends=True):
+        size = len(line.encode("utf-8"))
+        header = _header(line)
+        if header is not None:
+            if current is not None:
+                current.end = offset
+            current = DocumentSection(name=header[0], start=offset, end=offset + size)
+            sections.append(current)
+        offset += size
+    if current is not None:
+        current.end = offset
+    return sections
+
+
+def _technologies(text: str) -> List[str]:
+    return [name for name, pattern in _TECH_RE if pattern.search(text)]
+
+
+def _years(text: str) -> Optional[float]:
+    explicit = [float(m) for m in _YEARS_RE.findall(text)]
+    if explicit:
+        return max(explicit)
+    spans = []
+    for start, end in _RANGE_RE.findall(text):
+        end_year = int(end) if end.isdigit() else None
+        if end_year is not None:
+            spans.append((int(start), end_year))
+    if spans:
+        return float(max(e for _, e in spans) - min(s for s, _ in spans))
+    return None
+
+
+def _items(body: str) -> List[str]:
+    items = []
+    for line in body.splitlines():
+        line = _BULLET_RE.sub("", line).strip()
+        if not line or _header(line):
+            continue
+        items.extend(p.strip() for p in _SPLIT_RE.split(line) if p.strip())
+    return items
+
+
+def _digest(text: str, kind: str, digest_hash: str) -> DocumentDigest:
+    raw = text.encode("utf-8")
+    sections = _sections(text)
+    skills: List[str] = []
+    projects: List[str] = []
+    for section in sections:
+        lines = _slice(raw, section).splitlines()
+        header = _header(lines[0]) if lines else None
+        body = ([header[1]] if header and header[1] else []) + lines[1:]
+        if "skill" in section.name or section.name == "qualifications":
+            skills.extend(i for i in _items("\n".join(body)) if len(i) <= 40)
+        elif section.name in _ITEM_SECTIONS:
+            for line in body:
+                line = _BULLET_RE.sub("", line).strip()
+                if line:
+                    projects.append(line if len(line) <= 100 else line[:97] + "...")
+    return DocumentDigest(
+        content_hash=digest_hash,
+        kind=kind,
+        skills=list(dict.fromkeys(skills))[:_MAX_ITEMS],
+        technologies=_technologies(text),
+        projects=list(dict.fromkeys(projects))[:_MAX_ITEMS],
+        years=_years(text),
+        sections=sections,
+    )
+
+
+_cache: "OrderedDict[str, DocumentDigest]" = OrderedDict()
+_cache_lock = threading.Lock()
+_CACHE_MAX = 1024
+
+
+def build_digest(text: str, kind: str = "resume") -> DocumentDigest:
+    # One digest per unique document: sessions uploading the same resume share the work
+    key = f"{kind}:{content_hash(text or '')}"
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+    metrics = get_metrics()
+    if cached is not None:
+        metrics.inc("digest_cache_total", help="Document digest lookups", result="hit", kind=kind)
+        return cached
+    metrics.inc("digest_cache_total", help="Document digest lookups", result="miss", kind=kind)
+    digest = _digest(text or "", kind, key.split(":", 1)[1])
+    with _cache_lock:
+        _cache[key] = digest
+        while len(_cache) > _CACHE_MAX:
+            _cache.popitem(last=False)
+    return digest
+
+
+def intern_digest(digest: DocumentDigest) -> DocumentDigest:
+    # Digests decoded from storage collapse onto the cached instance for the same document
+    key = f"{digest.kind}:{digest.content_hash}"
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None:
+            _cache.move_to_end(key)
+            return cached
+        _cache[key] = digest
+        while len(_cache) > _CACHE_MAX:
+            _cache.popitem(last=False)
+        return digest
@@ -1,19 +1,29 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import os
-from typing import Dict, Optional, List
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional, List, Tuple
 import time
 
-from fastapi import FastAPI, HTTPException, File, UploadFile, Form
+from fastapi import FastAPI, HTTPException, File, UploadFile, Form, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 
-from utils.logging import setup_logging
+from utils.logging import setup_logging, get_logger
 from parsers import parse_resume, parse_job_description, load_topics
-from models import AgentMessage, MessageType, InterviewSession
-from agents.orchestrator_agent import OrchestratorAgent
+from models import AgentMessage, MessageType, InterviewSession, Interaction, TopicProgress
+from agents.orchestrator_agent import AnswerOutcome, OrchestratorAgent
+from agents.speculation import QuestionSpeculator
 from tools.export import session_to_dict
+from tools.llm_client import get_provider_pool
+from tools.session_store import SessionConflict, SessionRecord, SessionStore, create_session_store
+from utils.config import load_config
+from utils.metrics import MetricsRegistry, get_metrics
 
 
 app = FastAPI()
@@ -25,8 +35,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-setup_logging("INFO")
-app.state.start_time = time.time()
+CONFIG = load_config()
+setup_logging(CONFIG.log_level)
+logger = get_logger("server")
+app.state.start_time = time.monotonic()
 
 
 class CreateSessionResp(BaseModel):
@@ -80,28 +92,171 @@ class SessionSummaryResp(BaseModel):
     avg_score: float
     current_topic: str
     finished: bool
-
-
-# session_id -> {"session": InterviewSession, "orch": OrchestratorAgent, "pending_question": Optional[str]}
-SESSIONS: Dict[str, Dict[str, object]] = {}
-
-
-def _ensure_session(sid: str) -> Dict[str, object]:
-    s = SESSIONS.get(sid)
-    if not s:
+    llm_calls: int = 0
+
+
+STORE: SessionStore = create_session_store(CONFIG)
+METRICS = get_metrics()
+
+
+def _collect_session_metrics(metrics: MetricsRegistry) -> None:
+    metrics.set("sessions_active", STORE.count(), help="Sessions held by the session store")
+    metrics.set("sessions_runtime_cached", len(_RUNTIME), help="Sessions with live agents in this worker")
+    metrics.set("uptime_seconds", time.monotonic() - app.state.start_time, help="Seconds since this worker started")
+
+
+METRICS.add_collector(_collect_session_metrics)
+
+
+@app.middleware("http")
+async def _observe_requests(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Route templates keep label cardinality bounded; streaming responses are timed to their first byte
+        route = request.scope.get("route")
+        path = getattr(route, "path", None) or "static"
+        if path != "/metrics":
+            METRICS.observe(
+                "http_request_duration_seconds",
+                time.perf_counter() - start,
+                help="HTTP request latency by route",
+                method=request.method,
+                route=path,
+            )
+            METRICS.inc(
+                "http_requests_total",
+                help="HTTP requests by route and status",
+                method=request.method,
+                route=path,
+                status=status,
+            )
+
+
+@dataclass
+class SessionContext:
+    record: SessionRecord
+    orch: OrchestratorAgent
+    speculator: Optional[QuestionSpeculator]
+
+    @property
+    def session(self) -> InterviewSession:
+        return self.record.session
+
+
+# Process-local agents per session, rebuilt lazily from the store (e.g. after a restart or on another worker)
+_RUNTIME: "OrderedDict[str, Tuple[OrchestratorAgent, Optional[QuestionSpeculator]]]" = OrderedDict()
+
+
+def _runtime(sid: str) -> Tuple[OrchestratorAgent, Optional[QuestionSpeculator]]:
+    entry = _RUNTIME.get(sid)
+    if entry is None:
+        orch = OrchestratorAgent()
+        speculator = QuestionSpeculator(orch.interviewer, orch.telemetry) if CONFIG.speculative_prefetch else None
+        entry = (orch, speculator)
+        _RUNTIME[sid] = entry
+        while len(_RUNTIME) > CONFIG.session_max_in_memory:
+            _, (_, evicted) = _RUNTIME.popitem(last=False)
+            if evicted is not None:
+                evicted.discard()
+    _RUNTIME.move_to_end(sid)
+    return entry
+
+
+def _drop_runtime(sid: str) -> None:
+    entry = _RUNTIME.pop(sid, None)
+    if entry is None:
+        return
+    orch, speculator = entry
+    if orch.planning is not None:
+        orch.planning.cancel()
+    if speculator is not None:
+        speculator.discard()
+
+
+async def _evict_idle_sessions() -> None:
+    while True:
+        await asyncio.sleep(CONFIG.session_evict_interval_seconds)
+        try:
+            evicted = STORE.evict_idle(CONFIG.session_ttl_seconds)
+            if evicted:
+                logger.info(f"Evicted {evicted} idle sessions")
+            for sid in [sid for sid in _RUNTIME if not STORE.exists(sid)]:
+                _drop_runtime(sid)
+        except Exception as e:
+            logger.warning(f"Idle session eviction failed: {e}")
+
+
+@app.on_event("startup")
+async def _start_session_eviction() -> None:
+    app.state.eviction_task = asyncio.create_task(_evict_idle_sessions())
+
+
+@app.on_event("shutdown")
+async def _close_llm_pool() -> None:
+    task = getattr(app.state, "eviction_task", None)
+    if task is not None:
+        task.cancel()
+    STORE.close()
+    await get_provider_pool().aclose()
+
+
+def _ensure_session(sid: str) -> SessionContext:
+    record = STORE.get(sid)
+    if record is None:
+        _drop_runtime(sid)
         raise HTTPException(status_code=404, detail="session not found")
-    return s
+    orch, speculator = _runtime(sid)
+    return SessionContext(record=record, orch=orch, speculator=speculator)
+
+
+def _save(ctx: SessionContext) -> None:
+    try:
+        STORE.put(ctx.record)
+    except SessionConflict:
+        # Another request or worker saved this session after it was loaded; its changes win
+        raise HTTPException(status_code=409, detail="session was modified concurrently, reload and retry")
+
+
+def _save_plan(session_id: str, pool: Dict[Tuple[str, int], List[str]], planning: "asyncio.Future[None]") -> None:
+    # Only the planned pool is merged into the session as last saved; the object planning wrote into is never
+    # put, so whatever a request is still in the middle of changing cannot reach the store
+    if planning.cancelled() or planning.exception() is not None:
+        return
+    for _ in range(3):
+        latest = STORE.get(session_id)
+        if latest is None:
+            return
+        for key, questions in pool.items():
+            latest.session.question_pool.setdefault(key, list(questions))
+        try:
+            STORE.put(latest)
+            return
+        except SessionConflict:
+            # A request saved the session in between: merge into its state and try again
+            continue
+    logger.warning(f"Could not save the question plan for session {session_id}")
 
 
 @app.get("/health", response_model=HealthResp)
 async def health() -> HealthResp:
     return HealthResp(
         status="ok",
-        uptime_seconds=round(time.time() - app.state.start_time, 3),
-        sessions=len(SESSIONS),
+        uptime_seconds=round(time.monotonic() - app.state.start_time, 3),
+        sessions=STORE.count(),
     )
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    # Prometheus text exposition format; aggregates every session served by this worker
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/version", response_model=VersionResp)
 async def version() -> VersionResp:
     # Lightweight static version; adjust as needed
@@ -134,9 +289,15 @@ async def create_session(
         job_description_text=jd_text,
         topics=topics,
     )
-    orch = OrchestratorAgent()
-    await orch.start_session(session)
-    SESSIONS[session.session_id] = {"session": session, "orch": orch, "pending_question": None}
+    STORE.put(SessionRecord(session=session))
+    orch, _ = _runtime(session.session_id)
+    # Question planning runs in the background so creating a session stays fast; the pool is saved as soon
+    # as it lands, so other workers (and reloads) see it too
+    await orch.start_session(session, wait_for_plan=False)
+    if orch.planning is not None:
+        orch.planning.add_done_callback(
+            lambda task: _save_plan(session.session_id, session.question_pool, task)
+        )
 
     return CreateSessionResp(
         session_id=session.session_id,
@@ -146,46 +307,102 @@ async def create_session(
     )
 
 
-@app.post("/api/next", response_model=NextResp)
-async def next_question(req: NextReq):
-    store = _ensure_session(req.session_id)
-    session: InterviewSession = store["session"]  # type: ignore[assignment]
-    orch: OrchestratorAgent = store["orch"]  # type: ignore[assignment]
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _guarded(events: AsyncIterator[str]) -> AsyncIterator[str]:
+    # Headers are already sent once a stream starts, so errors such as a save conflict become an event
+    try:
+        async for chunk in events:
+            yield chunk
+    except HTTPException as e:
+        yield _sse("error", {"detail": e.detail, "status": e.status_code})
 
+
+def _question_request(session: InterviewSession) -> Tuple[TopicProgress, AgentMessage]:
     cur = session.topic_plan.current()
     if cur is None or session.topic_plan.is_finished():
         raise HTTPException(status_code=400, detail="no more topics")
-
-    topic_name = cur.topic.name
     msg = AgentMessage.create(
         sender="orchestrator",
         recipient="interviewer",
         type=MessageType.REQUEST_QUESTION,
         content="next",
-        topic=topic_name,
+        topic=cur.topic.name,
     )
-    q_msg = await orch.interviewer.handle(msg, session)
-    if not q_msg:
-        raise HTTPException(status_code=500, detail="failed to produce question")
-    question = q_msg.content
-    store["pending_question"] = question
-    return NextResp(topic=topic_name, depth=cur.depth, question=question)
+    return cur, msg
 
 
-@app.post("/api/answer", response_model=AnswerResp)
-async def submit_answer(req: AnswerReq):
-    store = _ensure_session(req.session_id)
-    session: InterviewSession = store["session"]  # type: ignore[assignment]
-    orch: OrchestratorAgent = store["orch"]  # type: ignore[assignment]
-    pending_q: Optional[str] = store.get("pending_question")  # type: ignore[assignment]
-
-    cur = session.topic_plan.current()
-    if cur is None:
-        raise HTTPException(status_code=400, detail="session finished")
+@app.post("/api/next", response_model=NextResp)
+async def next_question(req: NextReq):
+    ctx = _ensure_session(req.session_id)
+    session = ctx.session
+    orch = ctx.orch
 
-    cmd = req.answer.strip().lower()
+    cur, msg = _question_request(session)
+    with orch.telemetry.timer("question_gen_ms"):
+        q_msg = await _take_speculative(ctx, session, msg) or await orch.interviewer.handle(msg, session)
+    if not q_msg:
+        raise HTTPException(status_code=500, detail="failed to produce question")
+    question = q_msg.content
+    ctx.record.pending_question = question
+    _save(ctx)
+    return NextResp(topic=cur.topic.name, depth=cur.depth, question=question)
+
+
+@app.get("/api/next/stream")
+async def next_question_stream(session_id: str):
+    ctx = _ensure_session(session_id)
+    session = ctx.session
+    orch = ctx.orch
+    cur, msg = _question_request(session)
+
+    async def events() -> AsyncIterator[str]:
+        start = time.perf_counter()
+        first_token = True
+        speculative = await _take_speculative(ctx, session, msg)
+        stream = _replay(speculative) if speculative else orch.interviewer.handle_stream(msg, session)
+        async for item in stream:
+            if isinstance(item, AgentMessage):
+                orch.telemetry.observe_ms("question_gen_ms", (time.perf_counter() - start) * 1000.0)
+                ctx.record.pending_question = item.content
+                _save(ctx)
+                yield _sse("question", {"topic": cur.topic.name, "depth": cur.depth, "question": item.content})
+                return
+            if first_token:
+                orch.telemetry.observe_ms("question_ttft_ms", (time.perf_counter() - start) * 1000.0)
+                first_token = False
+            yield _sse("delta", {"text": item})
+        yield _sse("error", {"detail": "failed to produce question"})
+
+    return StreamingResponse(_guarded(events()), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+async def _take_speculative(
+    ctx: SessionContext, session: InterviewSession, msg: AgentMessage
+) -> Optional[AgentMessage]:
+    if ctx.speculator is None:
+        return None
+    question = await ctx.speculator.take(session)
+    if not question:
+        return None
+    return ctx.orch.interviewer.accept_question(msg, session, question)
+
+
+async def _replay(q_msg: AgentMessage) -> AsyncIterator[Any]:
+    yield q_msg.content
+    yield q_msg
+
+
+async def _control_command(
+    ctx: SessionContext, session: InterviewSession, orch: OrchestratorAgent, cur: TopicProgress, cmd: str
+) -> Optional[AnswerResp]:
     if cmd in {"/quit", "quit"}:
         session.finalize()
+        if ctx.speculator is not None:
+            ctx.speculator.discard()
+        _save(ctx)
         return AnswerResp(
             topic=cur.topic.name,
             score=0.0,
@@ -208,6 +425,7 @@ async def submit_answer(req: AnswerReq):
         )
         update = await orch.topic_manager.handle(ctrl, session)
         new_cur = session.topic_plan.current()
+        _save(ctx)
         return AnswerResp(
             topic=cur.topic.name,
             score=0.0,
@@ -218,40 +436,35 @@ async def submit_answer(req: AnswerReq):
             topic_action=update.content if update else "next",
             current_topic=(new_cur.topic.name if new_cur else "Finished"),
         )
-
-    question = pending_q or "(unspecified)"
-    interaction = session.record_interaction(cur.topic.name, question, req.answer)
-
-    eval_req = AgentMessage.create(
-        sender="orchestrator",
-        recipient="evaluator",
-        type=MessageType.EVALUATE_RESPONSE,
-        content=req.answer,
-        topic=cur.topic.name,
-        metadata={"question": question},
-    )
-    e_msg = await orch.evaluator.handle(eval_req, session)
+    return None
+
+
+def _record_answer(ctx: SessionContext, session: InterviewSession, cur: TopicProgress, answer: str) -> Interaction:
+    question = ctx.record.pending_question or "(unspecified)"
+    interaction = session.record_interaction(cur.topic.name, question, answer, depth=cur.depth)
+    # Generate the next question for every reachable branch while the evaluation is in flight
+    if ctx.speculator is not None:
+        ctx.speculator.launch(session)
+    return interaction
+
+
+def _answer_response(
+    ctx: SessionContext,
+    session: InterviewSession,
+    cur: TopicProgress,
+    outcome: AnswerOutcome,
+    hint_text: Optional[str],
+) -> AnswerResp:
+    e_msg = outcome.evaluation
     follow = str(e_msg.metadata.get("follow_up_question", "")) if e_msg else ""
     score = float(e_msg.metadata.get("score", 0.0)) if e_msg else 0.0
-
-    if e_msg:
-        from models import Evaluation
-        interaction.evaluation = Evaluation(
-            score=score,
-            brief_feedback=e_msg.content,
-            strengths=list(e_msg.metadata.get("strengths", [])),
-            improvements=list(e_msg.metadata.get("improvements", [])),
-            follow_up_question=follow,
-        )
-
-    hint_msg = await orch.hints.handle(e_msg, session) if e_msg else None
-    hint_text = hint_msg.content if hint_msg and hint_msg.content else None
-
-    update = await orch.topic_manager.handle(e_msg, session) if e_msg else None
-    action = update.content if update else "stay"
+    action = outcome.topic_update.content if outcome.topic_update else "stay"
     new_cur = session.topic_plan.current()
+    if ctx.speculator is not None:
+        ctx.speculator.prune(session)
 
-    store["pending_question"] = follow if follow else None
+    ctx.record.pending_question = follow if follow else None
+    _save(ctx)
 
     return AnswerResp(
         topic=cur.topic.name,
@@ -266,32 +479,115 @@ async def submit_answer(req: AnswerReq):
     )
 
 
+@app.post("/api/answer", response_model=AnswerResp)
+async def submit_answer(req: AnswerReq):
+    ctx = _ensure_session(req.session_id)
+    session = ctx.session
+    orch = ctx.orch
+
+    cur = session.topic_plan.current()
+    if cur is None:
+        raise HTTPException(status_code=400, detail="session finished")
+
+    control = await _control_command(ctx, session, orch, cur, req.answer.strip().lower())
+    if control is not None:
+        return control
+
+    # Hint, low-score rephrase and topic decision only depend on the evaluation, so they run concurrently
+    interaction = _record_answer(ctx, session, cur, req.answer)
+    outcome = await orch.process_answer(session, interaction)
+    hint_text = outcome.hint.content if outcome.hint and outcome.hint.content else None
+    return _answer_response(ctx, session, cur, outcome, hint_text)
+
+
+@app.post("/api/answer/stream")
+async def submit_answer_stream(req: AnswerReq):
+    ctx = _ensure_session(req.session_id)
+    session = ctx.session
+    orch = ctx.orch
+
+    cur = session.topic_plan.current()
+    if cur is None:
+        raise HTTPException(status_code=400, detail="session finished")
+
+    async def events() -> AsyncIterator[str]:
+        control = await _control_command(ctx, session, orch, cur, req.answer.strip().lower())
+        if control is not None:
+            yield _sse("done", control.model_dump())
+            return
+
+        # The hint is streamed below instead of running inside the round pipeline
+        interaction = _record_answer(ctx, session, cur, req.answer)
+        outcome = await orch.process_answer(session, interaction, include_hint=False)
+        e_msg = outcome.evaluation
+        hint_text: Optional[str] = None
+        if e_msg:
+            yield _sse(
+                "evaluation",
+                {
+                    "score": float(e_msg.metadata.get("score", 0.0)),
+                    "brief_feedback": e_msg.content,
+                    "strengths": list(e_msg.metadata.get("strengths", [])),
+                    "improvements": list(e_msg.metadata.get("improvements", [])),
+                },
+            )
+            start = time.perf_counter()
+            first_token = True
+            async for item in orch.hints.handle_stream(e_msg, session):
+                if isinstance(item, AgentMessage):
+                    hint_text = item.content or None
+                    break
+                if first_token:
+                    orch.telemetry.observe_ms("hint_ttft_ms", (time.perf_counter() - start) * 1000.0)
+                    first_token = False
+                yield _sse("hint_delta", {"text": item})
+        yield _sse("done", _answer_response(ctx, session, cur, outcome, hint_text).model_dump())
+
+    return StreamingResponse(_guarded(events()), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
 @app.get("/api/export/{session_id}")
 async def export_session(session_id: str):
-    store = _ensure_session(session_id)
-    session: InterviewSession = store["session"]  # type: ignore[assignment]
+    ctx = _ensure_session(session_id)
+    session = ctx.session
     return session_to_dict(session)
 
 
 @app.get("/api/sessions/{session_id}", response_model=SessionSummaryResp)
 async def get_session_summary(session_id: str) -> SessionSummaryResp:
-    store = _ensure_session(session_id)
-    session: InterviewSession = store["session"]  # type: ignore[assignment]
-    scores = [i.evaluation.score for i in session.interactions if i.evaluation]
-    avg = (sum(scores) / len(scores)) if scores else 0.0
+    ctx = _ensure_session(session_id)
+    session = ctx.session
     cur = session.topic_plan.current()
     return SessionSummaryResp(
         session_id=session.session_id,
         num_questions=len(session.interactions),
-        avg_score=round(avg, 2),
+        avg_score=round(session.average_score, 2),
         current_topic=(cur.topic.name if cur else "Finished"),
         finished=(session.ended_at is not None or session.topic_plan.is_finished()),
+        llm_calls=int(session.metrics.get("llm_calls", 0)),
     )
 
 
+@app.get("/api/sessions/{session_id}/telemetry")
+async def get_session_telemetry(session_id: str) -> Dict[str, Any]:
+    ctx = _ensure_session(session_id)
+    orch = ctx.orch
+    speculator = ctx.speculator
+    return {
+        "counters": dict(orch.telemetry.counters),
+        "timings": orch.telemetry.summary(),
+        "gauges": dict(orch.telemetry.gauges),
+        "speculation_hit_rate": round(speculator.hit_rate(), 4) if speculator else None,
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+    if CONFIG.web_workers > 1:
+        # Workers share sessions through the SQLite store (SESSION_STORE=sqlite)
+        uvicorn.run("server:app", host="127.0.0.1", port=8000, workers=CONFIG.web_workers)
+    else:
+        uvicorn.run(app, host="127.0.0.1", port=8000)
 
 
 app.mount("/", StaticFiles(directory="static", html=True), name="static")
@@ -32,6 +32,35 @@ document.addEventListener("DOMContentLoaded", () => {
 		messageElement.innerHTML = `<p class="sender">${sender}</p><p>${text}</p>`;
 		chatMessages.appendChild(messageElement);
 		chatMessages.scrollTop = chatMessages.scrollHeight;
+		return messageElement.lastElementChild;
+	}
+
+	function appendText(textElement, text) {
+		textElement.textContent += text;
+		chatMessages.scrollTop = chatMessages.scrollHeight;
+	}
+
+	async function readEvents(response, onEvent) {
+		const reader = response.body.getReader();
+		const decoder = new TextDecoder();
+		let buffer = "";
+		while (true) {
+			const { done, value } = await reader.read();
+			if (done) break;
+			buffer += decoder.decode(value, { stream: true });
+			let boundary;
+			while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+				const raw = buffer.slice(0, boundary);
+				buffer = buffer.slice(boundary + 2);
+				let event = "message";
+				let data = "";
+				for (const line of raw.split("\n")) {
+					if (line.startsWith("event: ")) event = line.slice(7);
+					else if (line.startsWith("data: ")) data += line.slice(6);
+				}
+				onEvent(event, data ? JSON.parse(data) : {});
+			}
+		}
 	}
 
 	function displayWelcomeMessage() {
@@ -83,8 +112,7 @@ document.addEventListener("DOMContentLoaded", () => {
 		}
 	}
 
-	async function nextQuestion() {
-		if (!sessionId) return;
+	async function nextQuestionBlocking() {
 		try {
 			const response = await post("/api/next", { session_id: sessionId });
 			addMessage(
@@ -96,6 +124,41 @@ document.addEventListener("DOMContentLoaded", () => {
 		}
 	}
 
+	function nextQuestion() {
+		if (!sessionId) return Promise.resolve();
+		return new Promise((resolve) => {
+			const source = new EventSource(
+				`${API_BASE}/api/next/stream?session_id=${encodeURIComponent(sessionId)}`
+			);
+			let textElement = null;
+			const finish = () => {
+				source.close();
+				resolve();
+			};
+			source.addEventListener("delta", (e) => {
+				if (!textElement) textElement = addMessage("Interviewer", "");
+				appendText(textElement, JSON.parse(e.data).text);
+			});
+			source.addEventListener("question", (e) => {
+				const data = JSON.parse(e.data);
+				if (!textElement) textElement = addMessage("Interviewer", "");
+				textElement.previousElementSibling.textContent = `Interviewer (Topic: ${data.topic})`;
+				textElement.textContent = data.question;
+				finish();
+			});
+			source.addEventListener("error", (e) => {
+				source.close();
+				// Nothing rendered yet: fall back to the blocking endpoint
+				if (!textElement) {
+					nextQuestionBlocking().then(resolve);
+				} else {
+					if (e.data) addMessage("System", `Error: ${JSON.parse(e.data).detail}`);
+					resolve();
+				}
+			});
+		});
+	}
+
 	async function handleSendMessage() {
 		if (!sessionId) {
 			await createNewSession();
@@ -110,22 +173,38 @@ document.addEventListener("DOMContentLoaded", () => {
 		messageInput.value = "";
 
 		try {
-			const response = await post("/api/answer", {
-				session_id: sessionId,
-				answer: answer,
+			const streamResponse = await fetch(`${API_BASE}/api/answer/stream`, {
+				method: "POST",
+				headers: { "Content-Type": "application/json" },
+				body: JSON.stringify({ session_id: sessionId, answer: answer }),
 			});
-
-			let feedback = `Feedback: ${response.brief_feedback} (Score: ${response.score.toFixed(1)}/10)`;
-			if (response.strengths.length > 0) {
-				feedback += `\nStrengths: ${response.strengths.join(", ")}`;
-			}
-			if (response.improvements.length > 0) {
-				feedback += `\nAreas for Improvement: ${response.improvements.join(", ")}`;
+			if (!streamResponse.ok) {
+				const error = await streamResponse.json();
+				throw new Error(error.detail || "An error occurred");
 			}
-			addMessage("Evaluator", feedback);
 
+			let response = null;
+			let evaluated = false;
+			let hintElement = null;
+			await readEvents(streamResponse, (event, data) => {
+				if (event === "evaluation") {
+					addMessage("Evaluator", formatFeedback(data));
+					evaluated = true;
+				} else if (event === "hint_delta") {
+					if (!hintElement) hintElement = addMessage("Hint", "");
+					appendText(hintElement, data.text);
+				} else if (event === "done") {
+					response = data;
+				}
+			});
+			if (!response) throw new Error("Answer stream ended unexpectedly");
+
+			if (!evaluated && response.brief_feedback) {
+				addMessage("Evaluator", formatFeedback(response));
+			}
 			if (response.hint) {
-				addMessage("Hint", response.hint);
+				if (!hintElement) hintElement = addMessage("Hint", "");
+				hintElement.textContent = response.hint;
 			}
 
 			if (response.follow_up_question) {
@@ -138,6 +217,17 @@ document.addEventListener("DOMContentLoaded", () => {
 		}
 	}
 
+	function formatFeedback(response) {
+		let feedback = `Feedback: ${response.brief_feedback} (Score: ${response.score.toFixed(1)}/10)`;
+		if (response.strengths.length > 0) {
+			feedback += `\nStrengths: ${response.strengths.join(", ")}`;
+		}
+		if (response.improvements.length > 0) {
+			feedback += `\nAreas for Improvement: ${response.improvements.join(", ")}`;
+		}
+		return feedback;
+	}
+
 	function updateSessionList() {
 		sessionList.innerHTML = "";
 		for (const id in sessionData) {
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import os
+import sys
+
+import pytest
+
+# Tests import the app's top-level packages (agents, models, tools, utils) from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import InterviewSession, Topic  # noqa: E402
+
+RESUME = """Jane Roe
+Senior Backend Engineer
+
+Built a Python payments API on PostgreSQL serving 2k requests per second.
+Cut p99 latency from 400 ms to 90 ms with Redis caching and connection pooling.
+
+Led the migration of batch jobs to Kubernetes and Terraform on AWS."""
+
+JOB_DESCRIPTION = """Senior Backend Engineer
+
+Design and operate Python services on AWS.
+Experience with distributed systems, caching and PostgreSQL tuning."""
+
+
+@pytest.fixture
+def make_session():
+    def make() -> InterviewSession:
+        return InterviewSession.new(
+            candidate_name="Jane Roe",
+            target_role="Senior Backend Engineer",
+            resume_text=RESUME,
+            job_description_text=JOB_DESCRIPTION,
+            topics=[
+                Topic(name="Python", description="Language depth", tags=["asyncio", "typing"]),
+                Topic(name="System Design", description="Scalable services", tags=["caching", "queues"]),
+            ],
+        )
+
+    return make
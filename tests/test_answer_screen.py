@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import pytest
+
+from tools.answer_screen import screen_answer
+from tools.prompt_builder import count_tokens
+
+QUESTION = "How would you cache the results of a slow PostgreSQL query?"
+ANSWER = (
+    "I would put Redis in front of the query with a short TTL and invalidate the key on writes. "
+    "For hot keys I would add request coalescing so only one caller recomputes a missing entry."
+)
+
+
+def test_empty_answer_is_scored_locally():
+    screening = screen_answer(QUESTION, "  \n ")
+    assert screening.result == "empty"
+    assert screening.evaluation is not None
+    assert screening.evaluation.score == 1.0
+    assert screening.evaluation.follow_up_question
+    assert screening.hint
+
+
+@pytest.mark.parametrize(
+    "answer, result",
+    [
+        ("$$$ ### 0101 %%% {{}} ;;; 42 !!!", "not_text"),
+        ("lorem ipsum " * 40, "repetitive"),
+        (" ".join(f"cache{i % 5}" for i in range(60)), "repetitive"),
+        ("Redis, probably", "too_short"),
+        ("I like hiking outdoors", "off_topic"),
+    ],
+)
+def test_non_answers_get_a_canned_evaluation(answer, result):
+    screening = screen_answer(QUESTION, answer, topic="Databases")
+    assert screening.result == result
+    assert screening.evaluation is not None
+    assert screening.evaluation.score <= 2.0
+    # The recorded answer is never changed
+    assert screening.answer == answer.strip()
+
+
+def test_short_answer_on_topic_passes():
+    assert screen_answer(QUESTION, "Redis in front of the query", topic="Databases").result == "passed"
+    # The topic counts as well as the question
+    assert screen_answer(QUESTION, "Use materialized views", topic="Materialized views").result == "passed"
+
+
+def test_real_answer_passes_unchanged():
+    screening = screen_answer(QUESTION, ANSWER, token_budget=1000)
+    assert screening.result == "passed"
+    assert screening.answer == ANSWER
+    assert screening.evaluation is None
+
+
+def test_long_answer_is_condensed_to_relevant_sentences():
+    filler = (
+        "Before that I spent two years on a mobile team shipping onboarding flows. "
+        "We ran weekly design reviews with product managers and researchers. "
+        "Most of my time went into accessibility fixes and translation tooling. "
+        "Later I mentored three new hires and organised our internal hackathon. "
+        "The office moved twice during that period, which slowed everyone down. "
+    )
+    long_answer = f"{ANSWER} {filler} Finally I would monitor the PostgreSQL cache hit rate."
+    screening = screen_answer(QUESTION, long_answer, token_budget=80)
+    assert screening.result == "condensed"
+    assert screening.answer.startswith("I would put Redis in front of the query")
+    assert "PostgreSQL cache hit rate" in screening.answer
+    assert "mobile team" not in screening.answer
+    assert "hackathon" not in screening.answer
+    assert screening.answer.endswith("[... answer condensed for evaluation ...]")
+    assert count_tokens(screening.answer) < count_tokens(long_answer)
+
+
+def test_checks_off_keeps_only_the_empty_rule():
+    assert screen_answer(QUESTION, "", checks=False).result == "empty"
+    for answer in ("Redis, probably", "lorem ipsum " * 40, "I like hiking outdoors"):
+        screening = screen_answer(QUESTION, answer, checks=False)
+        assert screening.result == "passed"
+        assert screening.evaluation is None
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from utils.histogram import LogHistogram
+
+
+def test_quantiles_stay_within_the_precision():
+    rng = random.Random(7)
+    values = sorted(rng.lognormvariate(0, 1.5) for _ in range(5000))
+    hist = LogHistogram(precision=0.01)
+    for value in values:
+        hist.record(value)
+    for q in (0.5, 0.9, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert hist.quantile(q) == pytest.approx(exact, rel=0.02)
+    assert hist.quantile(0.0) == pytest.approx(values[0], rel=0.02)
+    assert hist.quantile(1.0) == pytest.approx(values[-1], rel=0.02)
+    assert hist.mean == pytest.approx(sum(values) / len(values))
+
+
+def test_empty_histogram():
+    hist = LogHistogram()
+    assert hist.quantile(0.5) == 0.0
+    assert hist.mean == 0.0
+    assert hist.cumulative_counts([1.0, 2.0]) == [0, 0]
+
+
+def test_values_outside_the_range_are_clamped_to_the_edge_buckets():
+    hist = LogHistogram(min_value=0.1, max_value=10.0)
+    hist.record(0.0)
+    hist.record(1000.0)
+    assert len(hist.buckets) == 2
+    assert hist.quantile(0.0) == 0.1
+    assert hist.quantile(1.0) == pytest.approx(10.0, rel=0.02)
+    assert hist.max == 1000.0
+
+
+def test_cumulative_counts_per_bound():
+    hist = LogHistogram(precision=0.01)
+    for value, count in ((0.004, 3), (0.02, 2), (0.3, 4), (7.0, 1)):
+        hist.record(value, count)
+    assert hist.cumulative_counts([0.001, 0.005, 0.01, 0.25, 0.5, 10.0]) == [0, 3, 3, 5, 9, 10]
+
+
+def test_cumulative_counts_at_a_bound_carry_the_precision_error():
+    hist = LogHistogram(precision=0.01)
+    hist.record(1.0)
+    below, above = hist.cumulative_counts([0.97, 1.03])
+    assert (below, above) == (0, 1)
+
+
+def test_merge_adds_up_both_histograms():
+    a, b = LogHistogram(), LogHistogram()
+    for value in (1.0, 2.0, 3.0):
+        a.record(value)
+    for value in (0.5, 10.0):
+        b.record(value)
+    a.merge(b)
+    assert a.count == 5
+    assert a.total == pytest.approx(16.5)
+    assert (a.min, a.max) == (0.5, 10.0)
+    assert a.quantile(0.5) == pytest.approx(2.0, rel=0.02)
+
+
+def test_merge_rejects_a_different_layout():
+    with pytest.raises(ValueError):
+        LogHistogram(precision=0.01).merge(LogHistogram(precision=0.05))
+
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        LogHistogram(precision=0)
+    with pytest.raises(ValueError):
+        LogHistogram(min_value=1.0, max_value=1.0)
+
+
+def test_dict_round_trip():
+    hist = LogHistogram(precision=0.02, min_value=1e-3, max_value=600.0)
+    for value in (0.01, 0.2, 0.2, 5.0):
+        hist.record(value)
+    restored = LogHistogram.from_dict(hist.to_dict())
+    assert restored.buckets == hist.buckets
+    assert (restored.count, restored.total, restored.min, restored.max) == (4, hist.total, 0.01, 5.0)
+    assert restored.quantile(0.5) == hist.quantile(0.5)
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+from typing import List
+
+import pytest
+
+from tools.llm_client import ChatMessage
+from tools.llm_transcript import (
+    REPLAY_TIMED,
+    TranscriptEntry,
+    TranscriptError,
+    TranscriptMiss,
+    TranscriptPlayer,
+    TranscriptRecorder,
+    prompt_key,
+)
+
+MESSAGES = [ChatMessage(role="user", content="Ask me about Python.")]
+KEY = prompt_key("interviewer", "You are an interviewer.", MESSAGES, 0.7)
+
+
+def record(path: str, *entries: TranscriptEntry) -> None:
+    recorder = TranscriptRecorder(path)
+    for entry in entries:
+        recorder.write(entry)
+    recorder.close()
+
+
+def entry(response: str, key: str = KEY, seconds: float = 0.25, **kwargs) -> TranscriptEntry:
+    return TranscriptEntry(
+        key=key, agent="interviewer", target="mock:mock-1", seconds=seconds, response=response, **kwargs
+    )
+
+
+def test_prompt_key_depends_on_the_prompt_only():
+    assert KEY == prompt_key("interviewer", "You are an interviewer.", list(MESSAGES), 0.70001)
+    assert KEY != prompt_key("evaluator", "You are an interviewer.", MESSAGES, 0.7)
+    assert KEY != prompt_key("interviewer", "You are an interviewer.", MESSAGES, 0.2)
+    assert KEY != prompt_key("interviewer", "You are an interviewer.", [ChatMessage(role="user", content="Go")], 0.7)
+
+
+def test_entries_survive_the_json_round_trip():
+    original = entry("What is the GIL?", first_token_seconds=0.05, error="overloaded", status_code=529)
+    assert TranscriptEntry.from_json(original.to_json()) == original
+
+
+def test_replay_returns_recorded_responses_in_order_then_repeats_the_last(tmp_path):
+    path = str(tmp_path / "calls.jsonl")
+    record(path, entry("first"), entry("second"))
+    player = TranscriptPlayer(path)
+
+    async def run() -> List[str]:
+        return [await player.complete(KEY) for _ in range(3)]
+
+    assert asyncio.run(run()) == ["first", "second", "second"]
+
+
+def test_recording_appends_to_an_existing_transcript(tmp_path):
+    path = str(tmp_path / "calls.jsonl")
+    record(path, entry("first"))
+    record(path, entry("other", key="other"))
+    player = TranscriptPlayer(path)
+    assert player.next(KEY).response == "first"
+    assert player.next("other").response == "other"
+
+
+def test_unknown_prompt_is_a_miss(tmp_path):
+    path = str(tmp_path / "calls.jsonl")
+    record(path, entry("first"))
+    with pytest.raises(TranscriptMiss):
+        asyncio.run(TranscriptPlayer(path).complete("0" * 32))
+
+
+def test_recorded_errors_replay_with_their_status_code(tmp_path):
+    path = str(tmp_path / "calls.jsonl")
+    record(path, entry("", error="rate limited", status_code=429))
+    with pytest.raises(TranscriptError) as raised:
+        asyncio.run(TranscriptPlayer(path).complete(KEY))
+    assert raised.value.status_code == 429
+    assert str(raised.value) == "rate limited"
+
+
+def test_stream_replays_the_text_in_pieces(tmp_path):
+    path = str(tmp_path / "calls.jsonl")
+    record(path, entry("How would you  cache\nthis?"))
+    player = TranscriptPlayer(path)
+
+    async def run() -> List[str]:
+        return [piece async for piece in player.stream(KEY)]
+
+    pieces = asyncio.run(run())
+    assert pieces == ["How", " would", " you", "  cache", "\nthis?"]
+
+
+def test_timed_mode_waits_for_the_recorded_latency(tmp_path, monkeypatch):
+    path = str(tmp_path / "calls.jsonl")
+    record(path, entry("ok", seconds=1.5))
+    slept: List[float] = []
+
+    async def sleep(seconds: float) -> None:
+        slept.append(seconds)
+
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    assert asyncio.run(TranscriptPlayer(path, mode=REPLAY_TIMED).complete(KEY)) == "ok"
+    assert slept == [1.5]
+
+
+def test_unknown_replay_mode_is_rejected(tmp_path):
+    path = str(tmp_path / "calls.jsonl")
+    record(path)
+    with pytest.raises(ValueError):
+        TranscriptPlayer(path, mode="slow")
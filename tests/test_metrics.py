@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import pytest
+
+from utils.metrics import HISTOGRAM_BUCKETS, MetricsRegistry, metric_name
+
+
+def test_metric_names_are_sanitized():
+    assert metric_name("llm.calls-total") == "llm_calls_total"
+    assert metric_name("2xx") == "_2xx"
+
+
+def test_counters_and_gauges_render_per_label_set():
+    metrics = MetricsRegistry(namespace="test")
+    metrics.inc("requests_total", help="Requests", route="/a")
+    metrics.inc("requests_total", 2, route="/a")
+    metrics.inc("requests_total", route="/b")
+    metrics.set("sessions", 3)
+    lines = metrics.render().splitlines()
+    assert lines[:4] == [
+        "# HELP test_requests_total Requests",
+        "# TYPE test_requests_total counter",
+        'test_requests_total{route="/a"} 3',
+        'test_requests_total{route="/b"} 1',
+    ]
+    assert "# TYPE test_sessions gauge" in lines
+    assert "test_sessions 3" in lines
+
+
+def test_label_values_are_escaped():
+    metrics = MetricsRegistry(namespace="")
+    metrics.inc("errors", reason='bad "quote"\\\n')
+    assert 'errors{reason="bad \\"quote\\"\\\\\\n"} 1' in metrics.render()
+
+
+def test_histogram_renders_cumulative_buckets_sum_and_count():
+    metrics = MetricsRegistry(namespace="test")
+    for value in (0.003, 0.003, 0.2, 0.7, 500.0):
+        metrics.observe("latency_seconds", value, agent="interviewer")
+    lines = metrics.render().splitlines()
+    assert "# TYPE test_latency_seconds histogram" in lines
+    buckets = {}
+    for line in lines:
+        if line.startswith("test_latency_seconds_bucket"):
+            labels, count = line.rsplit(" ", 1)
+            buckets[labels.split('le="')[1].rstrip('"}')] = int(count)
+    assert len(buckets) == len(HISTOGRAM_BUCKETS) + 1
+    assert buckets["0.0025"] == 0
+    assert buckets["0.005"] == 2
+    assert buckets["0.25"] == 3
+    assert buckets["1"] == 4
+    assert buckets["120"] == 4
+    # Values past the last bound only show up in +Inf, which always equals the count
+    assert buckets["+Inf"] == 5
+    assert 'test_latency_seconds_count{agent="interviewer"} 5' in lines
+    total = next(line for line in lines if line.startswith("test_latency_seconds_sum"))
+    assert float(total.rsplit(" ", 1)[1]) == pytest.approx(500.906)
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = MetricsRegistry(namespace="test")
+    for i in range(200):
+        metrics.observe("latency_seconds", 0.001 * 1.05 ** i)
+    counts = [int(line.rsplit(" ", 1)[1]) for line in metrics.render().splitlines() if "_bucket" in line]
+    assert counts == sorted(counts)
+    assert counts[-1] == 200
+
+
+def test_a_name_keeps_its_kind():
+    metrics = MetricsRegistry(namespace="test")
+    metrics.inc("calls")
+    with pytest.raises(ValueError):
+        metrics.set("calls", 1)
+    with pytest.raises(ValueError):
+        metrics.observe("calls", 1.0)
+
+
+def test_collectors_run_before_rendering_and_failures_are_ignored():
+    metrics = MetricsRegistry(namespace="test")
+
+    def broken(registry: MetricsRegistry) -> None:
+        raise RuntimeError("collector failed")
+
+    metrics.add_collector(broken)
+    metrics.add_collector(lambda registry: registry.set("pool_size", 4))
+    assert "test_pool_size 4" in metrics.render().splitlines()
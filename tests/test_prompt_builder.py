@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import pytest
+
+from tools.prompt_builder import PromptBuilder, count_tokens, keywords, select_relevant, split_relevant
+
+OPENING = "Jane Roe\nSenior Backend Engineer"
+PAYMENTS = "Built a payments API in Python on PostgreSQL, tuning indexes and query plans for 2k requests per second."
+CACHING = "Cut p99 latency from 400 ms to 90 ms with Redis caching, connection pooling and request coalescing."
+FRONTEND = "Maintained a React dashboard with TypeScript, Storybook and a design system shared by four teams."
+HOBBIES = "Volunteers as a climbing instructor and organises a monthly board game night for the neighbourhood."
+RESUME = "\n\n".join([OPENING, PAYMENTS, CACHING, FRONTEND, HOBBIES])
+TERMS = {"python", "postgresql", "caching", "redis"}
+
+
+def tokens(*texts: str) -> int:
+    return sum(count_tokens(text) for text in texts)
+
+
+def test_keywords_drop_stopwords_and_split_compound_words():
+    words = keywords("Experience with Node.js and CI/CD on the AWS cloud")
+    assert {"node.js", "node", "js", "ci/cd", "ci", "cd", "aws", "cloud"} <= words
+    assert not words & {"experience", "with", "and", "on", "the"}
+
+
+def test_text_within_budget_is_kept_whole():
+    assert split_relevant(RESUME, TERMS, budget=10_000) == (RESUME, "")
+
+
+def test_opening_and_matching_chunks_are_kept_in_document_order():
+    budget = tokens(OPENING, PAYMENTS, CACHING)
+    kept, rest = split_relevant(RESUME, TERMS, budget)
+    assert kept == "\n".join([OPENING, PAYMENTS, CACHING])
+    assert rest == "\n\n".join([FRONTEND, HOBBIES])
+    assert select_relevant(RESUME, TERMS, budget) == kept
+
+
+def test_the_best_matching_chunk_wins_a_tight_budget():
+    kept, rest = split_relevant(RESUME, {"redis", "caching", "latency"}, tokens(OPENING, CACHING))
+    assert kept == "\n".join([OPENING, CACHING])
+    assert PAYMENTS in rest
+
+
+def test_unmatched_chunks_are_only_added_with_fill():
+    budget = tokens(OPENING, PAYMENTS, CACHING, FRONTEND, HOBBIES)
+    assert split_relevant(RESUME, TERMS, budget - 1)[0] == "\n".join([OPENING, PAYMENTS, CACHING])
+    kept, rest = split_relevant(RESUME, TERMS, tokens(OPENING, PAYMENTS, CACHING, FRONTEND), fill=True)
+    assert kept == "\n".join([OPENING, PAYMENTS, CACHING, FRONTEND])
+    assert rest == HOBBIES
+
+
+def test_prompt_within_budget_is_not_trimmed():
+    builder = PromptBuilder(agent="test", budget=10_000)
+    builder.add("You are an interviewer.\n\n").add_document("Resume", RESUME, TERMS).add("Ask one question.")
+    built = builder.build()
+    assert built.text == f"You are an interviewer.\n\nResume:\n{RESUME}\n\nAsk one question."
+    assert built.tokens == count_tokens(built.text)
+    assert built.tokens_saved == 0
+
+
+def test_oversized_prompt_keeps_fixed_parts_and_relevant_sections():
+    instructions = "Ask one question about the candidate's backend work."
+    budget = tokens(instructions, "Resume:\n\n\n", OPENING, PAYMENTS, CACHING) + 4
+    builder = PromptBuilder(agent="test", budget=budget)
+    built = builder.add_document("Resume", RESUME, TERMS).add(instructions).build()
+    assert built.text.endswith(instructions)
+    assert PAYMENTS in built.text and CACHING in built.text
+    assert HOBBIES not in built.text
+    assert built.tokens <= budget
+    untrimmed = count_tokens(f"Resume:\n{RESUME}\n\n{instructions}")
+    assert built.full_tokens == pytest.approx(untrimmed, abs=8)
+    assert built.tokens_saved == built.full_tokens - built.tokens > 0
+
+
+def test_max_tokens_caps_a_document_under_the_budget():
+    builder = PromptBuilder(agent="test", budget=10_000)
+    built = builder.add_document("Resume", RESUME, TERMS, max_tokens=tokens(OPENING, CACHING)).build()
+    assert OPENING in built.text
+    assert HOBBIES not in built.text
+    assert built.tokens < built.full_tokens
+
+
+def test_cacheable_parts_become_the_prefix():
+    builder = PromptBuilder(agent="test", budget=10_000)
+    builder.add("System rules.\n", cacheable=True).add("Question:\n")
+    builder.add("Candidate profile.\n", cacheable=True)
+    built = builder.build()
+    # The prefix always goes first, whatever order it was added in
+    assert built.prefix == "System rules.\nCandidate profile.\n"
+    assert built.text == "Question:\n"
+    assert built.tokens == count_tokens(built.prefix + built.text)
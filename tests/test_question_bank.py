@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import json
+
+from models import Topic
+from tools.question_bank import BankQuestion, QuestionBank, from_exports, role_terms, session_turn
+
+BACKEND = sorted(role_terms("Senior Backend Engineer"))
+
+
+def bank() -> QuestionBank:
+    return QuestionBank([
+        BankQuestion("How does the GIL affect threads?", "Python", 1, tags=["threads"], roles=BACKEND),
+        BankQuestion("When would you use asyncio?", "Python", 1, tags=["asyncio"], roles=BACKEND),
+        BankQuestion("How do you profile a slow service?", "Python", 1, tags=["profiling"], roles=BACKEND),
+        BankQuestion("What are Python decorators?", "Python", 1, tags=["syntax"], count=5),
+        BankQuestion("What is a list comprehension?", "Python", 0),
+        BankQuestion("How would you shard a queue?", "System Design", 2, tags=["queues"]),
+    ])
+
+
+def test_adding_a_known_question_merges_it():
+    questions = bank()
+    duplicate = BankQuestion("  what are python  DECORATORS? ", "python", 1, tags=["functions"], roles=["web"])
+    assert not questions.add(duplicate)
+    assert len(questions) == 6
+    merged = questions.questions[3]
+    assert merged.count == 6
+    assert merged.tags == ["syntax", "functions"]
+    assert merged.roles == ["web"]
+
+
+def test_role_match_ranks_before_frequency():
+    questions = bank()
+    best = {questions.lookup("Python", [], 1, role_terms("Backend Engineer"), turn=t) for t in range(3)}
+    assert best == {
+        "How does the GIL affect threads?",
+        "When would you use asyncio?",
+        "How do you profile a slow service?",
+    }
+    # Without a role the most often banked question comes first
+    assert questions.lookup("Python", [], 1, frozenset()) == "What are Python decorators?"
+
+
+def test_turn_rotates_within_the_best_tier():
+    questions = bank()
+    terms = role_terms("Backend Engineer")
+    picks = [questions.lookup("Python", [], 1, terms, turn=t) for t in range(4)]
+    assert len(set(picks[:3])) == 3
+    assert picks[3] == picks[0]
+
+
+def test_exclude_and_skip_fall_through_to_the_next_tier():
+    questions = bank()
+    terms = role_terms("Backend Engineer")
+    asked = ["how does the GIL affect threads?", "When would you use asyncio?"]
+    assert questions.lookup("Python", [], 1, terms, exclude=asked) == "How do you profile a slow service?"
+    result = questions.lookup("Python", [], 1, terms, exclude=asked, skip=lambda q: "profile" in q)
+    assert result == "What are Python decorators?"
+    assert questions.lookup("Python", [], 1, terms, skip=lambda q: True) is None
+
+
+def test_unknown_topic_matches_on_tags_and_depth():
+    questions = bank()
+    assert questions.lookup("Distributed Systems", ["queues"], 2, frozenset()) == "How would you shard a queue?"
+    assert questions.lookup("Distributed Systems", ["queues"], 1, frozenset()) is None
+    assert questions.lookup("Go", [], 0, frozenset()) is None
+
+
+def test_rankings_are_refreshed_after_an_add():
+    questions = bank()
+    assert questions.lookup("Python", [], 0, frozenset()) == "What is a list comprehension?"
+    questions.add(BankQuestion("What does the walrus operator do?", "Python", 0, count=3))
+    assert questions.lookup("Python", [], 0, frozenset()) == "What does the walrus operator do?"
+
+
+def test_session_turns_differ_by_session_and_advance_per_question():
+    assert session_turn("a", 1) == session_turn("a", 0) + 1
+    assert session_turn("a", 0) != session_turn("b", 0)
+
+
+def test_save_load_round_trip(tmp_path):
+    path = str(tmp_path / "bank" / "questions.json")
+    bank().save(path)
+    loaded = QuestionBank.load(path)
+    assert len(loaded) == 6
+    assert loaded.coverage() == {"Python": {1: 4, 0: 1}, "System Design": {2: 1}}
+
+
+def test_exports_are_banked_at_the_asked_depth(tmp_path):
+    path = tmp_path / "session.json"
+    path.write_text(json.dumps({
+        "target_role": "Data Engineer",
+        "interactions": [
+            {"topic": "Python", "depth": 2, "question": "How do generators save memory?"},
+            {"topic": "Python", "depth": 0, "question": "(unspecified)"},
+        ],
+    }))
+    entries = from_exports([str(path)], [Topic(name="Python", description="", tags=["iterators"])])
+    assert [(e.question, e.depth, e.tags, e.source) for e in entries] == [
+        ("How do generators save memory?", 2, ["iterators"], "transcript")
+    ]
+    assert entries[0].roles == sorted(role_terms("Data Engineer"))
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+from typing import List
+
+import pytest
+
+from tools import rate_limit
+from tools.rate_limit import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_EVALUATION,
+    PRIORITY_HINT,
+    PRIORITY_INTERACTIVE,
+    AdmissionController,
+    RateLimitError,
+    TokenBucket,
+    priority_for,
+)
+
+
+def test_priorities_follow_the_agent_prefix():
+    assert priority_for("evaluator") == PRIORITY_EVALUATION
+    assert priority_for("hints.stream") == PRIORITY_HINT
+    assert priority_for("interviewer.plan") == PRIORITY_INTERACTIVE
+
+
+def test_token_bucket_refills_at_its_rate(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    bucket = TokenBucket(per_minute=60, burst_seconds=10)
+    assert bucket.capacity == 10
+    bucket.take(10)
+    assert bucket.delay(1) == pytest.approx(1.0)
+    now[0] += 0.5
+    assert bucket.delay(1) == pytest.approx(0.5)
+    now[0] += 100
+    # Refills never go past the burst capacity, and oversized requests wait for a full bucket only
+    assert bucket.delay(50) == 0.0
+    assert bucket.level == 10
+
+
+def test_concurrency_cap_queues_until_release():
+    async def run() -> None:
+        controller = AdmissionController("test", max_concurrency=1)
+        await controller.acquire()
+        waiter = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        assert controller.waiting == 1
+        controller.release()
+        await asyncio.wait_for(waiter, 1)
+        assert controller.in_flight == 1
+        controller.release()
+        assert controller.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_waiters_are_served_by_priority_then_round_robin_across_sessions():
+    async def run() -> List[str]:
+        controller = AdmissionController("test", max_concurrency=1)
+        await controller.acquire()
+        order: List[str] = []
+
+        async def request(name: str, priority: int, session: str) -> None:
+            await controller.acquire(priority=priority, session=session)
+            order.append(name)
+            controller.release()
+
+        tasks = [
+            asyncio.ensure_future(request("a-background", PRIORITY_BACKGROUND, "a")),
+            asyncio.ensure_future(request("a1", PRIORITY_INTERACTIVE, "a")),
+            asyncio.ensure_future(request("a2", PRIORITY_INTERACTIVE, "a")),
+            asyncio.ensure_future(request("b1", PRIORITY_INTERACTIVE, "b")),
+            asyncio.ensure_future(request("c-eval", PRIORITY_EVALUATION, "c")),
+        ]
+        await asyncio.sleep(0.01)
+        controller.release()
+        await asyncio.wait_for(asyncio.gather(*tasks), 1)
+        return order
+
+    assert asyncio.run(run()) == ["c-eval", "a1", "b1", "a2", "a-background"]
+
+
+def test_queue_timeout_raises_and_frees_the_queue():
+    async def run() -> None:
+        controller = AdmissionController("test", max_concurrency=1, queue_timeout=0.02)
+        await controller.acquire()
+        with pytest.raises(RateLimitError):
+            await controller.acquire()
+        assert controller.waiting == 0
+
+    asyncio.run(run())
+
+
+def test_requests_per_minute_delay_admission():
+    async def run() -> None:
+        # 6 rpm holds one request of burst, so the second one has to wait ~10 s
+        controller = AdmissionController("test", requests_per_minute=6, queue_timeout=0.05)
+        await controller.acquire()
+        controller.release()
+        with pytest.raises(RateLimitError):
+            await controller.acquire()
+
+    asyncio.run(run())
+
+
+def test_try_acquire_refuses_when_full():
+    controller = AdmissionController("test", max_concurrency=2)
+    assert controller.try_acquire()
+    assert controller.try_acquire()
+    assert controller.in_flight == 2
+    assert not controller.try_acquire()
+    controller.release()
+    assert controller.try_acquire()
+
+
+def test_try_acquire_does_not_overtake_queued_requests():
+    async def run() -> None:
+        controller = AdmissionController("test", max_concurrency=1)
+        await controller.acquire()
+        queued = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0.01)
+        controller.max_concurrency = 2
+        # A slot is free now, but the queued request gets it first
+        assert not controller.try_acquire()
+        controller.release()
+        await asyncio.wait_for(queued, 1)
+        assert controller.in_flight == 1
+
+    asyncio.run(run())
+
+
+def test_try_acquire_is_charged_to_the_buckets():
+    controller = AdmissionController("test", requests_per_minute=6, tokens_per_minute=600)
+    assert controller.try_acquire(tokens=50)
+    controller.release()
+    # The one-request burst is used up
+    assert not controller.try_acquire(tokens=50)
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+from typing import List
+
+import pytest
+
+from tools import resilience
+from tools.resilience import CircuitBreaker, backoff_delay, hedge, is_retryable
+
+
+class StatusError(Exception):
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+@pytest.fixture
+def now(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: clock[0])
+    return clock
+
+
+def test_retryable_errors():
+    assert is_retryable(StatusError(503))
+    assert is_retryable(StatusError(429))
+    assert not is_retryable(StatusError(400))
+    assert is_retryable(asyncio.TimeoutError())
+    assert not is_retryable(ValueError("bad"))
+
+
+def test_backoff_delay_stays_under_the_capped_exponential():
+    for attempt in range(1, 8):
+        bound = min(2.0, 0.25 * 2 ** (attempt - 1))
+        for _ in range(50):
+            assert 0.0 <= backoff_delay(attempt, base=0.25, cap=2.0) <= bound
+
+
+def test_breaker_opens_after_consecutive_failures(now):
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_seconds=10)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    # A success in between resets the count
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_half_open_breaker_admits_one_probe_and_closes_on_success(now):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=10)
+    breaker.record_failure()
+    now[0] += 10
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_opens_the_breaker_again(now):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=10)
+    breaker.record_failure()
+    now[0] += 10
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    now[0] += 5
+    assert not breaker.allow()
+
+
+def test_released_probe_lets_the_next_call_probe(now):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=10)
+    breaker.record_failure()
+    now[0] += 10
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def make_call(delays: List[float], results: List[str], started: List[int]):
+    async def call() -> str:
+        index = len(started)
+        started.append(index)
+        await asyncio.sleep(delays[index])
+        return results[index]
+
+    return call
+
+
+def test_hedge_without_delay_makes_one_call():
+    started: List[int] = []
+    call = make_call([0.0], ["first"], started)
+    assert asyncio.run(hedge(call, None)) == "first"
+    assert started == [0]
+
+
+def test_fast_first_call_is_not_hedged():
+    started: List[int] = []
+    hedges: List[int] = []
+    call = make_call([0.0], ["first"], started)
+    assert asyncio.run(hedge(call, 0.05, on_hedge=lambda: hedges.append(1))) == "first"
+    assert started == [0]
+    assert hedges == []
+
+
+def test_slow_first_call_is_hedged_and_the_faster_result_wins():
+    started: List[int] = []
+    hedges: List[int] = []
+    call = make_call([1.0, 0.0], ["first", "second"], started)
+    assert asyncio.run(hedge(call, 0.02, on_hedge=lambda: hedges.append(1))) == "second"
+    assert started == [0, 1]
+    assert hedges == [1]
+
+
+def test_failed_hedge_falls_back_to_the_first_call():
+    started: List[int] = []
+
+    async def call() -> str:
+        index = len(started)
+        started.append(index)
+        if index == 1:
+            raise StatusError(503)
+        await asyncio.sleep(0.05)
+        return "first"
+
+    assert asyncio.run(hedge(call, 0.01)) == "first"
+    assert started == [0, 1]
+
+
+def test_refused_admission_skips_the_hedge():
+    started: List[int] = []
+    hedges: List[int] = []
+    released: List[int] = []
+    call = make_call([0.05], ["first"], started)
+    result = asyncio.run(
+        hedge(call, 0.01, on_hedge=lambda: hedges.append(1), admit=lambda: False, release=lambda: released.append(1))
+    )
+    assert result == "first"
+    assert started == [0]
+    assert hedges == []
+    assert released == []
+
+
+def test_admitted_hedge_is_released_when_cancelled():
+    started: List[int] = []
+    released: List[int] = []
+    call = make_call([0.03, 1.0], ["first", "second"], started)
+
+    async def run() -> str:
+        result = await hedge(call, 0.01, admit=lambda: True, release=lambda: released.append(1))
+        # Cancellation of the losing hedge completes on the next loop iterations
+        await asyncio.sleep(0.01)
+        return result
+
+    assert asyncio.run(run()) == "first"
+    assert started == [0, 1]
+    assert released == [1]
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+from agents.round_pipeline import RoundPipeline
+from utils.telemetry import Telemetry
+
+
+def sleeper(seconds: float, value: Any, log: List[str], name: str):
+    async def run(inputs: Dict[str, Any]) -> Any:
+        log.append(f"{name}:start")
+        await asyncio.sleep(seconds)
+        log.append(f"{name}:end")
+        return value
+
+    return run
+
+
+def test_unknown_dependency_is_rejected():
+    pipeline = RoundPipeline(Telemetry())
+    with pytest.raises(ValueError):
+        pipeline.add("hint", sleeper(0, None, [], "hint"), deps=("evaluate",))
+
+
+def test_dependents_receive_their_inputs_after_the_dependency_finishes():
+    log: List[str] = []
+    seen: Dict[str, Any] = {}
+
+    async def follow_up(inputs: Dict[str, Any]) -> str:
+        log.append("follow_up:start")
+        seen.update(inputs)
+        return "next question"
+
+    pipeline = RoundPipeline(Telemetry())
+    pipeline.add("evaluate", sleeper(0.02, {"score": 7}, log, "evaluate"))
+    pipeline.add("hint", sleeper(0.0, "hint", log, "hint"))
+    pipeline.add("follow_up", follow_up, deps=("evaluate",))
+    results = asyncio.run(pipeline.run())
+
+    assert results == {"evaluate": {"score": 7}, "hint": "hint", "follow_up": "next question"}
+    assert seen == {"evaluate": {"score": 7}}
+    # Independent steps run concurrently; the dependent one waits
+    assert log.index("hint:end") < log.index("evaluate:end") < log.index("follow_up:start")
+
+
+def test_timed_out_step_yields_none_and_its_dependents_still_run():
+    telemetry = Telemetry()
+    pipeline = RoundPipeline(telemetry, name="round")
+    log: List[str] = []
+    pipeline.add("topic", sleeper(1.0, "switch", log, "topic"), timeout=0.02)
+    pipeline.add("plan", lambda inputs: asyncio.sleep(0, result=inputs["topic"]), deps=("topic",))
+    results = asyncio.run(asyncio.wait_for(pipeline.run(), 0.5))
+
+    assert results == {"topic": None, "plan": None}
+    assert "topic:end" not in log
+    assert telemetry.counters["round_step_timeouts.topic"] == 1
+    assert telemetry.counters["round_step.topic_ms:count"] == 1
+
+
+def test_failed_step_yields_none_without_failing_the_round():
+    async def broken(inputs: Dict[str, Any]) -> Any:
+        raise RuntimeError("provider down")
+
+    telemetry = Telemetry()
+    pipeline = RoundPipeline(telemetry, name="round")
+    pipeline.add("hint", broken)
+    pipeline.add("evaluate", sleeper(0.0, 8.0, [], "evaluate"))
+    assert asyncio.run(pipeline.run()) == {"hint": None, "evaluate": 8.0}
+    assert telemetry.counters["round_step_failures.hint"] == 1
+    assert "round_critical_path_ms" in telemetry.summary()
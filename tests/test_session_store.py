@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import pytest
+
+from models import Evaluation
+from tools import session_store
+from tools.session_store import (
+    InMemorySessionStore,
+    SessionConflict,
+    SessionRecord,
+    SQLiteSessionStore,
+    dump_session,
+    load_session,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(session_store.time, "time", fake)
+    return fake
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        s = InMemorySessionStore(ttl_seconds=60.0)
+    else:
+        s = SQLiteSessionStore(str(tmp_path / "sessions.db"), ttl_seconds=60.0)
+    yield s
+    s.close()
+
+
+def test_put_then_get_round_trips(store, make_session):
+    session = make_session()
+    interaction = session.record_interaction("Python", "What is the GIL?", "A lock", depth=1)
+    session.attach_evaluation(interaction, Evaluation(score=6.0, brief_feedback="ok", strengths=["clear"]))
+    session.plan_questions("Python", 1, ["How does asyncio schedule tasks?"])
+    store.put(SessionRecord(session, pending_question="Next?"))
+
+    record = store.get(session.session_id)
+    assert record is not None
+    assert record.version == 1
+    assert record.pending_question == "Next?"
+    assert [i.question for i in record.session.interactions] == ["What is the GIL?"]
+    assert record.session.interactions[0].depth == 1
+    assert record.session.average_score == 6.0
+    assert record.session.question_pool == {("Python", 1): ["How does asyncio schedule tasks?"]}
+
+
+def test_get_returns_an_independent_copy(store, make_session):
+    session = make_session()
+    store.put(SessionRecord(session))
+
+    first = store.get(session.session_id)
+    first.session.record_interaction("Python", "Unsaved?", "never saved")
+    first.pending_question = "changed"
+
+    second = store.get(session.session_id)
+    assert second.session is not first.session
+    assert second.session.interactions == []
+    assert second.pending_question is None
+
+
+def test_stale_put_raises_conflict(store, make_session):
+    session = make_session()
+    store.put(SessionRecord(session))
+    a = store.get(session.session_id)
+    b = store.get(session.session_id)
+
+    a.pending_question = "from a"
+    store.put(a)
+    assert a.version == 2
+    with pytest.raises(SessionConflict):
+        store.put(b)
+
+    latest = store.get(session.session_id)
+    assert latest.version == 2
+    assert latest.pending_question == "from a"
+
+
+def test_saving_twice_keeps_bumping_the_version(store, make_session):
+    session = make_session()
+    record = SessionRecord(session)
+    store.put(record)
+    store.put(record)
+    assert record.version == 2
+    assert store.get(session.session_id).version == 2
+
+
+def test_new_record_for_existing_session_conflicts(store, make_session):
+    session = make_session()
+    store.put(SessionRecord(session))
+    with pytest.raises(SessionConflict):
+        store.put(SessionRecord(session))
+
+
+def test_idle_sessions_expire(store, make_session, clock):
+    session = make_session()
+    store.put(SessionRecord(session))
+    clock.now += 30
+    assert store.get(session.session_id) is not None
+    clock.now += 61
+    assert store.get(session.session_id) is None
+    assert not store.exists(session.session_id)
+
+
+def test_evict_idle(store, make_session, clock):
+    old, fresh = make_session(), make_session()
+    store.put(SessionRecord(old))
+    clock.now += 100
+    store.put(SessionRecord(fresh))
+    assert store.evict_idle(50) == 1
+    assert store.count() == 1
+    assert store.exists(fresh.session_id)
+
+
+def test_sqlite_workers_see_each_others_saves(tmp_path, make_session):
+    path = str(tmp_path / "sessions.db")
+    first, second = SQLiteSessionStore(path), SQLiteSessionStore(path)
+    session = make_session()
+    first.put(SessionRecord(session))
+    # Both workers now hold version 1 in their caches
+    assert first.get(session.session_id).version == 1
+    mine = second.get(session.session_id)
+
+    theirs = first.get(session.session_id)
+    theirs.session.record_interaction("Python", "Saved by the first worker", "yes")
+    first.put(theirs)
+
+    with pytest.raises(SessionConflict):
+        second.put(mine)
+    reloaded = second.get(session.session_id)
+    assert reloaded.version == 2
+    assert [i.question for i in reloaded.session.interactions] == ["Saved by the first worker"]
+    first.close()
+    second.close()
+
+
+def test_dumped_state_does_not_share_lists(make_session):
+    session = make_session()
+    session.plan_questions("Python", 0, ["q1", "q2"])
+    state = dump_session(session)
+    session.take_planned_question("Python", 0, threshold=0)
+    assert load_session(state).question_pool == {("Python", 0): ["q1", "q2"]}
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from utils.similarity import SimilarityIndex, jaccard, shingles, signature
+
+GIL = "How does the GIL affect multithreaded Python programs?"
+
+
+def test_shingles_ignore_stopwords_and_question_stems():
+    assert shingles("How would you explain the GIL?") == frozenset({"gil"})
+    assert shingles("Tell me about caching layers") == frozenset({"caching", "layers", "caching layers"})
+    assert shingles("How would you do it?") == frozenset()
+
+
+def test_signature_is_stable_and_estimates_jaccard():
+    a = "Design a rate limiter for a public API with per-user quotas and burst handling"
+    b = "Design a rate limiter for a public API with per-tenant quotas and burst handling"
+    assert signature(a) == signature(a)
+    estimate = sum(x == y for x, y in zip(signature(a), signature(b))) / len(signature(a))
+    assert abs(estimate - jaccard(shingles(a), shingles(b))) < 0.25
+
+
+def test_rephrased_question_matches_and_unrelated_one_does_not():
+    index = SimilarityIndex()
+    index.add(GIL)
+    index.add("Design a URL shortener that handles 10k writes per second.")
+    match = index.match("How does the GIL affect multithreaded Python programs in practice?")
+    assert match is not None
+    assert match[0] == GIL
+    assert match[1] >= 0.6
+    assert index.match("What are Python decorators used for?") is None
+
+
+def test_threshold_decides_a_borderline_match():
+    index = SimilarityIndex()
+    index.add(GIL)
+    other = "How does the Python GIL affect multithreaded programs?"
+    score = jaccard(shingles(GIL), shingles(other))
+    assert 0.6 < score < 0.7
+    assert index.match(other, threshold=0.7) is None
+    assert index.match(other) == (GIL, score)
+
+
+def test_best_match_wins():
+    index = SimilarityIndex()
+    index.add("How does the GIL affect Python threads?")
+    index.add(GIL)
+    assert index.match(GIL) == (GIL, 1.0)
+
+
+def test_text_without_content_words_never_matches():
+    index = SimilarityIndex()
+    index.add("How would you do it?")
+    assert index.match("How would you do it?") is None
+
+
+def test_clear_empties_the_index():
+    index = SimilarityIndex()
+    index.add(GIL)
+    index.clear()
+    assert len(index) == 0
+    assert index.match(GIL) is None
+
+
+def test_session_checks_against_every_asked_question(make_session):
+    session = make_session()
+    session.record_interaction("Python", GIL, "It serializes bytecode")
+    for i in range(12):
+        session.record_interaction("System Design", f"Design system number {i} with sharding", "...")
+    assert GIL not in session.recent_questions()
+    rephrased = "How does the GIL affect multithreaded Python programs in practice?"
+    assert session.similar_question(rephrased) == GIL
+    # A threshold of 0 turns the check off
+    assert session.similar_question(rephrased, threshold=0) is None
+
+
+def test_planned_near_duplicates_are_skipped(make_session):
+    session = make_session()
+    session.record_interaction("Python", GIL, "It serializes bytecode")
+    session.plan_questions("Python", 1, ["How does the GIL affect multithreaded Python programs in practice?"])
+    session.plan_questions("Python", 1, ["What is a GIL?"])
+    assert session.take_planned_question("Python", 1) == "What is a GIL?"
+
+
+def test_without_similarity_only_exact_recent_repeats_are_skipped(make_session):
+    session = make_session()
+    session.record_interaction("Python", GIL, "It serializes bytecode")
+    rephrased = "How does the GIL affect multithreaded Python programs in practice?"
+    session.plan_questions("Python", 1, [GIL, rephrased])
+    assert session.take_planned_question("Python", 1, threshold=0) == rephrased
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Set
+import re
+import zlib
+
+from models import Evaluation
+from tools.prompt_builder import count_tokens, keywords, select_relevant
+
+
+# Local checks run on every answer before the evaluator: answers that are obviously not an attempt get a
+# canned low score without an LLM call, and very long ones are cut to the most relevant sentences.
+MIN_WORDS = 3
+# Short answers sharing no keyword with the question or topic are treated as off topic
+OFF_TOPIC_MAX_WORDS = 5
+# zlib output under this share of the input means the text is mostly one pattern repeated
+MIN_COMPRESSION_RATIO = 0.12
+REPETITION_MIN_CHARS = 200
+# Distinct words among the first REPETITION_WINDOW; natural text stays well above this at that length
+MIN_DISTINCT_WORDS = 0.15
+REPETITION_MIN_WORDS = 40
+REPETITION_WINDOW = 300
+# The character checks only look at the start of the answer, so huge pastes cost the same as short ones
+SAMPLE_CHARS = 4000
+# Letters (any script) among non-space characters; below this it is symbols, digits or binary noise
+MIN_LETTER_SHARE = 0.5
+
+_WORD_RE = re.compile(r"\S+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_FOLLOW_UP = "Could you share a concrete example, including metrics and tradeoffs?"
+_CONDENSED = "[... answer condensed for evaluation ...]"
+
+
+@dataclass
+class Screening:
+    # result: "passed", "condensed", or why the answer was scored locally
+    result: str
+    # Text to send to the evaluator; the recorded answer is never changed
+    answer: str
+    evaluation: Optional[Evaluation] = None
+    # Canned coaching hint for locally scored answers, so the hints agent does not call the LLM either
+    hint: str = ""
+
+
+def screen_answer(
+    question: str, answer: str, topic: str = "", token_budget: int = 0, checks: bool = True
+) -> Screening:
+    # checks=False only keeps the empty-answer rule and the token budget
+    text = answer.strip()
+    if not text:
+        return _scored(
+            "empty", answer, 1.0, "No answer provided.", "Provide a specific, detailed answer",
+            "Start with one concrete project: what you built, how, and the result.",
+        )
+    if checks:
+        result = _garbage(question, text, topic)
+        if result is not None:
+            return result
+    if token_budget > 0 and count_tokens(text) > token_budget:
+        return Screening("condensed", condense(text, keywords(question, topic), token_budget))
+    return Screening("passed", answer)
+
+
+def condense(text: str, terms: Set[str], budget: int) -> str:
+    # The opening sentence plus the sentences sharing the most terms with the question, in their original
+    # order; one sentence longer than the whole budget is cut instead
+    sentences = "\n\n".join(s.strip() for s in _SENTENCE_RE.split(text) if s.strip())
+    kept = select_relevant(sentences, terms, budget).replace("\n", " ")
+    if not kept:
+        kept = text[: budget * 4]
+    return f"{kept} {_CONDENSED}"
+
+
+def _garbage(question: str, text: str, topic: str) -> Optional[Screening]:
+    sample = text[:SAMPLE_CHARS]
+    visible = len(sample) - sum(map(str.isspace, sample))
+    if sum(map(str.isalpha, sample)) < MIN_LETTER_SHARE * visible:
+        return _scored(
+            "not_text", text, 1.0, "Answer is not readable text.", "Answer in plain sentences",
+            "Describe your approach in plain sentences.",
+        )
+    if len(sample) >= REPETITION_MIN_CHARS:
+        raw = sample.encode("utf-8")
+        if len(zlib.compress(raw)) < MIN_COMPRESSION_RATIO * len(raw):
+            return _repetitive(text)
+    words = _WORD_RE.findall(text)
+    if len(words) < MIN_WORDS:
+        return _scored(
+            "too_short", text, 1.5, "Answer too short to evaluate.", "Explain your reasoning in full sentences",
+            "Expand into a few sentences: the context, what you did, and the outcome.",
+        )
+    window = words[:REPETITION_WINDOW]
+    if len(window) >= REPETITION_MIN_WORDS and len({w.lower() for w in window}) < MIN_DISTINCT_WORDS * len(window):
+        return _repetitive(text)
+    if len(words) < OFF_TOPIC_MAX_WORDS and not keywords(text) & keywords(question, topic):
+        return _scored(
+            "off_topic", text, 2.0, "Answer does not address the question.", "Address the question that was asked",
+            "Re-read the question and answer it directly with one example.",
+        )
+    return None
+
+
+def _repetitive(text: str) -> Screening:
+    return _scored(
+        "repetitive", text, 1.0, "Answer is mostly repeated text.", "Write an actual answer",
+        "Replace the repeated text with one concrete example and its result.",
+    )
+
+
+def _scored(result: str, answer: str, score: float, feedback: str, improvement: str, hint: str) -> Screening:
+    evaluation = Evaluation(
+        score=score,
+        brief_feedback=feedback,
+        strengths=[],
+        improvements=[improvement],
+        follow_up_question=_FOLLOW_UP,
+    )
+    return Screening(result, answer, evaluation, hint)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+from models import InterviewSession
+from agents.orchestrator_agent import OrchestratorAgent
+from agents.registry import AgentRegistry
+from parsers import parse_resume, parse_job_description, load_topics
+from tools.llm_client import LLMClient
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm", "r", encoding="utf-8") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        import resource
+        # ru_maxrss is a peak value (KiB on Linux, bytes on macOS); good enough as a fallback
+        return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss) * 1024
+
+
+def _per_session_orchestrator() -> OrchestratorAgent:
+    # Pre-registry behaviour: four fresh agents per session, each with its own LLMClient preflight
+    registry = AgentRegistry()
+    for agent in registry.agents():
+        agent.llm = LLMClient()
+    return OrchestratorAgent(registry=registry)
+
+
+async def _create_sessions(n: int, mode: str) -> Dict[str, Any]:
+    candidate_name, resume_text = parse_resume("data/sample_resume.txt")
+    target_role, jd_text = parse_job_description("data/sample_job_description.txt")
+    topics = load_topics("data/sample_topics.json", resume_text, jd_text)
+    make = _per_session_orchestrator if mode == "per_session" else OrchestratorAgent
+
+    # Warm up shared singletons so they are not charged to the first session
+    OrchestratorAgent()
+    keep: List[Any] = []
+    rss_before = _rss_bytes()
+    tracemalloc.start()
+    latencies: List[float] = []
+    for _ in range(n):
+        start = time.perf_counter()
+        session = InterviewSession.new(
+            candidate_name=candidate_name,
+            target_role=target_role,
+            resume_text=resume_text,
+            job_description_text=jd_text,
+            topics=topics,
+        )
+        orch = make()
+        await orch.start_session(session)
+        latencies.append((time.perf_counter() - start) * 1e6)
+        keep.append((session, orch))
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = _rss_bytes()
+    latencies.sort()
+    return {
+        "mode": mode,
+        "sessions": n,
+        "create_us_p50": round(latencies[len(latencies) // 2], 2),
+        "create_us_p99": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 2),
+        "create_us_mean": round(sum(latencies) / len(latencies), 2),
+        "traced_bytes_per_session": round(traced / n, 1),
+        "rss_bytes_per_session": round((rss_after - rss_before) / n, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Session creation latency and memory: shared vs per-session agents")
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--mode", choices=["shared", "per_session", "both"], default="both")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    if args.mode != "both":
+        print(json.dumps(asyncio.run(_create_sessions(args.sessions, args.mode))))
+        return
+    # Each mode runs in a fresh interpreter so RSS deltas do not bleed into each other
+    results = []
+    for mode in ("per_session", "shared"):
+        out = subprocess.run(
+            [sys.executable, "-m", "tools.bench_sessions", "--sessions", str(args.sessions), "--mode", mode],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,7 @@ def session_to_dict(session: InterviewSession) -> dict[str, Any]:
         "interactions": [
             {
                 "topic": i.topic,
+                "depth": i.depth,
                 "question": i.question,
                 "answer": i.answer,
                 "evaluation": (
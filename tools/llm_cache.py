@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+# The disk tier is trimmed back to max_disk_entries every this many writes, not after each one: counting
+# the rows scans the whole table, and the table may be shared with other workers, so a running count in
+# one process would drift. Between trims it can exceed the limit by this many rows per process.
+DISK_PRUNE_EVERY = 256
+
+
+def make_cache_key(
+    provider: str,
+    model: str,
+    system_prompt: str,
+    messages: List[Any],
+    temperature: float,
+) -> str:
+    payload = json.dumps(
+        {
+            "p": provider,
+            "m": model,
+            "s": system_prompt,
+            "msgs": [[m.role, m.content] for m in messages],
+            "t": round(float(temperature), 4),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    # Two-tier cache: in-memory LRU in front of an optional SQLite table, both with TTL
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 3600.0,
+        db_path: Optional[str] = None,
+        max_disk_entries: int = 50000,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max(1, max_disk_entries)
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {
+            "hits_memory": 0,
+            "hits_disk": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+            "expired": 0,
+        }
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_writes = 0
+        if db_path:
+            try:
+                self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("PRAGMA synchronous=NORMAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_cache ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                    "expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS llm_cache_access ON llm_cache(last_access)")
+            except Exception as e:
+                logger.warning(f"LLM disk cache disabled ({db_path}): {e}")
+                self._db = None
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at >= now:
+                    self._memory.move_to_end(key)
+                    self.counters["hits_memory"] += 1
+                    return value
+                del self._memory[key]
+                self.counters["expired"] += 1
+            value = self._disk_get(key, now)
+            if value is not None:
+                self.counters["hits_disk"] += 1
+                self._memory_put(key, value, now + self.ttl_seconds)
+                return value
+            self.counters["misses"] += 1
+            return None
+
+    def put(self, key: str, value: str) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self.counters["writes"] += 1
+            self._memory_put(key, value, expires_at)
+            self._disk_put(key, value, expires_at)
+
+    def _memory_put(self, key: str, value: str, expires_at: float) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def _disk_get(self, key: str, now: float) -> Optional[str]:
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self.counters["expired"] += 1
+                return None
+            self._db.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            return row[0]
+        except Exception as e:
+            logger.warning(f"LLM disk cache read failed: {e}")
+            return None
+
+    def _disk_put(self, key: str, value: str, expires_at: float) -> None:
+        if self._db is None:
+            return
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, time.time()),
+            )
+            self._disk_writes += 1
+            if self._disk_writes % DISK_PRUNE_EVERY:
+                return
+            (count,) = self._db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+            overflow = count - self.max_disk_entries
+            if overflow > 0:
+                self._db.execute(
+                    "DELETE FROM llm_cache WHERE key IN "
+                    "(SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self.counters["evictions"] += overflow
+        except Exception as e:
+            logger.warning(f"LLM disk cache write failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            out = dict(self.counters)
+            out["memory_entries"] = len(self._memory)
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache")
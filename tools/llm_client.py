@@ -1,12 +1,38 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, AsyncIterator
+from contextlib import asynccontextmanager, contextmanager
 import asyncio
 import json
+import time
+import weakref
 
-from utils.config import load_config
+from utils.config import AppConfig, load_config
 from utils.logging import get_logger
+from utils.metrics import MetricsRegistry, get_metrics
+from tools.llm_cache import ResponseCache, make_cache_key
+from tools.llm_transcript import (
+    TranscriptEntry,
+    TranscriptError,
+    TranscriptMiss,
+    TranscriptPlayer,
+    TranscriptRecorder,
+    prompt_key,
+)
+from tools.mock_llm import get_mock_provider
+from tools.prompt_builder import count_tokens
+from tools.rate_limit import AdmissionController, RateLimitError, get_admission_controller, priority_for
+from tools.resilience import (
+    REQUEST_ERROR_STATUS,
+    CircuitBreaker,
+    LatencyTracker,
+    backoff_delay,
+    get_circuit_breaker,
+    hedge,
+    is_retryable,
+    status_code_of,
+)
 try:
     from dotenv import load_dotenv, find_dotenv
     load_dotenv(find_dotenv(), override=False)
@@ -21,118 +47,947 @@ logger = get_logger(__name__)
 class ChatMessage:
     role: str
     content: str
+    # Marks the end of a stable prompt prefix the provider may cache (Anthropic cache_control;
+    # OpenAI caches identical prefixes automatically, so there it only documents the layout)
+    cache: bool = False
 
 
 class LLMError(Exception):
+    def __init__(self, message: str, status_code: Optional[int] = None, retryable: bool = False):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+
+    @staticmethod
+    def wrap(error: BaseException) -> "LLMError":
+        if isinstance(error, LLMError):
+            return error
+        code = status_code_of(error)
+        return LLMError(str(error) or type(error).__name__, status_code=code, retryable=is_retryable(error, code))
+
+
+class CircuitOpenError(LLMError):
     pass
 
 
+class ProviderClientPool:
+    # Process-wide provider SDK clients sharing pooled keep-alive HTTP connections
+    def __init__(self, config: AppConfig):
+        self.config = config
+        # provider -> (weak ref to the event loop, SDK client); httpx pools are bound to the loop that created
+        # them. A weak ref rather than id(loop): ids are reused once a finished loop is garbage collected
+        self._clients: Dict[str, tuple[weakref.ref, Any]] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _stat(self, provider: str) -> Dict[str, int]:
+        return self._stats.setdefault(
+            provider, {"clients_created": 0, "requests": 0, "in_flight": 0, "peak_in_flight": 0}
+        )
+
+    def _http_client(self) -> Any:
+        import httpx
+        limits = httpx.Limits(
+            max_connections=self.config.llm_max_connections,
+            max_keepalive_connections=self.config.llm_max_keepalive_connections,
+            keepalive_expiry=self.config.llm_keepalive_expiry_seconds,
+        )
+        return httpx.AsyncClient(limits=limits, timeout=self.config.request_timeout_seconds)
+
+    def _create(self, provider: str) -> Any:
+        if provider == "openai":
+            import openai
+            # Retries are handled (and classified) by LLMClient; SDK-level retries would multiply them
+            return openai.AsyncOpenAI(
+                api_key=self.config.openai_api_key, http_client=self._http_client(), max_retries=0
+            )
+        if provider == "anthropic":
+            from anthropic import AsyncAnthropic
+            return AsyncAnthropic(api_key=self.config.anthropic_api_key, http_client=self._http_client(), max_retries=0)
+        raise LLMError(f"Unsupported provider: {provider}")
+
+    def get(self, provider: str) -> Any:
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(provider)
+        if entry is not None:
+            owner, old = entry
+            if owner() is loop and not loop.is_closed():
+                return old
+            # The client belongs to another (usually finished) loop; release its connections before replacing it
+            loop.create_task(_close_quietly(old))
+        client = self._create(provider)
+        self._clients[provider] = (weakref.ref(loop), client)
+        self._stat(provider)["clients_created"] += 1
+        return client
+
+    @contextmanager
+    def lease(self, provider: str):
+        stat = self._stat(provider)
+        stat["requests"] += 1
+        stat["in_flight"] += 1
+        stat["peak_in_flight"] = max(stat["peak_in_flight"], stat["in_flight"])
+        try:
+            yield self.get(provider)
+        finally:
+            stat["in_flight"] -= 1
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {provider: dict(values) for provider, values in self._stats.items()}
+
+    async def aclose(self) -> None:
+        for _, client in list(self._clients.values()):
+            try:
+                await client.close()
+            except Exception:
+                pass
+        self._clients.clear()
+
+
+async def _close_quietly(client: Any) -> None:
+    # Sockets of a closed loop can fail to close cleanly; the pool is marked closed either way
+    try:
+        await client.close()
+    except Exception as e:
+        logger.debug(f"Closing a replaced provider client failed: {e}")
+
+
+_shared_pool: Optional[ProviderClientPool] = None
+_shared_client: Optional["LLMClient"] = None
+_shared_cache: Optional[ResponseCache] = None
+
+
+def get_provider_pool() -> ProviderClientPool:
+    global _shared_pool
+    if _shared_pool is None:
+        _shared_pool = ProviderClientPool(load_config())
+        get_metrics().add_collector(collect_llm_metrics)
+    return _shared_pool
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    global _shared_cache
+    if _shared_cache is None:
+        cfg = load_config()
+        if not cfg.llm_cache_enabled:
+            return None
+        _shared_cache = ResponseCache(
+            max_entries=cfg.llm_cache_max_entries,
+            ttl_seconds=cfg.llm_cache_ttl_seconds,
+            db_path=cfg.llm_cache_db_path,
+            max_disk_entries=cfg.llm_cache_max_disk_entries,
+        )
+    return _shared_cache
+
+
+def get_llm_client() -> "LLMClient":
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = LLMClient()
+    return _shared_client
+
+
+def record_llm_stats(telemetry: Any) -> None:
+    for provider, values in get_provider_pool().stats().items():
+        for key, value in values.items():
+            telemetry.set_gauge(f"llm_pool.{provider}.{key}", float(value))
+    cache = get_response_cache()
+    if cache is not None:
+        for key, value in cache.stats().items():
+            telemetry.set_gauge(f"llm_cache.{key}", float(value))
+    if _shared_client is not None:
+        for agent, ratio in _shared_client.cached_token_ratios().items():
+            telemetry.set_gauge(f"llm_cached_token_ratio.{agent}", round(ratio, 4))
+        for agent, counts in _shared_client.route_counts().items():
+            for target, count in counts.items():
+                telemetry.set_gauge(f"llm_route.{agent}.{target}", float(count))
+
+
+def collect_llm_metrics(metrics: MetricsRegistry) -> None:
+    for provider, values in get_provider_pool().stats().items():
+        for key, value in values.items():
+            metrics.set(f"llm_pool_{key}", value, help="Provider connection pool statistics", provider=provider)
+    cache = get_response_cache()
+    if cache is not None:
+        for key, value in cache.stats().items():
+            metrics.set(f"llm_cache_{key}", value, help="Response cache statistics")
+    if _shared_client is not None:
+        for agent, ratio in _shared_client.cached_token_ratios().items():
+            metrics.set(
+                "llm_cached_token_ratio",
+                ratio,
+                help="Share of prompt tokens read from the provider prompt cache",
+                agent=agent,
+            )
+
+
+@dataclass(frozen=True)
+class RouteTarget:
+    provider: str
+    model: str
+
+    @property
+    def name(self) -> str:
+        return f"{self.provider}:{self.model}"
+
+    @staticmethod
+    def parse(spec: str) -> "RouteTarget":
+        if ":" in spec:
+            provider, model = spec.split(":", 1)
+        else:
+            provider, model = "openai", spec
+        return RouteTarget(provider.strip().lower(), model.strip())
+
+
+@dataclass
+class _Call:
+    # One agent call across targets and attempts
+    agent: str
+    session_id: Optional[str]
+    priority: int
+    start: float = field(default_factory=time.perf_counter)
+    queued: float = 0.0
+    first_token: Optional[float] = None
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start - self.queued
+
+
 class LLMClient:
-    def __init__(self):
+    def __init__(self, pool: Optional[ProviderClientPool] = None):
         self.config = load_config()
-        self._provider, self._model = self._parse_model_preference(self.config.model_preference)
-        self._ready: bool = True
-        self._unavailable_reason: Optional[str] = None
-        # Preflight dependency and credential checks to avoid noisy retries
+        self.pool = pool or get_provider_pool()
+        self.cache = get_response_cache()
+        self._default = RouteTarget.parse(self.config.model_preference)
+        self.latency = LatencyTracker(min_samples=self.config.llm_hedge_min_samples)
+        # agent -> [prompt tokens, of which served from the provider's prompt cache]
+        self._prompt_tokens: Dict[str, List[int]] = {}
+        self._routes: Dict[str, List[RouteTarget]] = {}
+        # target -> reason it cannot be used (None when ready), checked once per target
+        self._unavailable: Dict[RouteTarget, Optional[str]] = {}
+        # agent -> target name -> calls it served
+        self._route_counts: Dict[str, Dict[str, int]] = {}
+        self.recorder: Optional[TranscriptRecorder] = None
+        self.player: Optional[TranscriptPlayer] = None
+        if self.config.llm_transcript_replay:
+            self.player = TranscriptPlayer(self.config.llm_transcript_replay, self.config.llm_transcript_replay_mode)
+        elif self.config.llm_transcript_record:
+            self.recorder = TranscriptRecorder(self.config.llm_transcript_record)
+        self._preflight(self._default)
+
+    @property
+    def provider(self) -> str:
+        return self._default.provider
+
+    @property
+    def model(self) -> str:
+        return self._default.model
+
+    def model_for(self, agent: str) -> str:
+        return self.routes(agent)[0].model
+
+    def _preflight(self, target: RouteTarget) -> Optional[str]:
+        # Dependency and credential checks to avoid noisy retries
+        if target in self._unavailable:
+            return self._unavailable[target]
+        reason: Optional[str] = None
         try:
-            if self._provider == "openai":
+            if target.provider == "openai":
                 if not self.config.openai_api_key:
-                    self._ready = False
-                    self._unavailable_reason = "missing_openai_api_key"
+                    reason = "missing_openai_api_key"
                 else:
                     try:
                         import openai  # noqa: F401
                     except Exception:
-                        self._ready = False
-                        self._unavailable_reason = "missing_openai_package"
-            elif self._provider == "anthropic":
+                        reason = "missing_openai_package"
+            elif target.provider == "anthropic":
                 if not self.config.anthropic_api_key:
-                    self._ready = False
-                    self._unavailable_reason = "missing_anthropic_api_key"
+                    reason = "missing_anthropic_api_key"
                 else:
                     try:
                         from anthropic import AsyncAnthropic  # noqa: F401
                     except Exception:
-                        self._ready = False
-                        self._unavailable_reason = "missing_anthropic_package"
+                        reason = "missing_anthropic_package"
+            elif target.provider == "mock":
+                # Local and credential-free; see tools/mock_llm.py
+                pass
+            else:
+                reason = f"unsupported_provider:{target.provider}"
         except Exception as e:
             # Any unexpected preflight error => mark as unavailable
-            self._ready = False
-            self._unavailable_reason = f"preflight_error:{e}"
+            reason = f"preflight_error:{e}"
+        self._unavailable[target] = reason
         # One-time preflight log (no secrets)
-        status = "ready" if self._ready else f"unavailable:{self._unavailable_reason}"
-        logger.info(f"LLM preflight provider={self._provider} model={self._model} status={status}")
+        status = "ready" if reason is None else f"unavailable:{reason}"
+        logger.info(f"LLM preflight provider={target.provider} model={target.model} status={status}")
+        return reason
 
-    @staticmethod
-    def _parse_model_preference(pref: str) -> tuple[str, str]:
-        if ":" in pref:
-            provider, model = pref.split(":", 1)
-        else:
-            provider, model = "openai", pref
-        return provider, model
-
-    async def acomplete(self, system_prompt: str, messages: List[ChatMessage], temperature: float = 0.2) -> str:
-        if not self._ready:
-            reason = self._unavailable_reason or "provider_unavailable"
-            logger.info(f"LLM provider unavailable: {reason}. Using fallback.")
-            raise LLMError(reason)
-        max_retries = self.config.max_retries
+    def routes(self, agent: str) -> List[RouteTarget]:
+        # Configured targets for an agent, in priority order
+        routes = self._routes.get(agent)
+        if routes is None:
+            specs = self.config.route(agent)
+            routes = list(dict.fromkeys(RouteTarget.parse(s) for s in specs)) or [self._default]
+            self._routes[agent] = routes
+        return routes
+
+    def _candidates(self, agent: str) -> List[RouteTarget]:
+        targets = [t for t in self.routes(agent) if self._preflight(t) is None]
+        if self.config.llm_routing_strategy != "latency" or len(targets) < 2:
+            return targets
+        # Lowest recent latency first; targets without enough samples sort first so each gets measured
+        min_samples = self.config.llm_route_min_samples
+        order = {t: i for i, t in enumerate(targets)}
+
+        def key(t: RouteTarget) -> tuple[float, int]:
+            average = self.latency.average(t.name, min_samples)
+            return (average if average is not None else 0.0, order[t])
+
+        return sorted(targets, key=key)
+
+    def _no_route(self, agent: str) -> LLMError:
+        reason = self._preflight(self.routes(agent)[0]) or "provider_unavailable"
+        logger.info(f"LLM provider unavailable: {reason}. Using fallback.")
+        self._count(self.routes(agent)[0], agent, "unavailable")
+        return LLMError(reason)
+
+    def _attempts(self, targets: List[RouteTarget], i: int) -> int:
+        # Retries are spent on the last target; earlier ones hand over quickly to the next
+        if i == len(targets) - 1:
+            return self.config.max_retries
+        return max(1, min(self.config.max_retries, self.config.llm_failover_attempts))
+
+    async def acomplete(
+        self,
+        system_prompt: str,
+        messages: List[ChatMessage],
+        temperature: float = 0.2,
+        use_cache: bool = True,
+        agent: str = "unknown",
+        session_id: Optional[str] = None,
+        priority: Optional[int] = None,
+    ) -> str:
+        cache_key = None
+        if self.cache is not None and use_cache:
+            primary = self.routes(agent)[0]
+            cache_key = make_cache_key(primary.provider, primary.model, system_prompt, messages, temperature)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self._count(primary, agent, "cache_hit")
+                return cached
+        result = await self._acomplete_uncached(system_prompt, messages, temperature, agent, session_id, priority)
+        if cache_key is not None and result:
+            self.cache.put(cache_key, result)
+        return result
+
+    async def _acomplete_uncached(
+        self,
+        system_prompt: str,
+        messages: List[ChatMessage],
+        temperature: float,
+        agent: str = "unknown",
+        session_id: Optional[str] = None,
+        priority: Optional[int] = None,
+    ) -> str:
+        if self.player is not None:
+            return await self._replay(system_prompt, messages, temperature, agent)
+        targets = self._candidates(agent)
+        if not targets:
+            raise self._no_route(agent)
+        call = _Call(agent, session_id, priority_for(agent) if priority is None else priority)
+        for i, target in enumerate(targets):
+            try:
+                result = await self._complete_on(
+                    target, system_prompt, messages, temperature, call, self._attempts(targets, i)
+                )
+            except LLMError as e:
+                if i == len(targets) - 1:
+                    self._record(call, target, system_prompt, messages, temperature, "", e)
+                    raise
+                self._failover(agent, target, targets[i + 1], e)
+                continue
+            self._routed(agent, target)
+            self._record(call, target, system_prompt, messages, temperature, result)
+            return result
+        raise LLMError("no attempts made")
+
+    async def _complete_on(
+        self,
+        target: RouteTarget,
+        system_prompt: str,
+        messages: List[ChatMessage],
+        temperature: float,
+        call: "_Call",
+        max_retries: int,
+    ) -> str:
+        agent = call.agent
         timeout = self.config.request_timeout_seconds
+        breaker = self._breaker(target)
+
+        async def once() -> str:
+            if target.provider == "openai":
+                return await self._openai_complete(target, system_prompt, messages, temperature, timeout, agent)
+            if target.provider == "anthropic":
+                return await self._anthropic_complete(target, system_prompt, messages, temperature, timeout, agent)
+            if target.provider == "mock":
+                return await self._mock_complete(target, system_prompt, messages, timeout, agent)
+            raise LLMError(f"Unsupported provider: {target.provider}")
+
+        controller = get_admission_controller(target.provider)
+        tokens = self._admission_tokens(controller, target, system_prompt, messages)
+
+        def admit_hedge() -> bool:
+            # A hedged duplicate is a real request: it needs its own admission and is not sent without one
+            if controller.try_acquire(tokens):
+                return True
+            self._hedge_skipped(target, agent)
+            return False
+
         for attempt in range(1, max_retries + 1):
-            try:
-                if self._provider == "openai":
-                    return await self._openai_complete(system_prompt, messages, temperature, timeout)
-                elif self._provider == "anthropic":
-                    return await self._anthropic_complete(system_prompt, messages, temperature, timeout)
+            # Every attempt queues for admission
+            async with self._slot(target, call, tokens):
+                self._admit(target, breaker, call)
+                attempt_start = time.perf_counter()
+                try:
+                    result = await hedge(
+                        once,
+                        self._hedge_delay(target),
+                        on_hedge=lambda: self._hedged(target, agent),
+                        admit=admit_hedge,
+                        release=controller.release,
+                    )
+                except asyncio.CancelledError:
+                    breaker.release()
+                    raise
+                except Exception as e:
+                    error = self._failed(breaker, e)
+                    logger.warning(f"LLM request to {target.name} failed (attempt {attempt}/{max_retries}): {error}")
+                    if not error.retryable or attempt == max_retries or breaker.state == CircuitBreaker.OPEN:
+                        self._observe(target, call, "error")
+                        raise error from e
                 else:
-                    raise LLMError(f"Unsupported provider: {self._provider}")
-            except Exception as e:
-                logger.warning(f"LLM request failed (attempt {attempt}/{max_retries}): {e}")
-                if attempt == max_retries:
+                    breaker.record_success()
+                    self.latency.record(target.name, time.perf_counter() - attempt_start)
+                    self._observe(target, call, "ok")
+                    return result
+            # Back off outside the slot so waiting retries do not hold capacity
+            self._retry(target, agent)
+            await asyncio.sleep(self._backoff(attempt))
+        raise LLMError("no attempts made")
+
+    async def astream(
+        self,
+        system_prompt: str,
+        messages: List[ChatMessage],
+        temperature: float = 0.2,
+        use_cache: bool = True,
+        agent: str = "unknown",
+        session_id: Optional[str] = None,
+        priority: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        cache_key = None
+        if self.cache is not None and use_cache:
+            primary = self.routes(agent)[0]
+            cache_key = make_cache_key(primary.provider, primary.model, system_prompt, messages, temperature)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self._count(primary, agent, "cache_hit")
+                yield cached
+                return
+        if self.player is not None:
+            async for delta in self._replay_stream(system_prompt, messages, temperature, agent):
+                yield delta
+            return
+        targets = self._candidates(agent)
+        if not targets:
+            raise self._no_route(agent)
+        call = _Call(agent, session_id, priority_for(agent) if priority is None else priority)
+        parts: List[str] = []
+        for i, target in enumerate(targets):
+            try:
+                async for delta in self._stream_on(
+                    target, system_prompt, messages, temperature, call, self._attempts(targets, i)
+                ):
+                    parts.append(delta)
+                    yield delta
+            except LLMError as e:
+                # Tokens already handed to the caller cannot be taken back, so only fail over before the first one
+                if parts or i == len(targets) - 1:
+                    self._record(call, target, system_prompt, messages, temperature, "".join(parts), e)
                     raise
-                await asyncio.sleep(0.5 * attempt)
+                self._failover(agent, target, targets[i + 1], e)
+                continue
+            self._routed(agent, target)
+            self._record(call, target, system_prompt, messages, temperature, "".join(parts))
+            break
+        if cache_key is not None and parts:
+            self.cache.put(cache_key, "".join(parts))
 
-    async def _openai_complete(self, system_prompt: str, messages: List[ChatMessage], temperature: float, timeout: int) -> str:
+    async def _stream_on(
+        self,
+        target: RouteTarget,
+        system_prompt: str,
+        messages: List[ChatMessage],
+        temperature: float,
+        call: "_Call",
+        max_retries: int,
+    ) -> AsyncIterator[str]:
+        agent = call.agent
+        timeout = self.config.request_timeout_seconds
+        breaker = self._breaker(target)
+        started = False
+        tokens = self._admission_tokens(get_admission_controller(target.provider), target, system_prompt, messages)
+        for attempt in range(1, max_retries + 1):
+            # The slot is held until the stream ends
+            async with self._slot(target, call, tokens):
+                self._admit(target, breaker, call)
+                try:
+                    if target.provider == "openai":
+                        stream = self._openai_stream(target, system_prompt, messages, temperature, timeout, agent)
+                    elif target.provider == "anthropic":
+                        stream = self._anthropic_stream(target, system_prompt, messages, temperature, timeout, agent)
+                    elif target.provider == "mock":
+                        stream = self._mock_stream(target, system_prompt, messages, timeout, agent)
+                    else:
+                        raise LLMError(f"Unsupported provider: {target.provider}")
+                    async for delta in stream:
+                        if not started:
+                            started = True
+                            call.first_token = call.elapsed()
+                            get_metrics().observe(
+                                "llm_time_to_first_token_seconds",
+                                call.first_token,
+                                help="Time from stream request to first token, excluding queue wait",
+                                provider=target.provider,
+                                model=target.model,
+                                agent=agent,
+                            )
+                        yield delta
+                except (asyncio.CancelledError, GeneratorExit):
+                    # Abandoned by the caller: says nothing about the provider
+                    breaker.release()
+                    raise
+                except Exception as e:
+                    error = self._failed(breaker, e)
+                    logger.warning(f"LLM stream from {target.name} failed (attempt {attempt}/{max_retries}): {error}")
+                    if (
+                        started
+                        or not error.retryable
+                        or attempt == max_retries
+                        or breaker.state == CircuitBreaker.OPEN
+                    ):
+                        self._observe(target, call, "error")
+                        raise error from e
+                else:
+                    breaker.record_success()
+                    self._observe(target, call, "ok")
+                    return
+            self._retry(target, agent)
+            await asyncio.sleep(self._backoff(attempt))
+
+    def _admission_tokens(
+        self, controller: AdmissionController, target: RouteTarget, system_prompt: str, messages: List[ChatMessage]
+    ) -> int:
+        if not controller.counts_tokens:
+            return 0
+        # Prompt tokens as counted by tiktoken plus an allowance for the completion
+        text = system_prompt + "".join(m.content for m in messages)
+        return count_tokens(text, target.model) + self.config.llm_output_token_estimate
+
+    @asynccontextmanager
+    async def _slot(self, target: RouteTarget, call: "_Call", tokens: int) -> AsyncIterator[None]:
+        controller = get_admission_controller(target.provider)
         try:
-            import openai
-            client = openai.AsyncOpenAI(api_key=self.config.openai_api_key)
-            full_messages = ([{"role": "system", "content": system_prompt}] +
-                             [{"role": m.role, "content": m.content} for m in messages])
-            resp = await asyncio.wait_for(
-                client.chat.completions.create(
-                    model=self._model,
-                    messages=full_messages,
-                    temperature=temperature,
-                ),
-                timeout=timeout,
+            waited = await controller.acquire(tokens, call.priority, call.session_id or "")
+        except RateLimitError as e:
+            self._observe(target, call, "queue_timeout")
+            raise LLMError(str(e)) from e
+        call.queued += waited
+        get_metrics().observe(
+            "llm_queue_wait_seconds",
+            waited,
+            help="Time LLM requests waited for admission",
+            provider=target.provider,
+            agent=call.agent,
+        )
+        try:
+            yield
+        finally:
+            controller.release()
+
+    async def _replay(
+        self, system_prompt: str, messages: List[ChatMessage], temperature: float, agent: str
+    ) -> str:
+        assert self.player is not None
+        self._count(self.routes(agent)[0], agent, "replay")
+        try:
+            return await self.player.complete(prompt_key(agent, system_prompt, messages, temperature))
+        except (TranscriptMiss, TranscriptError) as e:
+            raise LLMError.wrap(e) from e
+
+    async def _replay_stream(
+        self, system_prompt: str, messages: List[ChatMessage], temperature: float, agent: str
+    ) -> AsyncIterator[str]:
+        assert self.player is not None
+        self._count(self.routes(agent)[0], agent, "replay")
+        try:
+            async for delta in self.player.stream(prompt_key(agent, system_prompt, messages, temperature)):
+                yield delta
+        except (TranscriptMiss, TranscriptError) as e:
+            raise LLMError.wrap(e) from e
+
+    def _record(
+        self,
+        call: "_Call",
+        target: RouteTarget,
+        system_prompt: str,
+        messages: List[ChatMessage],
+        temperature: float,
+        response: str,
+        error: Optional[LLMError] = None,
+    ) -> None:
+        if self.recorder is None:
+            return
+        self.recorder.write(
+            TranscriptEntry(
+                key=prompt_key(call.agent, system_prompt, messages, temperature),
+                agent=call.agent,
+                target=target.name,
+                seconds=call.elapsed(),
+                response=response,
+                first_token_seconds=call.first_token,
+                error=str(error) if error is not None else None,
+                status_code=error.status_code if error is not None else None,
             )
+        )
+
+    def _routed(self, agent: str, target: RouteTarget) -> None:
+        counts = self._route_counts.setdefault(agent, {})
+        counts[target.name] = counts.get(target.name, 0) + 1
+        get_metrics().inc(
+            "llm_route_total", help="LLM calls served per agent and target", agent=agent, target=target.name
+        )
+
+    def _failover(self, agent: str, failed: RouteTarget, to: RouteTarget, error: LLMError) -> None:
+        logger.info(f"LLM failover for {agent}: {failed.name} -> {to.name} ({error})")
+        get_metrics().inc(
+            "llm_failovers_total",
+            help="Calls moved to the next target of an agent's route",
+            agent=agent,
+            source=failed.name,
+            target=to.name,
+        )
+
+    def route_counts(self) -> Dict[str, Dict[str, int]]:
+        return {agent: dict(counts) for agent, counts in self._route_counts.items()}
+
+    def _breaker(self, target: RouteTarget) -> CircuitBreaker:
+        # Per target, so an overloaded model does not block the smaller model it fails over to
+        return get_circuit_breaker(
+            target.name, self.config.llm_circuit_failure_threshold, self.config.llm_circuit_reset_seconds
+        )
+
+    def _admit(self, target: RouteTarget, breaker: CircuitBreaker, call: "_Call") -> None:
+        # Fail fast while the target is known to be down; the route moves on or the agent falls back
+        if not breaker.allow():
+            self._observe(target, call, "circuit_open")
+            raise CircuitOpenError(f"circuit open for {breaker.name}")
+
+    @staticmethod
+    def _failed(breaker: CircuitBreaker, e: BaseException) -> LLMError:
+        error = LLMError.wrap(e)
+        if error.status_code in REQUEST_ERROR_STATUS:
+            # The provider answered; the request itself was bad
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+        return error
+
+    def _backoff(self, attempt: int) -> float:
+        return backoff_delay(attempt, self.config.llm_backoff_base_seconds, self.config.llm_backoff_max_seconds)
+
+    def _hedge_delay(self, target: RouteTarget) -> Optional[float]:
+        if not self.config.llm_hedge_requests:
+            return None
+        return self.latency.quantile(target.name, self.config.llm_hedge_quantile)
+
+    def _hedged(self, target: RouteTarget, agent: str) -> None:
+        get_metrics().inc(
+            "llm_hedged_requests_total",
+            help="Second requests fired after the hedge delay",
+            provider=target.provider,
+            model=target.model,
+            agent=agent,
+        )
+
+    def _hedge_skipped(self, target: RouteTarget, agent: str) -> None:
+        get_metrics().inc(
+            "llm_hedges_skipped_total",
+            help="Hedges not sent because the provider had no admission free",
+            provider=target.provider,
+            model=target.model,
+            agent=agent,
+        )
+
+    def _count(self, target: RouteTarget, agent: str, outcome: str) -> None:
+        get_metrics().inc(
+            "llm_requests_total",
+            help="LLM requests by outcome",
+            provider=target.provider,
+            model=target.model,
+            agent=agent,
+            outcome=outcome,
+        )
+
+    def _observe(self, target: RouteTarget, call: "_Call", outcome: str) -> None:
+        # Spans all attempts and earlier targets but not time queued for admission (llm_queue_wait_seconds)
+        self._count(target, call.agent, outcome)
+        get_metrics().observe(
+            "llm_request_duration_seconds",
+            call.elapsed(),
+            help="LLM request latency including retries, excluding queue wait",
+            provider=target.provider,
+            model=target.model,
+            agent=call.agent,
+        )
+
+    def _retry(self, target: RouteTarget, agent: str) -> None:
+        get_metrics().inc(
+            "llm_retries_total", help="LLM request retries", provider=target.provider, model=target.model, agent=agent
+        )
+
+    def _record_usage(
+        self,
+        target: RouteTarget,
+        agent: str,
+        input_tokens: Optional[int],
+        output_tokens: Optional[int],
+        cached_tokens: Optional[int] = None,
+        cache_write_tokens: Optional[int] = None,
+    ) -> None:
+        # input_tokens is the whole prompt, cached_tokens the part of it read from the prompt cache
+        if input_tokens:
+            totals = self._prompt_tokens.setdefault(agent, [0, 0])
+            totals[0] += input_tokens
+            totals[1] += cached_tokens or 0
+        metrics = get_metrics()
+        usage = (
+            ("in", input_tokens),
+            ("out", output_tokens),
+            ("cached", cached_tokens),
+            ("cache_write", cache_write_tokens),
+        )
+        for direction, tokens in usage:
+            if tokens:
+                metrics.inc(
+                    "llm_tokens_total",
+                    float(tokens),
+                    help="Tokens reported by the provider",
+                    provider=target.provider,
+                    model=target.model,
+                    agent=agent,
+                    direction=direction,
+                )
+
+    def cached_token_ratios(self) -> Dict[str, float]:
+        return {agent: (cached / total if total else 0.0) for agent, (total, cached) in self._prompt_tokens.items()}
+
+    def _record_openai_usage(self, target: RouteTarget, agent: str, usage: Any) -> None:
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) if details is not None else None
+        self._record_usage(target, agent, usage.prompt_tokens, usage.completion_tokens, cached)
+
+    def _record_anthropic_usage(
+        self, target: RouteTarget, agent: str, usage: Any, output_tokens: Optional[int]
+    ) -> None:
+        # Anthropic reports cache reads and writes separately from input_tokens
+        read = getattr(usage, "cache_read_input_tokens", None) or 0
+        write = getattr(usage, "cache_creation_input_tokens", None) or 0
+        self._record_usage(target, agent, (usage.input_tokens or 0) + read + write, output_tokens, read, write)
+
+    @staticmethod
+    def _openai_messages(system_prompt: str, messages: List[ChatMessage]) -> List[Dict[str, Any]]:
+        return ([{"role": "system", "content": system_prompt}] +
+                [{"role": m.role, "content": m.content} for m in messages])
+
+    def _anthropic_user_content(
+        self, system_prompt: str, messages: List[ChatMessage], model: str
+    ) -> List[Dict[str, Any]]:
+        user_content = []
+        # Providers silently skip caching prefixes below their minimum, so the marker only goes on ones that qualify
+        prefix_tokens = count_tokens(system_prompt, model)
+        for m in messages:
+            if m.role == "user":
+                block: Dict[str, Any] = {"type": "text", "text": m.content}
+            elif m.role == "assistant":
+                # Anthropic API expects a linear conversation; we fold assistant messages into the running content
+                block = {"type": "text", "text": f"Assistant: {m.content}"}
+            else:
+                continue
+            prefix_tokens += count_tokens(block["text"], model)
+            if m.cache and prefix_tokens >= self.config.prompt_cache_min_tokens:
+                # Caches the system prompt and every block up to and including this one
+                block["cache_control"] = {"type": "ephemeral"}
+            user_content.append(block)
+        return user_content
+
+    async def _openai_complete(
+        self,
+        target: RouteTarget,
+        system_prompt: str,
+        messages: List[ChatMessage],
+        temperature: float,
+        timeout: int,
+        agent: str,
+    ) -> str:
+        try:
+            with self.pool.lease("openai") as client:
+                resp = await asyncio.wait_for(
+                    client.chat.completions.create(
+                        model=target.model,
+                        messages=self._openai_messages(system_prompt, messages),
+                        temperature=temperature,
+                    ),
+                    timeout=timeout,
+                )
+            usage = getattr(resp, "usage", None)
+            if usage is not None:
+                self._record_openai_usage(target, agent, usage)
             return resp.choices[0].message.content or ""
         except Exception as e:
-            raise LLMError(str(e))
+            raise LLMError.wrap(e) from e
 
-    async def _anthropic_complete(self, system_prompt: str, messages: List[ChatMessage], temperature: float, timeout: int) -> str:
+    async def _anthropic_complete(
+        self,
+        target: RouteTarget,
+        system_prompt: str,
+        messages: List[ChatMessage],
+        temperature: float,
+        timeout: int,
+        agent: str,
+    ) -> str:
+        content = self._anthropic_user_content(system_prompt, messages, target.model)
         try:
-            from anthropic import AsyncAnthropic
-            client = AsyncAnthropic(api_key=self.config.anthropic_api_key)
-            user_content = []
-            for m in messages:
-                if m.role == "user":
-                    user_content.append({"type": "text", "text": m.content})
-                elif m.role == "assistant":
-                    # Anthropic API expects a linear conversation; we fold assistant messages into the running content
-                    user_content.append({"type": "text", "text": f"Assistant: {m.content}"})
-            resp = await asyncio.wait_for(
-                client.messages.create(
-                    model=self._model,
-                    system=system_prompt,
-                    max_tokens=800,
-                    temperature=temperature,
-                    messages=[{"role": "user", "content": user_content}],
-                ),
-                timeout=timeout,
-            )
+            with self.pool.lease("anthropic") as client:
+                resp = await asyncio.wait_for(
+                    client.messages.create(
+                        model=target.model,
+                        system=system_prompt,
+                        max_tokens=800,
+                        temperature=temperature,
+                        messages=[{"role": "user", "content": content}],
+                    ),
+                    timeout=timeout,
+                )
+            usage = getattr(resp, "usage", None)
+            if usage is not None:
+                self._record_anthropic_usage(target, agent, usage, usage.output_tokens)
             return resp.content[0].text if resp.content else ""
         except Exception as e:
-            raise LLMError(str(e))
+            raise LLMError.wrap(e) from e
+
+    async def _openai_stream(
+        self,
+        target: RouteTarget,
+        system_prompt: str,
+        messages: List[ChatMessage],
+        temperature: float,
+        timeout: int,
+        agent: str,
+    ) -> AsyncIterator[str]:
+        try:
+            with self.pool.lease("openai") as client:
+                stream = await asyncio.wait_for(
+                    client.chat.completions.create(
+                        model=target.model,
+                        messages=self._openai_messages(system_prompt, messages),
+                        temperature=temperature,
+                        stream=True,
+                        stream_options={"include_usage": True},
+                    ),
+                    timeout=timeout,
+                )
+                async for chunk in _with_idle_timeout(stream, timeout):
+                    usage = getattr(chunk, "usage", None)
+                    if usage is not None:
+                        # Only the final chunk carries usage
+                        self._record_openai_usage(target, agent, usage)
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        yield delta
+        except Exception as e:
+            raise LLMError.wrap(e) from e
 
+    async def _anthropic_stream(
+        self,
+        target: RouteTarget,
+        system_prompt: str,
+        messages: List[ChatMessage],
+        temperature: float,
+        timeout: int,
+        agent: str,
+    ) -> AsyncIterator[str]:
+        content = self._anthropic_user_content(system_prompt, messages, target.model)
+        try:
+            with self.pool.lease("anthropic") as client:
+                stream = await asyncio.wait_for(
+                    client.messages.create(
+                        model=target.model,
+                        system=system_prompt,
+                        max_tokens=800,
+                        temperature=temperature,
+                        messages=[{"role": "user", "content": content}],
+                        stream=True,
+                    ),
+                    timeout=timeout,
+                )
+                async for event in _with_idle_timeout(stream, timeout):
+                    kind = getattr(event, "type", "")
+                    if kind == "message_start":
+                        self._record_anthropic_usage(target, agent, event.message.usage, None)
+                    elif kind == "message_delta":
+                        self._record_usage(target, agent, None, event.usage.output_tokens)
+                    if kind != "content_block_delta":
+                        continue
+                    text = getattr(event.delta, "text", None)
+                    if text:
+                        yield text
+        except Exception as e:
+            raise LLMError.wrap(e) from e
 
+    async def _mock_complete(
+        self, target: RouteTarget, system_prompt: str, messages: List[ChatMessage], timeout: int, agent: str
+    ) -> str:
+        try:
+            provider = get_mock_provider(target.model, self.config)
+            reply = await asyncio.wait_for(
+                provider.complete(system_prompt, "\n".join(m.content for m in messages)), timeout=timeout
+            )
+            self._record_usage(target, agent, reply.input_tokens, reply.output_tokens)
+            return reply.text
+        except Exception as e:
+            raise LLMError.wrap(e) from e
+
+    async def _mock_stream(
+        self, target: RouteTarget, system_prompt: str, messages: List[ChatMessage], timeout: int, agent: str
+    ) -> AsyncIterator[str]:
+        try:
+            provider = get_mock_provider(target.model, self.config)
+            user = "\n".join(m.content for m in messages)
+            count = 0
+            async for token in _with_idle_timeout(provider.stream(system_prompt, user), timeout):
+                count += 1
+                yield token
+            self._record_usage(target, agent, (len(system_prompt) + len(user) + 3) // 4, count)
+        except Exception as e:
+            raise LLMError.wrap(e) from e
+
+
+async def _with_idle_timeout(stream: Any, timeout: float) -> AsyncIterator[Any]:
+    iterator = stream.__aiter__()
+    while True:
+        try:
+            item = await asyncio.wait_for(iterator.__anext__(), timeout=timeout)
+        except StopAsyncIteration:
+            return
+        yield item
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+import asyncio
+import hashlib
+import json
+import re
+import threading
+
+from utils.logging import get_logger
+from utils.metrics import get_metrics
+
+
+logger = get_logger(__name__)
+
+# Append-only JSON lines, one per LLM call:
+#   {"k": prompt key, "a": agent, "t": "provider:model", "s": seconds, "f": seconds to first token (streams),
+#    "r": response text, "e": error message, "c": error status code}
+# Keys leave out the provider and model, so a transcript replays under any route.
+REPLAY_FAST = "fast"
+REPLAY_TIMED = "timed"
+
+
+def prompt_key(agent: str, system_prompt: str, messages: List[Any], temperature: float) -> str:
+    payload = json.dumps(
+        [agent, system_prompt, [[m.role, m.content] for m in messages], round(float(temperature), 4)],
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class TranscriptEntry:
+    key: str
+    agent: str
+    target: str
+    seconds: float
+    response: str = ""
+    first_token_seconds: Optional[float] = None
+    error: Optional[str] = None
+    status_code: Optional[int] = None
+
+    def to_json(self) -> str:
+        data: Dict[str, Any] = {"k": self.key, "a": self.agent, "t": self.target, "s": round(self.seconds, 4)}
+        if self.first_token_seconds is not None:
+            data["f"] = round(self.first_token_seconds, 4)
+        if self.response:
+            data["r"] = self.response
+        if self.error is not None:
+            data["e"] = self.error
+            data["c"] = self.status_code
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+    @staticmethod
+    def from_json(line: str) -> "TranscriptEntry":
+        data = json.loads(line)
+        return TranscriptEntry(
+            key=data["k"],
+            agent=data.get("a", ""),
+            target=data.get("t", ""),
+            seconds=float(data.get("s", 0.0)),
+            response=data.get("r", ""),
+            first_token_seconds=data.get("f"),
+            error=data.get("e"),
+            status_code=data.get("c"),
+        )
+
+
+class TranscriptRecorder:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+        logger.info(f"Recording LLM transcript to {path}")
+
+    def write(self, entry: TranscriptEntry) -> None:
+        line = entry.to_json() + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class TranscriptMiss(Exception):
+    pass
+
+
+class TranscriptError(Exception):
+    # A recorded failure, replayed with its original status code
+    def __init__(self, entry: TranscriptEntry):
+        super().__init__(entry.error or "recorded error")
+        self.status_code = entry.status_code
+
+
+class TranscriptPlayer:
+    # Answers each prompt with its recorded responses in order; the last one repeats once they run out
+    def __init__(self, path: str, mode: str = REPLAY_FAST):
+        if mode not in (REPLAY_FAST, REPLAY_TIMED):
+            raise ValueError(f"Unknown replay mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self._entries: Dict[str, Deque[TranscriptEntry]] = {}
+        self._lock = threading.Lock()
+        count = 0
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = TranscriptEntry.from_json(line)
+                    self._entries.setdefault(entry.key, deque()).append(entry)
+                    count += 1
+        logger.info(f"Replaying {count} LLM calls ({len(self._entries)} prompts) from {path} in {mode} mode")
+
+    def next(self, key: str) -> TranscriptEntry:
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                get_metrics().inc("llm_transcript_total", help="Transcript replay lookups", result="miss")
+                raise TranscriptMiss(f"no recorded response for prompt {key}")
+            entry = entries.popleft() if len(entries) > 1 else entries[0]
+        get_metrics().inc("llm_transcript_total", help="Transcript replay lookups", result="hit")
+        return entry
+
+    async def complete(self, key: str) -> str:
+        entry = self.next(key)
+        await asyncio.sleep(entry.seconds if self.mode == REPLAY_TIMED else 0)
+        if entry.error is not None:
+            raise TranscriptError(entry)
+        return entry.response
+
+    async def stream(self, key: str) -> AsyncIterator[str]:
+        # Recorded text is re-split into words; timed mode spreads them between first token and completion
+        entry = self.next(key)
+        pieces = re.findall(r"\s*\S+", entry.response) or ([entry.response] if entry.response else [])
+        timed = self.mode == REPLAY_TIMED
+        first = entry.first_token_seconds if entry.first_token_seconds is not None else entry.seconds
+        await asyncio.sleep(first if timed else 0)
+        gap = max(0.0, entry.seconds - first) / max(1, len(pieces) - 1) if timed else 0.0
+        for i, piece in enumerate(pieces):
+            if i and gap:
+                await asyncio.sleep(gap)
+            yield piece
+        if entry.error is not None:
+            raise TranscriptError(entry)
@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+# Drives a running server.py with concurrent virtual candidates: create session -> (next -> answer)* -> /quit.
+# Reports throughput, per-endpoint latency percentiles, error rate and server memory growth as JSON.
+
+ANSWERS = [
+    "I built a FastAPI service backed by Postgres and Redis, and cut p99 latency by caching hot reads.",
+    "I would partition by customer id, replicate each shard and use idempotent consumers for retries.",
+    "We moved the batch jobs to Kafka consumers, which removed the nightly backlog and simplified retries.",
+    "I'm not sure, but I would start by profiling and looking at the slowest queries first.",
+    "Tradeoff-wise we chose eventual consistency for the feed and strong consistency for payments.",
+    "",
+]
+RSS_METRIC = "mock_interview_process_resident_memory_bytes"
+
+
+@dataclass
+class EndpointStats:
+    latencies_ms: List[float] = field(default_factory=list)
+    first_byte_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+
+    def summary(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"count": len(self.latencies_ms) + self.errors, "errors": self.errors}
+        out["error_rate"] = round(self.errors / out["count"], 4) if out["count"] else 0.0
+        if self.latencies_ms:
+            values = sorted(self.latencies_ms)
+            out.update(
+                p50_ms=_percentile(values, 0.50),
+                p90_ms=_percentile(values, 0.90),
+                p99_ms=_percentile(values, 0.99),
+                max_ms=round(values[-1], 2),
+                mean_ms=round(sum(values) / len(values), 2),
+            )
+        if self.first_byte_ms:
+            values = sorted(self.first_byte_ms)
+            out.update(first_byte_p50_ms=_percentile(values, 0.50), first_byte_p99_ms=_percentile(values, 0.99))
+        return out
+
+
+def _percentile(values: List[float], q: float) -> float:
+    return round(values[min(len(values) - 1, int(len(values) * q))], 2)
+
+
+class LoadGenerator:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.stats: Dict[str, EndpointStats] = {}
+        self.sessions_started = 0
+        self.sessions_completed = 0
+        self.rss_samples: List[int] = []
+        self.llm_calls: List[int] = []
+        with open(args.resume, "rb") as f:
+            self.resume = f.read()
+        with open(args.jd, "rb") as f:
+            self.jd = f.read()
+
+    def _stat(self, endpoint: str) -> EndpointStats:
+        return self.stats.setdefault(endpoint, EndpointStats())
+
+    async def _request(self, client: Any, endpoint: str, method: str, path: str, **kwargs: Any) -> Optional[Any]:
+        start = time.perf_counter()
+        try:
+            resp = await client.request(method, path, **kwargs)
+        except Exception:
+            self._stat(endpoint).errors += 1
+            return None
+        elapsed = (time.perf_counter() - start) * 1000
+        if resp.status_code >= 400:
+            self._stat(endpoint).errors += 1
+            return resp
+        self._stat(endpoint).latencies_ms.append(elapsed)
+        return resp
+
+    async def _stream(self, client: Any, endpoint: str, method: str, path: str, **kwargs: Any) -> Optional[str]:
+        # Returns the last SSE event name; latency is to the end of the stream, first byte is tracked apart
+        start = time.perf_counter()
+        first: Optional[float] = None
+        last_event = None
+        try:
+            async with client.stream(method, path, **kwargs) as resp:
+                if resp.status_code >= 400:
+                    await resp.aread()
+                    self._stat(endpoint).errors += 1
+                    return None
+                async for line in resp.aiter_lines():
+                    if first is None:
+                        first = (time.perf_counter() - start) * 1000
+                    if line.startswith("event: "):
+                        last_event = line[7:].strip()
+        except Exception:
+            self._stat(endpoint).errors += 1
+            return None
+        stat = self._stat(endpoint)
+        if last_event == "error":
+            stat.errors += 1
+            return last_event
+        stat.latencies_ms.append((time.perf_counter() - start) * 1000)
+        if first is not None:
+            stat.first_byte_ms.append(first)
+        return last_event
+
+    async def _think(self) -> None:
+        if self.args.think_ms:
+            await asyncio.sleep(self.rng.uniform(0.5, 1.5) * self.args.think_ms / 1000)
+
+    async def candidate(self, client: Any, deadline: float) -> None:
+        while time.monotonic() < deadline and (not self.args.sessions or self.sessions_started < self.args.sessions):
+            self.sessions_started += 1
+            files = {"resume": ("loadgen_resume.txt", self.resume), "jd": ("loadgen_jd.txt", self.jd)}
+            resp = await self._request(client, "POST /api/session", "POST", "/api/session", files=files)
+            if resp is None or resp.status_code >= 400:
+                continue
+            sid = resp.json()["session_id"]
+            for _ in range(self.args.rounds):
+                if time.monotonic() >= deadline:
+                    break
+                stream = self.rng.random() < self.args.stream_ratio
+                if stream:
+                    path = f"/api/next/stream?session_id={sid}"
+                    event = await self._stream(client, "GET /api/next/stream", "GET", path)
+                    if event != "question":
+                        break
+                else:
+                    resp = await self._request(client, "POST /api/next", "POST", "/api/next", json={"session_id": sid})
+                    if resp is None or resp.status_code >= 400:
+                        break
+                await self._think()
+                if self.rng.random() < self.args.skip_ratio:
+                    body = {"session_id": sid, "answer": "/next"}
+                    await self._request(client, "POST /api/answer (/next)", "POST", "/api/answer", json=body)
+                    continue
+                body = {"session_id": sid, "answer": self.rng.choice(ANSWERS)}
+                if stream:
+                    await self._stream(client, "POST /api/answer/stream", "POST", "/api/answer/stream", json=body)
+                else:
+                    await self._request(client, "POST /api/answer", "POST", "/api/answer", json=body)
+            resp = await self._request(client, "GET /api/sessions/{id}", "GET", f"/api/sessions/{sid}")
+            if resp is not None and resp.status_code < 400:
+                self.llm_calls.append(int(resp.json().get("llm_calls", 0)))
+            body = {"session_id": sid, "answer": "/quit"}
+            await self._request(client, "POST /api/answer (/quit)", "POST", "/api/answer", json=body)
+            self.sessions_completed += 1
+
+    async def _rss(self, client: Any) -> Optional[int]:
+        # Server-side RSS from /metrics; with several workers this is whichever worker answered
+        try:
+            resp = await client.get("/metrics")
+            for line in resp.text.splitlines():
+                if line.startswith(RSS_METRIC):
+                    return int(float(line.split()[-1]))
+        except Exception:
+            pass
+        return None
+
+    async def _sample_memory(self, client: Any, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            rss = await self._rss(client)
+            if rss is not None:
+                self.rss_samples.append(rss)
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=1.0)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self) -> Dict[str, Any]:
+        import httpx
+
+        candidates = self.args.candidates
+        limits = httpx.Limits(max_connections=candidates * 2, max_keepalive_connections=candidates)
+        async with httpx.AsyncClient(base_url=self.args.url, timeout=self.args.timeout, limits=limits) as client:
+            rss_before = await self._rss(client)
+            stop = asyncio.Event()
+            sampler = asyncio.create_task(self._sample_memory(client, stop))
+            start = time.perf_counter()
+            deadline = time.monotonic() + self.args.duration
+            await asyncio.gather(*(self.candidate(client, deadline) for _ in range(self.args.candidates)))
+            elapsed = time.perf_counter() - start
+            stop.set()
+            await sampler
+            rss_after = await self._rss(client)
+        return self._report(elapsed, rss_before, rss_after)
+
+    def _report(self, elapsed: float, rss_before: Optional[int], rss_after: Optional[int]) -> Dict[str, Any]:
+        requests = sum(len(s.latencies_ms) + s.errors for s in self.stats.values())
+        errors = sum(s.errors for s in self.stats.values())
+        memory: Dict[str, Any] = {"rss_before_bytes": rss_before, "rss_after_bytes": rss_after}
+        if self.rss_samples:
+            memory["rss_peak_bytes"] = max(self.rss_samples)
+        if rss_before is not None and rss_after is not None:
+            memory["rss_growth_bytes"] = rss_after - rss_before
+            if self.sessions_completed:
+                memory["rss_growth_bytes_per_session"] = round((rss_after - rss_before) / self.sessions_completed, 1)
+        return {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_commit": _git_commit(),
+            "config": {k: v for k, v in vars(self.args).items() if k not in {"output", "compare"}},
+            "duration_seconds": round(elapsed, 3),
+            "sessions_completed": self.sessions_completed,
+            "requests": requests,
+            "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+            "errors": errors,
+            "error_rate": round(errors / requests, 4) if requests else 0.0,
+            "llm_calls_per_session": round(sum(self.llm_calls) / len(self.llm_calls), 2) if self.llm_calls else None,
+            "endpoints": {name: stats.summary() for name, stats in sorted(self.stats.items())},
+            "memory": memory,
+        }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _spawn_server(port: int) -> subprocess.Popen:
+    import httpx
+
+    env = os.environ.copy()
+    # Per-request agent logs would dominate the run's CPU and output
+    env.setdefault("LOG_LEVEL", "WARNING")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port)]
+        + ["--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1.0).status_code == 200:
+                return proc
+        except Exception:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("server did not become healthy within 30s")
+
+
+def _compare(result: Dict[str, Any], baseline_path: str) -> None:
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\nvs {baseline_path} ({baseline.get('git_commit')}):")
+    print(f"  throughput_rps {baseline.get('throughput_rps')} -> {result['throughput_rps']}")
+    print(f"  error_rate     {baseline.get('error_rate')} -> {result['error_rate']}")
+    print(f"  llm_calls/sess {baseline.get('llm_calls_per_session')} -> {result['llm_calls_per_session']}")
+    for name, stats in result["endpoints"].items():
+        old = baseline.get("endpoints", {}).get(name)
+        if not old or "p50_ms" not in old or "p50_ms" not in stats:
+            continue
+        print(
+            f"  {name:28s} p50 {old['p50_ms']:>9.2f} -> {stats['p50_ms']:>9.2f}"
+            f"  p99 {old['p99_ms']:>9.2f} -> {stats['p99_ms']:>9.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent virtual-candidate load test for server.py")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--spawn", action="store_true", help="start `uvicorn server:app` on --port for the run")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--candidates", type=int, default=20, help="concurrent virtual candidates")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to keep starting sessions")
+    parser.add_argument("--sessions", type=int, default=0, help="stop after this many sessions (0 = no limit)")
+    parser.add_argument("--rounds", type=int, default=5, help="question/answer rounds per session")
+    parser.add_argument("--stream-ratio", type=float, default=0.3, help="share of rounds using the SSE endpoints")
+    parser.add_argument("--skip-ratio", type=float, default=0.1, help="share of rounds answered with /next")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause between question and answer")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--resume", default="data/sample_resume.txt")
+    parser.add_argument("--jd", default="data/sample_job_description.txt")
+    parser.add_argument("--output", help="result JSON path (default data/bench/loadgen-<timestamp>.json)")
+    parser.add_argument("--compare", metavar="PATH", help="print deltas against an earlier result")
+    args = parser.parse_args()
+
+    proc = None
+    if args.spawn:
+        args.url = f"http://127.0.0.1:{args.port}"
+        proc = _spawn_server(args.port)
+    try:
+        result = asyncio.run(LoadGenerator(args).run())
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+        for name in ("loadgen_resume.txt", "loadgen_jd.txt"):
+            # create_session stores uploads under data/; only clean up when the server shares this directory
+            if args.spawn and os.path.exists(os.path.join("data", name)):
+                os.remove(os.path.join("data", name))
+
+    output = args.output or os.path.join("data", "bench", f"loadgen-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    keys = ("sessions_completed", "requests", "throughput_rps", "error_rate", "llm_calls_per_session")
+    print(json.dumps({k: result[k] for k in keys}))
+    for name, stats in result["endpoints"].items():
+        if "p50_ms" in stats:
+            print(
+                f"  {name:28s} n={stats['count']:<6d} p50={stats['p50_ms']:>9.2f}ms"
+                f" p99={stats['p99_ms']:>9.2f}ms err={stats['errors']}"
+            )
+    print(f"  memory: {result['memory']}")
+    print(f"results written to {output}")
+    if args.compare:
+        _compare(result, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+
+from utils.config import AppConfig, load_config
+
+
+# Offline stand-in for a provider: recognises the interviewer, evaluator and hints prompts and answers in the
+# shape each agent parses, with lognormal latency, streamed word tokens and injected errors. Outputs and
+# timings depend only on the seed, the prompt and how many times that prompt was sent before.
+
+_TOPIC_RE = re.compile(r"^Topic:\s*(.+?)(?:\s*\(depth (\d+)\))?\s*$", re.MULTILINE)
+_ANSWER_RE = re.compile(r"^Answer:\s*(.*?)(?=^Topic:|\Z)", re.MULTILINE | re.DOTALL)
+_QUESTION_RE = re.compile(r"'(.+?)'")
+_ASKED_RE = re.compile(r"^Question:\s*(.*)$", re.MULTILINE)
+_PLAN_TOPIC_RE = re.compile(r"^- (.+?) \(depths 0-(\d+)\)", re.MULTILINE)
+_PLAN_COUNT_RE = re.compile(r"Write (\d+) questions")
+_ERROR_STATUS = (429, 500, 503)
+# Prompts whose send count is remembered; retries follow within seconds, so only recent prompts matter and
+# load tests running for hours keep a fixed footprint
+_SEEN_LIMIT = 4096
+
+_OPENERS = (
+    "Walk me through how you would",
+    "Can you describe a time you had to",
+    "How would you",
+    "What tradeoffs did you weigh when you had to",
+    "Explain how you would",
+)
+_ACTIONS = (
+    "design a resilient service around {topic}",
+    "debug a production issue involving {topic}",
+    "scale a system that relies on {topic}",
+    "explain the core concepts of {topic} to a new teammate",
+    "choose between two approaches to {topic}",
+    "measure and improve performance in {topic}",
+)
+_DEEPER = ("and what failure modes would you plan for", "and how would you test it", "and what would you change today")
+_STRENGTHS = ("Clear structure", "Concrete example", "Good use of terminology", "Mentions tradeoffs", "Concise")
+_IMPROVEMENTS = ("Quantify the impact", "Discuss failure modes", "Compare alternatives", "Add a concrete example")
+_HINTS = (
+    "Anchor your answer in one concrete project and its measurable outcome.",
+    "Name the main tradeoff and why you chose your side of it.",
+    "Describe what breaks first under load and how you would notice.",
+    "Walk through the steps in order before going into details.",
+)
+
+
+class MockLLMError(Exception):
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+@dataclass
+class MockReply:
+    text: str
+    input_tokens: int
+    output_tokens: int
+
+
+class MockProvider:
+    def __init__(
+        self,
+        model: str,
+        seed: int = 0,
+        latency_ms: float = 800.0,
+        latency_sigma: float = 0.5,
+        tokens_per_second: float = 60.0,
+        error_rate: float = 0.0,
+    ):
+        self.model = model
+        self.seed = seed
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self._seen: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _rng(self, system_prompt: str, user: str) -> random.Random:
+        key = hashlib.sha256(f"{self.model}\x00{system_prompt}\x00{user}".encode("utf-8")).hexdigest()
+        with self._lock:
+            n = self._seen.get(key, 0)
+            self._seen[key] = n + 1
+            self._seen.move_to_end(key)
+            if len(self._seen) > _SEEN_LIMIT:
+                self._seen.popitem(last=False)
+        # Retries of the same prompt draw fresh latency/errors but stay reproducible across runs
+        return random.Random(f"{self.seed}:{key}:{n}")
+
+    def _first_token_delay(self, rng: random.Random) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        return self.latency_ms / 1000.0 * math.exp(rng.gauss(0.0, self.latency_sigma))
+
+    def reply(self, system_prompt: str, user: str, rng: random.Random) -> str:
+        if "Rephrase the question" in user:
+            return _rephrase(user)
+        if "planning an interview" in system_prompt:
+            return _plan(user, rng)
+        if "score" in system_prompt and "JSON" in system_prompt:
+            return _evaluation(user, rng, fused="rephrased_question" in system_prompt)
+        if "hint" in system_prompt.lower():
+            return rng.choice(_HINTS)
+        return _question(user, rng)
+
+    async def complete(self, system_prompt: str, user: str) -> MockReply:
+        tokens = [t async for t in self.stream(system_prompt, user)]
+        return MockReply("".join(tokens), _approx_tokens(system_prompt + user), len(tokens))
+
+    async def stream(self, system_prompt: str, user: str) -> AsyncIterator[str]:
+        rng = self._rng(system_prompt, user)
+        delay = self._first_token_delay(rng)
+        if rng.random() < self.error_rate:
+            # Fail somewhere before the first token, like an overloaded provider
+            await asyncio.sleep(delay * rng.random())
+            status = rng.choice(_ERROR_STATUS)
+            raise MockLLMError(f"mock provider error {status}", status)
+        await asyncio.sleep(delay)
+        per_token = 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        for i, token in enumerate(_tokens(self.reply(system_prompt, user, rng))):
+            if i and per_token:
+                await asyncio.sleep(per_token)
+            yield token
+
+
+def _tokens(text: str) -> List[str]:
+    # Word-sized pieces with their leading whitespace, so joined deltas reproduce the text exactly
+    return re.findall(r"\s*\S+", text) or [text]
+
+
+def _approx_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+
+def _topic(user: str) -> Tuple[str, int]:
+    m = _TOPIC_RE.search(user)
+    if not m:
+        return "your recent work", 0
+    return m.group(1).strip(), int(m.group(2) or 0)
+
+
+def _question(user: str, rng: random.Random) -> str:
+    topic, depth = _topic(user)
+    question = f"{rng.choice(_OPENERS)} {rng.choice(_ACTIONS).format(topic=topic)}"
+    if depth > 0:
+        question += f", {rng.choice(_DEEPER)}"
+    return question + "?"
+
+
+def _plan(user: str, rng: random.Random) -> str:
+    m = _PLAN_COUNT_RE.search(user)
+    per_depth = int(m.group(1)) if m else 2
+    plan = {}
+    for name, max_depth in _PLAN_TOPIC_RE.findall(user):
+        plan[name] = {}
+        for depth in range(int(max_depth) + 1):
+            questions: List[str] = []
+            for _ in range(per_depth * 10):
+                question = _question(f"Topic: {name} (depth {depth})", rng)
+                if question not in questions:
+                    questions.append(question)
+                if len(questions) == per_depth:
+                    break
+            plan[name][str(depth)] = questions
+    return json.dumps(plan)
+
+
+def _rephrase(user: str) -> str:
+    m = _QUESTION_RE.search(user)
+    original = m.group(1).rstrip("?") if m else "Can you walk me through your approach"
+    return f"Put more simply: {original}?"
+
+
+def _evaluation(user: str, rng: random.Random, fused: bool = False) -> str:
+    m = _ANSWER_RE.search(user)
+    words = len((m.group(1) if m else "").split())
+    # Longer answers score higher, with some noise, so follow-ups and hints get exercised
+    score = max(0.0, min(10.0, round(3.0 + 5.0 * min(words, 120) / 120 + rng.uniform(-1.5, 1.5), 1)))
+    strengths = rng.sample(_STRENGTHS, 2) if score >= 5 else rng.sample(_STRENGTHS, 1)
+    improvements = rng.sample(_IMPROVEMENTS, 1 if score >= 8 else 2)
+    topic, _ = _topic(user)
+    result = {
+        "score": score,
+        "brief_feedback": f"{'Solid' if score >= 7 else 'Partial'} answer on {topic}; {improvements[0].lower()}.",
+        "strengths": strengths,
+        "improvements": improvements,
+        "follow_up_question": "" if score >= 8 else f"Could you give a concrete example involving {topic}?",
+    }
+    if fused:
+        m = _ASKED_RE.search(user)
+        asked = (m.group(1).strip().rstrip("?") if m else "") or "Can you walk me through your approach"
+        result["hint"] = rng.choice(_HINTS)
+        result["rephrased_question"] = f"Put more simply: {asked}?" if score < 4 else ""
+    return json.dumps(result)
+
+
+_providers: Dict[str, MockProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_mock_provider(model: str, config: Optional[AppConfig] = None) -> MockProvider:
+    with _providers_lock:
+        provider = _providers.get(model)
+        if provider is None:
+            cfg = config or load_config()
+            provider = _providers[model] = MockProvider(
+                model,
+                seed=cfg.mock_llm_seed,
+                latency_ms=cfg.mock_llm_latency_ms,
+                latency_sigma=cfg.mock_llm_latency_sigma,
+                tokens_per_second=cfg.mock_llm_tokens_per_second,
+                error_rate=cfg.mock_llm_error_rate,
+            )
+        return provider
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import re
+
+from utils.logging import get_logger
+from utils.metrics import get_metrics
+
+
+logger = get_logger(__name__)
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on", "or",
+    "the", "to", "with", "your", "you", "we", "our", "will", "that", "this", "experience", "years",
+}
+# Paragraphs larger than this are split into lines so single bullets can be selected
+_MAX_CHUNK_TOKENS = 120
+
+_encoders: Dict[str, Any] = {}
+
+
+def _encoder(model: Optional[str]) -> Any:
+    key = model or ""
+    if key in _encoders:
+        return _encoders[key]
+    enc = None
+    try:
+        import tiktoken
+        try:
+            enc = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("cl100k_base")
+        except KeyError:
+            # Non-OpenAI models: cl100k is a close enough estimate for budgeting
+            enc = tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.info(f"tiktoken unavailable, estimating tokens as chars/4: {e}")
+    _encoders[key] = enc
+    return enc
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    if not text:
+        return 0
+    enc = _encoder(model)
+    if enc is None:
+        return (len(text) + 3) // 4
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def keywords(*texts: str) -> Set[str]:
+    words: Set[str] = set()
+    for text in texts:
+        for word in _WORD_RE.findall((text or "").lower()):
+            word = word.strip("./-")
+            if len(word) > 1 and word not in _STOPWORDS:
+                words.add(word)
+                # "Cloud/DevOps" and "node.js" should also match their parts
+                words.update(p for p in re.split(r"[/.-]", word) if len(p) > 1 and p not in _STOPWORDS)
+    return words
+
+
+@lru_cache(maxsize=1024)
+def _fixed_tokens(text: str, model: Optional[str]) -> int:
+    # Prefix and instruction parts repeat on every call of a session
+    return count_tokens(text, model)
+
+
+@dataclass
+class _Chunk:
+    text: str
+    tokens: int
+    words: frozenset
+
+
+@lru_cache(maxsize=256)
+def _chunks(text: str, model: Optional[str]) -> Tuple[_Chunk, ...]:
+    # Documents are re-sent every round; chunk and count them once
+    out: List[_Chunk] = []
+    for para in re.split(r"\n\s*\n", text.strip()):
+        para = para.strip()
+        if not para:
+            continue
+        tokens = count_tokens(para, model)
+        pieces = [para] if tokens <= _MAX_CHUNK_TOKENS else [line for line in para.splitlines() if line.strip()]
+        for piece in pieces:
+            n = tokens if len(pieces) == 1 else count_tokens(piece, model)
+            out.append(_Chunk(text=piece, tokens=n, words=frozenset(keywords(piece))))
+    return tuple(out)
+
+
+def select_relevant(text: str, terms: Set[str], budget: int, model: Optional[str] = None) -> str:
+    # Keep the opening chunk (name/title) plus the chunks sharing the most terms with the topic, in document order
+    return split_relevant(text, terms, budget, model)[0]
+
+
+def split_relevant(
+    text: str, terms: Set[str], budget: int, model: Optional[str] = None, fill: bool = False
+) -> Tuple[str, str]:
+    # select_relevant() plus the chunks it left out, so a later excerpt never repeats the selected ones;
+    # fill=True keeps adding chunks without matching terms, in document order, until the budget is used
+    chunks = _chunks(text, model)
+    if sum(c.tokens for c in chunks) <= budget:
+        return text, ""
+    ranked = sorted(range(len(chunks)), key=lambda i: (i != 0, -len(chunks[i].words & terms), i))
+    chosen: List[int] = []
+    used = 0
+    for i in ranked:
+        if i != 0 and not (chunks[i].words & terms) and chosen and not fill:
+            break
+        if used + chunks[i].tokens <= budget:
+            chosen.append(i)
+            used += chunks[i].tokens
+    picked = set(chosen)
+    kept = "\n".join(chunks[i].text for i in sorted(chosen))
+    rest = "\n\n".join(c.text for i, c in enumerate(chunks) if i not in picked)
+    return kept, rest
+
+
+@dataclass
+class BuiltPrompt:
+    text: str
+    tokens: int
+    full_tokens: int
+    # Session-invariant leading part, sent first so provider prompt caches can reuse it
+    prefix: str = ""
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.full_tokens - self.tokens)
+
+
+@dataclass
+class PromptBuilder:
+    # Fixed parts are always kept; documents are trimmed to their most relevant sections to fit the budget
+    agent: str
+    budget: int
+    model: Optional[str] = None
+    _parts: List[Tuple[str, str, Set[str], Optional[int]]] = field(default_factory=list)
+    _prefix: List[str] = field(default_factory=list)
+
+    def add(self, text: str, cacheable: bool = False) -> "PromptBuilder":
+        # Cacheable text must not vary between calls for a session; it is always kept and always goes first
+        if cacheable:
+            self._prefix.append(text)
+        else:
+            self._parts.append(("fixed", text, set(), None))
+        return self
+
+    def add_document(
+        self, label: str, text: str, terms: Iterable[str], max_tokens: Optional[int] = None
+    ) -> "PromptBuilder":
+        # max_tokens caps the document even when the whole prompt would fit the budget
+        self._parts.append((label, text or "", set(terms), max_tokens))
+        return self
+
+    def _render(self, docs: Dict[int, str]) -> str:
+        out = list(self._prefix)
+        for i, (label, text, _, _) in enumerate(self._parts):
+            out.append(text if label == "fixed" else f"{label}:\n{docs.get(i, text)}\n\n")
+        return "".join(out)
+
+    def _fixed_total(self) -> int:
+        # Everything but the document bodies: prefix, fixed parts and document labels
+        total = sum(_fixed_tokens(text, self.model) for text in self._prefix)
+        for label, text, _, _ in self._parts:
+            total += _fixed_tokens(text if label == "fixed" else f"{label}:\n\n\n", self.model)
+        return total
+
+    def _full_tokens(self) -> int:
+        # Untrimmed size from the documents' cached chunk counts, so full documents are never tokenized again;
+        # within a few tokens of counting the rendered prompt (chunk separators are not counted)
+        docs = sum(c.tokens for label, text, _, _ in self._parts if label != "fixed" for c in _chunks(text, self.model))
+        return self._fixed_total() + docs
+
+    def build(self) -> BuiltPrompt:
+        full_tokens = self._full_tokens()
+        capped = {
+            i: select_relevant(text, terms, cap, self.model)
+            for i, (label, text, terms, cap) in enumerate(self._parts)
+            if label != "fixed" and cap is not None
+        }
+        full = self._render(capped)
+        # Only a prompt that can fit is counted exactly; an oversized one goes straight to trimming
+        if capped or full_tokens <= self.budget:
+            tokens = count_tokens(full, self.model)
+            if not capped:
+                # The untrimmed prompt was just counted, so report its exact size instead of the estimate
+                full_tokens = tokens
+        else:
+            tokens = full_tokens
+        if tokens <= self.budget:
+            built = BuiltPrompt(text=full, tokens=tokens, full_tokens=full_tokens)
+        else:
+            remaining = max(0, self.budget - self._fixed_total())
+            # Smallest documents first so whatever they leave unused goes to the larger ones
+            doc_ids = sorted(
+                (i for i, p in enumerate(self._parts) if p[0] != "fixed"),
+                key=lambda i: len(self._parts[i][1]),
+            )
+            docs: Dict[int, str] = {}
+            for n, i in enumerate(doc_ids):
+                _, text, terms, cap = self._parts[i]
+                share = remaining // (len(doc_ids) - n)
+                if cap is not None:
+                    share = min(share, cap)
+                docs[i] = select_relevant(text, terms, share, self.model)
+                remaining -= count_tokens(docs[i], self.model)
+            text = self._render(docs)
+            built = BuiltPrompt(text=text, tokens=count_tokens(text, self.model), full_tokens=full_tokens)
+        prefix = "".join(self._prefix)
+        built.prefix, built.text = prefix, built.text[len(prefix):]
+        metrics = get_metrics()
+        metrics.inc("prompt_tokens_total", built.tokens, help="Prompt tokens after budgeting", agent=self.agent)
+        metrics.inc(
+            "prompt_tokens_saved_total", built.tokens_saved, help="Prompt tokens removed by budgeting", agent=self.agent
+        )
+        if built.tokens_saved:
+            logger.debug(f"{self.agent} prompt {built.full_tokens} -> {built.tokens} tokens, saved {built.tokens_saved}")
+        return built
@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import re
+import sys
+import threading
+import time
+import zlib
+from functools import lru_cache
+from dataclasses import asdict, dataclass, field
+from typing import AbstractSet, Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+from models import Topic
+from tools.prompt_builder import keywords
+from utils.config import load_config
+from utils.logging import get_logger
+from utils.metrics import get_metrics
+
+
+logger = get_logger(__name__)
+
+DEFAULT_PATH = os.path.join("data", "question_bank.json")
+
+
+def _norm(question: str) -> str:
+    return re.sub(r"\s+", " ", question.strip().lower())
+
+
+@dataclass
+class BankQuestion:
+    question: str
+    topic: str
+    depth: int
+    tags: List[str] = field(default_factory=list)
+    # Keywords of the target roles the question was asked or generated for
+    roles: List[str] = field(default_factory=list)
+    source: str = "generated"
+    # Times the question was added (transcripts repeat the good ones)
+    count: int = 1
+
+
+_RANKING_CACHE_MAX = 4096
+
+
+class QuestionBank:
+    # Questions indexed by (topic, depth) and (tag, depth), held in memory. Each (topic, tags, depth, role)
+    # ranking is computed once and cached, so a lookup is a dict hit plus skipping excluded questions.
+    def __init__(self, questions: Optional[Iterable[BankQuestion]] = None):
+        self.questions: List[BankQuestion] = []
+        self._keys: Dict[Tuple[str, str, int], int] = {}
+        self._norms: List[str] = []
+        self._by_topic: Dict[Tuple[str, int], List[int]] = {}
+        self._by_tag: Dict[Tuple[str, int], List[int]] = {}
+        self._role_sets: List[Set[str]] = []
+        # (topic, tags, depth, role terms) -> (ids best first, [start, end) of each equally ranked tier)
+        self._rankings: Dict[Tuple[Any, ...], Tuple[List[int], List[Tuple[int, int]]]] = {}
+        for q in questions or ():
+            self.add(q)
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def add(self, entry: BankQuestion) -> bool:
+        # Returns False when the question was already banked; its count, tags and roles are merged instead
+        key = (_norm(entry.question), entry.topic.lower(), entry.depth)
+        self._rankings.clear()
+        index = self._keys.get(key)
+        if index is not None:
+            existing = self.questions[index]
+            existing.count += entry.count
+            for tag in entry.tags:
+                if tag not in existing.tags:
+                    existing.tags.append(tag)
+                    self._by_tag.setdefault((tag.lower(), existing.depth), []).append(index)
+            existing.roles = sorted(set(existing.roles) | set(entry.roles))
+            self._role_sets[index] = set(existing.roles)
+            return False
+        index = len(self.questions)
+        self.questions.append(entry)
+        self._keys[key] = index
+        self._norms.append(key[0])
+        self._role_sets.append(set(entry.roles))
+        self._by_topic.setdefault((entry.topic.lower(), entry.depth), []).append(index)
+        for tag in entry.tags:
+            self._by_tag.setdefault((tag.lower(), entry.depth), []).append(index)
+        return True
+
+    def candidates(self, topic: str, tags: Sequence[str], depth: int) -> List[int]:
+        ids = self._by_topic.get((topic.lower(), depth))
+        if ids:
+            return ids
+        # A topic the bank has never seen can still match on its tags
+        merged: List[int] = []
+        for tag in tags:
+            for i in self._by_tag.get((tag.lower(), depth), ()):
+                if i not in merged:
+                    merged.append(i)
+        return merged
+
+    def lookup(
+        self,
+        topic: str,
+        tags: Sequence[str],
+        depth: int,
+        role_terms: AbstractSet[str],
+        exclude: Iterable[str] = (),
+        turn: int = 0,
+        skip: Optional[Callable[[str], bool]] = None,
+    ) -> Optional[str]:
+        # Best role match first, then the most frequently banked; `turn` rotates through the best tier so
+        # sessions (and rounds within one) do not all get the same question. `skip` rejects further
+        # questions, e.g. near-duplicates of ones already asked
+        ranked, tiers = self._ranking(topic, tags, depth, role_terms)
+        excluded = {_norm(q) for q in exclude}
+        for start, end in tiers:
+            size = end - start
+            for k in range(size):
+                i = ranked[start + (turn + k) % size]
+                if self._norms[i] not in excluded and not (skip and skip(self.questions[i].question)):
+                    return self.questions[i].question
+        return None
+
+    def _ranking(
+        self, topic: str, tags: Sequence[str], depth: int, role_terms: AbstractSet[str]
+    ) -> Tuple[List[int], List[Tuple[int, int]]]:
+        key = (topic.lower(), tuple(tags), depth, frozenset(role_terms))
+        cached = self._rankings.get(key)
+        if cached is not None:
+            return cached
+        scored = sorted(
+            ((len(role_terms & self._role_sets[i]), self.questions[i].count, i)
+             for i in self.candidates(topic, tags, depth)),
+            key=lambda r: (-r[0], -r[1], r[2]),
+        )
+        tiers: List[Tuple[int, int]] = []
+        for n, (overlap, _, _) in enumerate(scored):
+            if not tiers or scored[tiers[-1][0]][0] != overlap:
+                tiers.append((n, n + 1))
+            else:
+                tiers[-1] = (tiers[-1][0], n + 1)
+        if len(self._rankings) >= _RANKING_CACHE_MAX:
+            self._rankings.clear()
+        cached = self._rankings[key] = ([r[2] for r in scored], tiers)
+        return cached
+
+    def coverage(self) -> Dict[str, Dict[int, int]]:
+        result: Dict[str, Dict[int, int]] = {}
+        for q in self.questions:
+            depths = result.setdefault(q.topic, {})
+            depths[q.depth] = depths.get(q.depth, 0) + 1
+        return result
+
+    @staticmethod
+    def load(path: str) -> "QuestionBank":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return QuestionBank(BankQuestion(**q) for q in data.get("questions", []))
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"v": 1, "questions": [asdict(q) for q in self.questions]}, f, indent=1)
+        os.replace(tmp, path)
+
+
+_bank: Optional[QuestionBank] = None
+_bank_loaded = False
+_bank_lock = threading.Lock()
+
+
+def get_question_bank() -> Optional[QuestionBank]:
+    # None unless QUESTION_BANK_PATH points at a bank file; loaded once per process
+    global _bank, _bank_loaded
+    with _bank_lock:
+        if not _bank_loaded:
+            _bank_loaded = True
+            path = load_config().question_bank_path
+            if path and os.path.isfile(path):
+                try:
+                    _bank = QuestionBank.load(path)
+                    logger.info(f"Loaded {len(_bank)} banked questions from {path}")
+                except Exception as e:
+                    logger.warning(f"Question bank {path} unusable: {e}")
+            elif path:
+                logger.warning(f"Question bank {path} not found; questions are generated")
+        return _bank
+
+
+@lru_cache(maxsize=1024)
+def role_terms(role: str) -> FrozenSet[str]:
+    return frozenset(keywords(role))
+
+
+def session_turn(session_id: str, asked_on_topic: int) -> int:
+    return zlib.crc32(session_id.encode("utf-8")) + asked_on_topic
+
+
+def count_lookup(hit: bool) -> None:
+    get_metrics().inc("question_bank_total", help="Question bank lookups", result="hit" if hit else "miss")
+
+
+# Building -----------------------------------------------------------------------------------------------
+
+def _topic_tags(topics: Sequence[Topic]) -> Dict[str, List[str]]:
+    return {t.name.lower(): list(t.tags) for t in topics}
+
+
+def from_exports(paths: Iterable[str], topics: Sequence[Topic] = ()) -> List[BankQuestion]:
+    # Files written by tools.export (session_to_dict); follow-ups the evaluator made up are banked as well,
+    # under the depth they were asked at
+    tags = _topic_tags(topics)
+    entries: List[BankQuestion] = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        roles = sorted(role_terms(str(data.get("target_role", ""))))
+        for i in data.get("interactions", []):
+            question = str(i.get("question", "")).strip()
+            if not question or question == "(unspecified)":
+                continue
+            topic = str(i.get("topic", ""))
+            entries.append(
+                BankQuestion(
+                    question=question,
+                    topic=topic,
+                    depth=int(i.get("depth", 0)),
+                    tags=tags.get(topic.lower(), []),
+                    roles=roles,
+                    source="transcript",
+                )
+            )
+    return entries
+
+
+async def generate(topics: Sequence[Topic], role: str, per_depth: int, topics_per_call: int = 3) -> List[BankQuestion]:
+    # Candidate-independent questions for a role, in the interviewer's batched planning format
+    from agents.interviewer_agent import PLANNER_SYSTEM, parse_question_plan, plan_topics_block
+    from tools.llm_client import ChatMessage, get_llm_client
+
+    client = get_llm_client()
+    roles = sorted(role_terms(role))
+
+    async def batch(chunk: List[Topic]) -> List[BankQuestion]:
+        user = (
+            f"Target Role: {role}\n"
+            + plan_topics_block(chunk)
+            + f"Write {per_depth} questions for every depth of every topic above. Each question is ONE question. "
+            "They are reused across candidates, so do not refer to any particular resume."
+        )
+        raw = await client.acomplete(
+            PLANNER_SYSTEM,
+            [ChatMessage(role="user", content=user)],
+            temperature=0.7,
+            use_cache=False,
+            agent="question_bank",
+        )
+        by_name = {t.name: t for t in chunk}
+        return [
+            BankQuestion(question=q, topic=name, depth=depth, tags=list(by_name[name].tags), roles=roles)
+            for (name, depth), questions in parse_question_plan(raw, chunk, per_depth).items()
+            for q in questions
+        ]
+
+    chunks = [list(topics[i:i + topics_per_call]) for i in range(0, len(topics), max(1, topics_per_call))]
+    results = await asyncio.gather(*(batch(c) for c in chunks), return_exceptions=True)
+    entries: List[BankQuestion] = []
+    for chunk, result in zip(chunks, results):
+        if isinstance(result, BaseException):
+            logger.warning(f"Generation failed for {', '.join(t.name for t in chunk)}: {result}")
+            continue
+        entries.extend(result)
+    return entries
+
+
+def _export_paths(patterns: Sequence[str]) -> List[str]:
+    paths: List[str] = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "*.json")
+        paths.extend(sorted(glob.glob(pattern)))
+    return paths
+
+
+def _hit_rate(url: str) -> Dict[str, Any]:
+    import httpx
+
+    counts = {"hit": 0.0, "miss": 0.0}
+    for line in httpx.get(f"{url.rstrip('/')}/metrics", timeout=5.0).text.splitlines():
+        m = re.match(r'^\w*question_bank_total\{result="(hit|miss)"\} (\S+)', line)
+        if m:
+            counts[m.group(1)] = float(m.group(2))
+    total = counts["hit"] + counts["miss"]
+    hit_rate = round(counts["hit"] / total, 4) if total else None
+    return {"lookups": int(total), "hits": int(counts["hit"]), "hit_rate": hit_rate}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build and inspect the offline question bank")
+    parser.add_argument("--bank", default=None, help=f"bank file (default QUESTION_BANK_PATH or {DEFAULT_PATH})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="add questions from exported sessions and/or batch generation")
+    build.add_argument("--exports", nargs="*", default=[], help="session_to_dict JSON files, globs or directories")
+    build.add_argument("--topics", default=os.path.join("data", "sample_topics.json"), help="topics JSON (tags)")
+    build.add_argument("--generate", action="store_true", help="generate questions for --topics with the LLM")
+    build.add_argument("--role", action="append", default=[], help="target role to generate for (repeatable)")
+    build.add_argument("--per-depth", type=int, default=3)
+    build.add_argument("--replace", action="store_true", help="start from an empty bank instead of merging")
+
+    stats = sub.add_parser("stats", help="coverage per topic/depth, plus live hit rate with --url")
+    stats.add_argument("--url", help="server whose /metrics holds question_bank_total")
+
+    query = sub.add_parser("query", help="look a question up and time the lookup")
+    query.add_argument("--topic", required=True)
+    query.add_argument("--tags", nargs="*", default=[])
+    query.add_argument("--depth", type=int, default=0)
+    query.add_argument("--role", default="")
+    args = parser.parse_args()
+
+    path = args.bank or load_config().question_bank_path or DEFAULT_PATH
+    fresh = (args.command == "build" and args.replace) or not os.path.isfile(path)
+    bank = QuestionBank() if fresh else QuestionBank.load(path)
+
+    if args.command == "build":
+        from parsers.topics_loader import load_topics_from_json
+
+        topics = load_topics_from_json(args.topics) if os.path.isfile(args.topics) else []
+        before = len(bank)
+        entries = from_exports(_export_paths(args.exports), topics)
+        if args.generate:
+            if not topics:
+                sys.exit(f"--generate needs a topics file, {args.topics} not found")
+            for role in args.role or ["Software Engineer"]:
+                entries.extend(asyncio.run(generate(topics, role, args.per_depth)))
+        for entry in entries:
+            bank.add(entry)
+        bank.save(path)
+        added = len(bank) - before
+        print(json.dumps({"bank": path, "added": added, "merged": len(entries) - added, "total": len(bank)}))
+    elif args.command == "stats":
+        result: Dict[str, Any] = {"bank": path, "total": len(bank), "coverage": bank.coverage()}
+        if args.url:
+            result["live"] = _hit_rate(args.url)
+        print(json.dumps(result, indent=2))
+    else:
+        terms = role_terms(args.role)
+        start = time.perf_counter()
+        question = bank.lookup(args.topic, args.tags, args.depth, terms)
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        print(json.dumps({"question": question, "lookup_us": round(elapsed_us, 2)}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, Dict, Optional
+import asyncio
+import threading
+import time
+
+from utils.config import load_config
+from utils.logging import get_logger
+from utils.metrics import get_metrics
+
+
+logger = get_logger(__name__)
+
+# Lower is served first: a pending evaluation blocks the round, a hint is optional, a speculative question
+# may never be used
+PRIORITY_EVALUATION = 0
+PRIORITY_INTERACTIVE = 1
+PRIORITY_HINT = 2
+PRIORITY_BACKGROUND = 3
+AGENT_PRIORITIES = {"evaluator": PRIORITY_EVALUATION, "hints": PRIORITY_HINT}
+# Buckets hold this many seconds of quota, so a burst cannot use up a whole minute at once
+_BURST_SECONDS = 10.0
+
+
+def priority_for(agent: str) -> int:
+    return AGENT_PRIORITIES.get(agent.split(".", 1)[0], PRIORITY_INTERACTIVE)
+
+
+class RateLimitError(Exception):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float, burst_seconds: float = _BURST_SECONDS):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, amount: float) -> float:
+        # Seconds until `amount` can be taken; requests larger than the bucket wait for a full one
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+
+@dataclass
+class _Waiter:
+    future: asyncio.Future
+    tokens: int
+
+
+class AdmissionController:
+    # Per-provider gate in front of every LLM request: a concurrency cap plus requests- and tokens-per-minute
+    # buckets. Waiters are served by priority, then round-robin across sessions, FIFO within a session,
+    # so one busy session cannot starve the others.
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_concurrency: int = 0,
+        queue_timeout: float = 30.0,
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        # priority -> session -> waiters
+        self._queues: Dict[int, "OrderedDict[str, Deque[_Waiter]]"] = {}
+        self._waiting = 0
+        self._in_flight = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def counts_tokens(self) -> bool:
+        return self._tokens is not None
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    async def acquire(self, tokens: int = 0, priority: int = PRIORITY_INTERACTIVE, session: str = "") -> float:
+        # Returns the seconds spent queued; every successful acquire must be paired with release()
+        start = time.perf_counter()
+        if not self._waiting and self._can_admit(tokens) == 0.0:
+            self._admit(tokens)
+            return 0.0
+        waiter = _Waiter(future=asyncio.get_running_loop().create_future(), tokens=tokens)
+        self._queues.setdefault(priority, OrderedDict()).setdefault(session, deque()).append(waiter)
+        self._waiting += 1
+        self._gauge()
+        self._dispatch()
+        try:
+            await asyncio.wait_for(waiter.future, self.queue_timeout if self.queue_timeout > 0 else None)
+        except asyncio.TimeoutError:
+            self._forget()
+            get_metrics().inc(
+                "llm_admission_timeouts_total", help="Requests dropped from the LLM queue", provider=self.name
+            )
+            raise RateLimitError(f"queued over {self.queue_timeout:g}s for {self.name}") from None
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Admitted just as the caller gave up
+                self.release()
+            else:
+                self._forget()
+            raise
+        return time.perf_counter() - start
+
+    def try_acquire(self, tokens: int = 0) -> bool:
+        # Admits only if that needs no waiting and nobody is queued; pair a True result with release()
+        if self._waiting or self._can_admit(tokens) != 0.0:
+            return False
+        self._admit(tokens)
+        self._gauge()
+        return True
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(
+        self, tokens: int = 0, priority: int = PRIORITY_INTERACTIVE, session: str = ""
+    ) -> AsyncIterator[float]:
+        waited = await self.acquire(tokens, priority, session)
+        try:
+            yield waited
+        finally:
+            self.release()
+
+    def _can_admit(self, tokens: int) -> Optional[float]:
+        # None while the concurrency cap is reached, else seconds until the buckets allow the request
+        if self.max_concurrency and self._in_flight >= self.max_concurrency:
+            return None
+        delay = self._requests.delay(1) if self._requests else 0.0
+        if self._tokens is not None and tokens:
+            delay = max(delay, self._tokens.delay(tokens))
+        return delay
+
+    def _admit(self, tokens: int) -> None:
+        if self._requests is not None:
+            self._requests.take(1)
+        if self._tokens is not None and tokens:
+            self._tokens.take(tokens)
+        self._in_flight += 1
+
+    def _head(self) -> Optional[tuple[int, str, _Waiter]]:
+        for priority in sorted(self._queues):
+            sessions = self._queues[priority]
+            for session in list(sessions):
+                waiters = sessions[session]
+                # Waiters that timed out or were cancelled are dropped lazily
+                while waiters and waiters[0].future.done():
+                    waiters.popleft()
+                if waiters:
+                    return priority, session, waiters[0]
+                del sessions[session]
+            del self._queues[priority]
+        return None
+
+    def _dispatch(self) -> None:
+        while True:
+            head = self._head()
+            if head is None:
+                self._waiting = 0
+                break
+            priority, session, waiter = head
+            delay = self._can_admit(waiter.tokens)
+            if delay is None:
+                break
+            if delay > 0:
+                self._schedule(delay)
+                break
+            self._admit(waiter.tokens)
+            sessions = self._queues[priority]
+            sessions[session].popleft()
+            # Next turn at this priority goes to another session
+            sessions.move_to_end(session)
+            self._waiting -= 1
+            waiter.future.set_result(None)
+        self._gauge()
+
+    def _schedule(self, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+        when = loop.time() + delay
+        if self._timer is not None:
+            if self._timer_loop is loop and self._timer.when() <= when:
+                return
+            self._timer.cancel()
+        self._timer, self._timer_loop = loop.call_later(delay, self._wake), loop
+
+    def _wake(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def _forget(self) -> None:
+        self._waiting = max(0, self._waiting - 1)
+        # The head may have been the one that left; let the next waiter in if it fits
+        self._dispatch()
+
+    def _gauge(self) -> None:
+        metrics = get_metrics()
+        metrics.set("llm_queue_depth", self._waiting, help="LLM requests waiting for admission", provider=self.name)
+        metrics.set("llm_in_flight", self._in_flight, help="LLM requests admitted and in flight", provider=self.name)
+
+
+_controllers: Dict[str, AdmissionController] = {}
+_controllers_lock = threading.Lock()
+
+
+def get_admission_controller(provider: str) -> AdmissionController:
+    # One per provider for the whole process, shared by every agent and session
+    with _controllers_lock:
+        controller = _controllers.get(provider)
+        if controller is None:
+            cfg = load_config()
+            controller = _controllers[provider] = AdmissionController(
+                provider,
+                requests_per_minute=cfg.llm_requests_per_minute.get(provider, 0),
+                tokens_per_minute=cfg.llm_tokens_per_minute.get(provider, 0),
+                max_concurrency=cfg.llm_max_concurrency.get(provider, cfg.llm_max_connections),
+                queue_timeout=cfg.llm_queue_timeout_seconds,
+            )
+            logger.info(
+                f"LLM admission for {provider}: concurrency={controller.max_concurrency or 'unlimited'} "
+                f"rpm={cfg.llm_requests_per_minute.get(provider, 0) or 'unlimited'} "
+                f"tpm={cfg.llm_tokens_per_minute.get(provider, 0) or 'unlimited'}"
+            )
+        return controller
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+import asyncio
+import random
+import threading
+import time
+
+from utils.histogram import LogHistogram
+from utils.logging import get_logger
+from utils.metrics import get_metrics
+
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Transient on the provider side: timeouts, conflicts, rate limits, overload and server errors
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+# Caused by the request itself; says nothing about the provider's health
+REQUEST_ERROR_STATUS = {400, 404, 413, 422}
+_RETRYABLE_ERROR_NAMES = {
+    "APIConnectionError", "APITimeoutError", "ConnectError", "ConnectTimeout", "ReadTimeout", "ReadError",
+    "RemoteProtocolError", "PoolTimeout", "TimeoutException", "TimeoutError",
+}
+
+
+def status_code_of(error: BaseException) -> Optional[int]:
+    code = getattr(error, "status_code", None)
+    if code is None:
+        response = getattr(error, "response", None)
+        code = getattr(response, "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def is_retryable(error: BaseException, status_code: Optional[int] = None) -> bool:
+    if status_code is None:
+        status_code = status_code_of(error)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    return type(error).__name__ in _RETRYABLE_ERROR_NAMES
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    # Exponential backoff with full jitter: concurrent callers spread out instead of retrying in lockstep
+    return random.uniform(0.0, min(cap, base * (2 ** (attempt - 1))))
+
+
+class CircuitBreaker:
+    # closed -> open after `failure_threshold` consecutive failures; open -> half_open after `reset_seconds`,
+    # where one probe request decides between closing again and another open period
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_seconds:
+                    return False
+                self._set(self.HALF_OPEN)
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probe_in_flight = False
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit {self.name} closed")
+                self._set(self.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Circuit {self.name} opened after {self._failures} consecutive failures")
+                self._opened_at = time.monotonic()
+                self._set(self.OPEN)
+
+    def release(self) -> None:
+        # An admitted call ended without an outcome (e.g. cancelled); let the next call probe instead
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _set(self, state: str) -> None:
+        self._state = state
+        get_metrics().set(
+            "llm_circuit_state",
+            {self.CLOSED: 0, self.HALF_OPEN: 1, self.OPEN: 2}[state],
+            help="Circuit breaker state (0 closed, 1 half-open, 2 open)",
+            target=self.name,
+        )
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str, failure_threshold: int = 5, reset_seconds: float = 30.0) -> CircuitBreaker:
+    # Shared by every client and agent in the process, so one outage opens the circuit for all of them
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name, failure_threshold, reset_seconds)
+        return breaker
+
+
+class LatencyTracker:
+    # Successful single-attempt latencies per target; the hedge delay is a high quantile of them
+    # and latency-based routing compares their moving averages
+    def __init__(self, min_samples: int = 20, alpha: float = 0.2):
+        self.min_samples = min_samples
+        self.alpha = alpha
+        self._hists: Dict[str, LogHistogram] = {}
+        self._ewma: Dict[str, float] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        hist = self._hists.get(name)
+        if hist is None:
+            hist = self._hists[name] = LogHistogram(min_value=1e-3, max_value=600.0)
+        hist.record(seconds)
+        previous = self._ewma.get(name)
+        self._ewma[name] = seconds if previous is None else previous + self.alpha * (seconds - previous)
+
+    def average(self, name: str, min_samples: int = 1) -> Optional[float]:
+        # Exponentially weighted, so a target that slowed down recently loses its place quickly
+        hist = self._hists.get(name)
+        if hist is None or hist.count < min_samples:
+            return None
+        return self._ewma[name]
+
+    def quantile(self, name: str, q: float) -> Optional[float]:
+        hist = self._hists.get(name)
+        if hist is None or hist.count < self.min_samples:
+            return None
+        return hist.quantile(q)
+
+
+async def hedge(
+    call: Callable[[], Awaitable[T]],
+    delay: Optional[float],
+    on_hedge: Optional[Callable[[], None]] = None,
+    admit: Optional[Callable[[], bool]] = None,
+    release: Optional[Callable[[], None]] = None,
+) -> T:
+    # Starts a second identical call if the first has not finished after `delay`; the first success wins.
+    # admit() is asked first and may refuse the second call; release() runs once an admitted one is done.
+    if delay is None:
+        return await call()
+    first = asyncio.ensure_future(call())
+    pending = {first}
+    try:
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if done:
+            return first.result()
+        if admit is not None and not admit():
+            return await first
+        if on_hedge is not None:
+            on_hedge()
+        second = asyncio.ensure_future(call())
+        if release is not None:
+            # A done callback also runs for a task cancelled before it started, unlike a finally block
+            second.add_done_callback(lambda _: release())
+        pending.add(second)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        assert error is not None
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
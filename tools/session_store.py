@@ -0,0 +1,373 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+from models import Evaluation, Interaction, InterviewSession, Topic, TopicPlan, TopicProgress
+from parsers.digest import DocumentDigest, build_digest, intern_digest
+from utils.config import AppConfig
+from utils.logging import get_logger
+
+
+logger = get_logger(__name__)
+
+
+def dump_session(session: InterviewSession) -> Dict[str, Any]:
+    # Positional lists keep long transcripts compact; topics are stored once and referenced by index
+    plan = session.topic_plan
+    # Lists are copied, so the returned state is a snapshot the session's later changes cannot reach
+    topics = [[t.name, t.description, list(t.tags), t.max_depth] for t in plan.topics]
+    index = {id(t): i for i, t in enumerate(plan.topics)}
+    return {
+        "v": 1,
+        "id": session.session_id,
+        "cand": session.candidate_name,
+        "role": session.target_role,
+        "resume": session.resume_text,
+        "jd": session.job_description_text,
+        "topics": topics,
+        "cur": plan.current_index,
+        "prog": [
+            [index.get(id(p.topic), i), p.depth, int(p.completed), p.rounds_on_topic]
+            for i, p in enumerate(plan.progress)
+        ],
+        "ix": [
+            [
+                i.topic,
+                i.question,
+                i.answer,
+                (
+                    [
+                        i.evaluation.score,
+                        i.evaluation.brief_feedback,
+                        list(i.evaluation.strengths),
+                        list(i.evaluation.improvements),
+                        i.evaluation.follow_up_question,
+                    ]
+                    if i.evaluation
+                    else None
+                ),
+                i.asked_at,
+                i.answered_at,
+                i.depth,
+            ]
+            for i in session.interactions
+        ],
+        "start": session.started_at,
+        "end": session.ended_at,
+        "metrics": dict(session.metrics),
+        "rd": session.resume_digest.to_dict() if session.resume_digest else None,
+        "jdd": session.jd_digest.to_dict() if session.jd_digest else None,
+        "qp": [
+            [topic, depth, list(questions)] for (topic, depth), questions in session.question_pool.items() if questions
+        ],
+    }
+
+
+def _load_digest(data: Optional[Dict[str, Any]], text: str, kind: str) -> DocumentDigest:
+    # Records written before digests existed get one built (or served from the shared cache) on load
+    return intern_digest(DocumentDigest.from_dict(data)) if data else build_digest(text, kind)
+
+
+def load_session(state: Dict[str, Any]) -> InterviewSession:
+    topics = [Topic(name=t[0], description=t[1], tags=list(t[2]), max_depth=int(t[3])) for t in state["topics"]]
+    progress = [
+        TopicProgress(topic=topics[p[0]], depth=int(p[1]), completed=bool(p[2]), rounds_on_topic=int(p[3]))
+        for p in state["prog"]
+    ]
+    interactions = []
+    for row in state["ix"]:
+        # Rows written before depth was recorded have six fields
+        topic, question, answer, ev, asked_at, answered_at = row[:6]
+        evaluation = None
+        if ev is not None:
+            evaluation = Evaluation(
+                score=float(ev[0]),
+                brief_feedback=ev[1],
+                strengths=list(ev[2]),
+                improvements=list(ev[3]),
+                follow_up_question=ev[4],
+            )
+        interactions.append(
+            Interaction(
+                topic=topic,
+                question=question,
+                answer=answer,
+                evaluation=evaluation,
+                asked_at=asked_at,
+                answered_at=answered_at,
+                depth=int(row[6]) if len(row) > 6 else 0,
+            )
+        )
+    return InterviewSession(
+        session_id=state["id"],
+        candidate_name=state["cand"],
+        target_role=state["role"],
+        resume_text=state["resume"],
+        job_description_text=state["jd"],
+        topic_plan=TopicPlan(topics=topics, current_index=int(state["cur"]), progress=progress),
+        interactions=interactions,
+        started_at=state["start"],
+        ended_at=state["end"],
+        metrics=dict(state.get("metrics") or {}),
+        resume_digest=_load_digest(state.get("rd"), state["resume"], "resume"),
+        jd_digest=_load_digest(state.get("jdd"), state["jd"], "jd"),
+        question_pool={(topic, int(depth)): list(questions) for topic, depth, questions in state.get("qp") or []},
+    )
+
+
+class SessionConflict(Exception):
+    # Raised by put() when another request (or worker) saved the session since this record was loaded
+    def __init__(self, session_id: str):
+        super().__init__(f"session {session_id} was modified concurrently")
+        self.session_id = session_id
+
+
+@dataclass
+class SessionRecord:
+    session: InterviewSession
+    pending_question: Optional[str] = None
+    version: int = 0
+    updated_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class _Saved:
+    # What a store keeps per session: the dumped state as of the last successful put(). Every get() builds a
+    # new session from it, so changes a request makes are only seen by others once that request saves, and
+    # two requests for one session in the same worker are caught by the version check like any others.
+    state: Dict[str, Any]
+    pending_question: Optional[str]
+    version: int
+    updated_at: float
+
+    def record(self) -> SessionRecord:
+        return SessionRecord(load_session(self.state), self.pending_question, self.version, self.updated_at)
+
+
+class SessionStore:
+    def get(self, session_id: str) -> Optional[SessionRecord]:
+        raise NotImplementedError
+
+    def put(self, record: SessionRecord) -> None:
+        # Saves the record if the stored version is still record.version (0 = new session), then bumps it;
+        # raises SessionConflict otherwise
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> None:
+        raise NotImplementedError
+
+    def exists(self, session_id: str) -> bool:
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def evict_idle(self, max_idle_seconds: float) -> int:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class InMemorySessionStore(SessionStore):
+    # Process-local LRU; records expire after ttl_seconds without access
+    def __init__(self, max_sessions: int = 10000, ttl_seconds: float = 6 * 3600.0):
+        self.max_sessions = max(1, max_sessions)
+        self.ttl_seconds = ttl_seconds
+        self._records: "OrderedDict[str, _Saved]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Optional[SessionRecord]:
+        with self._lock:
+            saved = self._records.get(session_id)
+            if saved is None:
+                return None
+            if time.time() - saved.updated_at > self.ttl_seconds:
+                del self._records[session_id]
+                return None
+            saved.updated_at = time.time()
+            self._records.move_to_end(session_id)
+        return saved.record()
+
+    def put(self, record: SessionRecord) -> None:
+        session_id = record.session.session_id
+        state = dump_session(record.session)
+        with self._lock:
+            stored = self._records.get(session_id)
+            if (stored.version if stored is not None else 0) != record.version:
+                raise SessionConflict(session_id)
+            record.version += 1
+            record.updated_at = time.time()
+            self._records[session_id] = _Saved(state, record.pending_question, record.version, record.updated_at)
+            self._records.move_to_end(session_id)
+            while len(self._records) > self.max_sessions:
+                evicted, _ = self._records.popitem(last=False)
+                logger.info(f"Evicted session {evicted} (store full)")
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._records.pop(session_id, None)
+
+    def exists(self, session_id: str) -> bool:
+        return session_id in self._records
+
+    def count(self) -> int:
+        return len(self._records)
+
+    def evict_idle(self, max_idle_seconds: float) -> int:
+        cutoff = time.time() - max_idle_seconds
+        with self._lock:
+            idle = [sid for sid, r in self._records.items() if r.updated_at < cutoff]
+            for sid in idle:
+                del self._records[sid]
+        return len(idle)
+
+
+class SQLiteSessionStore(SessionStore):
+    # Shared by every worker process on the host; each process keeps decoded states keyed by row version
+    def __init__(self, path: str, ttl_seconds: float = 6 * 3600.0, cache_size: int = 1000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.cache_size = max(1, cache_size)
+        self._cache: "OrderedDict[str, _Saved]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, state BLOB NOT NULL, pending_question TEXT, "
+            "version INTEGER NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS sessions_updated ON sessions(updated_at)")
+
+    @staticmethod
+    def _encode(state: Dict[str, Any]) -> bytes:
+        return zlib.compress(json.dumps(state, separators=(",", ":")).encode("utf-8"))
+
+    @staticmethod
+    def _decode(blob: bytes) -> Dict[str, Any]:
+        return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+    def get(self, session_id: str) -> Optional[SessionRecord]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT version, pending_question, updated_at FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                self._cache.pop(session_id, None)
+                return None
+            version, pending_question, updated_at = row
+            if now - updated_at > self.ttl_seconds:
+                self._db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+                self._cache.pop(session_id, None)
+                return None
+            saved = self._cache.get(session_id)
+            if saved is not None and saved.version == version:
+                # Unchanged since this process last saw it: skip the blob read and decode
+                self._cache.move_to_end(session_id)
+            else:
+                (blob,) = self._db.execute(
+                    "SELECT state FROM sessions WHERE session_id = ?", (session_id,)
+                ).fetchone()
+                saved = _Saved(self._decode(blob), pending_question, version, updated_at)
+                self._remember(session_id, saved)
+        return saved.record()
+
+    def put(self, record: SessionRecord) -> None:
+        # Compare-and-set on the row version, so two workers that loaded the same version cannot both save;
+        # the new version comes from the database, not from this process's counter
+        session_id = record.session.session_id
+        state = dump_session(record.session)
+        blob = self._encode(state)
+        now = time.time()
+        with self._lock:
+            if record.version == 0:
+                try:
+                    self._db.execute(
+                        "INSERT INTO sessions (session_id, state, pending_question, version, updated_at) "
+                        "VALUES (?, ?, ?, 1, ?)",
+                        (session_id, blob, record.pending_question, now),
+                    )
+                except sqlite3.IntegrityError:
+                    raise SessionConflict(session_id) from None
+                version = 1
+            else:
+                # One write transaction, so the version read back is the one this UPDATE wrote
+                self._db.execute("BEGIN IMMEDIATE")
+                try:
+                    updated = self._db.execute(
+                        "UPDATE sessions SET state = ?, pending_question = ?, version = version + 1, updated_at = ? "
+                        "WHERE session_id = ? AND version = ?",
+                        (blob, record.pending_question, now, session_id, record.version),
+                    ).rowcount
+                    row = self._db.execute(
+                        "SELECT version FROM sessions WHERE session_id = ?", (session_id,)
+                    ).fetchone() if updated else None
+                    self._db.execute("COMMIT")
+                except BaseException:
+                    self._db.execute("ROLLBACK")
+                    raise
+                if row is None:
+                    # Someone else saved (or evicted) it; the next get() reloads the current row
+                    self._cache.pop(session_id, None)
+                    raise SessionConflict(session_id)
+                (version,) = row
+            record.version = version
+            record.updated_at = now
+            # Only a successful save reaches the cache; a failed request leaves no trace in it
+            self._remember(session_id, _Saved(state, record.pending_question, version, now))
+
+    def _remember(self, session_id: str, saved: _Saved) -> None:
+        self._cache[session_id] = saved
+        self._cache.move_to_end(session_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._cache.pop(session_id, None)
+
+    def exists(self, session_id: str) -> bool:
+        with self._lock:
+            row = self._db.execute("SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return row is not None
+
+    def count(self) -> int:
+        with self._lock:
+            (n,) = self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()
+        return int(n)
+
+    def evict_idle(self, max_idle_seconds: float) -> int:
+        cutoff = time.time() - max_idle_seconds
+        with self._lock:
+            idle: List[Tuple[str]] = self._db.execute(
+                "SELECT session_id FROM sessions WHERE updated_at < ?", (cutoff,)
+            ).fetchall()
+            self._db.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,))
+            for (sid,) in idle:
+                self._cache.pop(sid, None)
+        return len(idle)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def create_session_store(config: AppConfig) -> SessionStore:
+    if config.session_store == "sqlite":
+        return SQLiteSessionStore(
+            config.session_db_path,
+            ttl_seconds=config.session_ttl_seconds,
+            cache_size=config.session_max_in_memory,
+        )
+    return InMemorySessionStore(max_sessions=config.session_max_in_memory, ttl_seconds=config.session_ttl_seconds)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import time
 from typing import List
 
 from models import InterviewSession, Topic
@@ -32,12 +33,10 @@ async def run_scripted_session(answers: List[str]) -> InterviewSession:
 
 
 def summarize(session: InterviewSession) -> dict:
-    scores = [i.evaluation.score for i in session.interactions if i.evaluation]
-    avg = (sum(scores) / len(scores)) if scores else 0.0
     return {
         "session_id": session.session_id,
         "num_questions": len(session.interactions),
-        "avg_score": round(avg, 2),
+        "avg_score": round(session.average_score, 2),
         "topics": [i.topic for i in session.interactions],
     }
 
@@ -66,15 +65,31 @@ async def scenario_empty_and_long() -> dict:
 
 
 async def run_all() -> dict:
-    return {
-        "happy_path": await scenario_happy_path(),
-        "next_commands": await scenario_next_commands(),
-        "empty_and_long": await scenario_empty_and_long(),
-    }
+    results = {}
+    for name, scenario in (
+        ("happy_path", scenario_happy_path),
+        ("next_commands", scenario_next_commands),
+        ("empty_and_long", scenario_empty_and_long),
+    ):
+        start = time.perf_counter()
+        results[name] = await scenario()
+        results[name]["elapsed_seconds"] = round(time.perf_counter() - start, 3)
+    return results
 
 
 if __name__ == "__main__":
-    import json, asyncio, sys
+    import argparse, json, asyncio, os, sys
+    parser = argparse.ArgumentParser(description="Run scripted interview sessions")
+    parser.add_argument("--record", metavar="PATH", help="append every LLM call to a transcript file")
+    parser.add_argument("--replay", metavar="PATH", help="answer LLM calls from a recorded transcript")
+    parser.add_argument("--timed", action="store_true", help="replay with the recorded latencies")
+    args = parser.parse_args()
+    # Read by LLMClient when the agents are first created
+    if args.record:
+        os.environ["LLM_TRANSCRIPT_RECORD"] = args.record
+    if args.replay:
+        os.environ["LLM_TRANSCRIPT_REPLAY"] = args.replay
+        os.environ["LLM_TRANSCRIPT_REPLAY_MODE"] = "timed" if args.timed else "fast"
     try:
         if sys.platform.startswith("win"):
             # Use SelectorEventLoopPolicy to reduce proactor warnings in batch mode
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import json
 import os
 
 
@@ -13,6 +14,114 @@ class AppConfig:
     request_timeout_seconds: int
     max_retries: int
     log_level: str
+    llm_max_connections: int = 100
+    llm_max_keepalive_connections: int = 20
+    llm_keepalive_expiry_seconds: float = 30.0
+    llm_cache_enabled: bool = False
+    llm_cache_max_entries: int = 1000
+    llm_cache_ttl_seconds: float = 3600.0
+    llm_cache_db_path: Optional[str] = None
+    llm_cache_max_disk_entries: int = 50000
+    llm_backoff_base_seconds: float = 0.5
+    llm_backoff_max_seconds: float = 8.0
+    llm_circuit_failure_threshold: int = 5
+    llm_circuit_reset_seconds: float = 30.0
+    llm_hedge_requests: bool = False
+    llm_hedge_quantile: float = 0.95
+    llm_hedge_min_samples: int = 20
+    # agent -> ordered provider:model targets; "default" applies to agents without their own route
+    llm_routes: Dict[str, List[str]] = field(default_factory=dict)
+    llm_routing_strategy: str = "ordered"
+    llm_route_min_samples: int = 10
+    llm_failover_attempts: int = 1
+    # provider -> limit; 0 or missing means unlimited (concurrency defaults to llm_max_connections)
+    llm_requests_per_minute: Dict[str, int] = field(default_factory=dict)
+    llm_tokens_per_minute: Dict[str, int] = field(default_factory=dict)
+    llm_max_concurrency: Dict[str, int] = field(default_factory=dict)
+    llm_queue_timeout_seconds: float = 30.0
+    llm_output_token_estimate: int = 300
+    # Record every LLM call to / answer every call from a JSONL transcript (tools/llm_transcript.py)
+    llm_transcript_record: Optional[str] = None
+    llm_transcript_replay: Optional[str] = None
+    llm_transcript_replay_mode: str = "fast"
+    # Offline provider used with MODEL_PREFERENCE=mock:<name>
+    mock_llm_seed: int = 0
+    mock_llm_latency_ms: float = 800.0
+    mock_llm_latency_sigma: float = 0.5
+    mock_llm_tokens_per_second: float = 60.0
+    mock_llm_error_rate: float = 0.0
+    hint_timeout_seconds: float = 5.0
+    rephrase_timeout_seconds: float = 8.0
+    # Opt-in: each answer starts up to two speculative question calls and at least one is thrown away
+    speculative_prefetch: bool = False
+    # One evaluator call also returns the hint and a rephrased question; the hint and rephrase agents only
+    # run for fields it leaves out
+    fused_evaluation: bool = False
+    # Generate a ranked pool of questions per (topic, depth) in batched calls when a session starts
+    question_planning: bool = False
+    question_plan_per_depth: int = 2
+    question_plan_topics_per_call: int = 3
+    # Prebuilt questions per topic/depth/tag (tools/question_bank.py); consulted before generating one
+    question_bank_path: Optional[str] = None
+    # Opt-in (0.6 works well): questions whose content-word Jaccard similarity to an asked one reaches this are
+    # replaced or regenerated, which can cost extra interviewer calls. 0 lists recent questions in the prompt
+    question_dedup_threshold: float = 0.0
+    question_dedup_retries: int = 1
+    # Opt-in, as both change scores: score trivial and garbage answers locally (tools/answer_screen.py) instead
+    # of calling the evaluator; longer answers are condensed to this many tokens first (0 = send them whole)
+    answer_screening: bool = False
+    answer_token_budget: int = 0
+    session_store: str = "memory"
+    session_db_path: str = "data/sessions.db"
+    session_ttl_seconds: float = 6 * 3600.0
+    session_max_in_memory: int = 10000
+    session_evict_interval_seconds: float = 60.0
+    web_workers: int = 1
+    prompt_token_budget: int = 1500
+    prompt_token_budgets: Dict[str, int] = field(default_factory=dict)
+    # Providers only cache prompt prefixes of at least this many tokens (1024 for OpenAI and most Claude models)
+    prompt_cache_min_tokens: int = 1024
+
+    def token_budget(self, agent: str) -> int:
+        return self.prompt_token_budgets.get(agent, self.prompt_token_budget)
+
+    def route(self, agent: str) -> List[str]:
+        # "interviewer.rephrase" falls back to "interviewer", then to "default", then MODEL_PREFERENCE
+        for key in (agent, agent.split(".", 1)[0], "default"):
+            if self.llm_routes.get(key):
+                return self.llm_routes[key]
+        return [self.model_preference]
+
+
+def _parse_budgets(raw: str) -> Dict[str, int]:
+    # "interviewer=1200,hints=400" or "openai=500,anthropic=50"
+    budgets: Dict[str, int] = {}
+    for item in raw.split(","):
+        if "=" in item:
+            agent, value = item.split("=", 1)
+            budgets[agent.strip()] = int(value)
+    return budgets
+
+
+def _split_targets(value: object) -> List[str]:
+    items = value if isinstance(value, list) else str(value).split(",")
+    return [str(t).strip() for t in items if str(t).strip()]
+
+
+def _parse_routes(raw: str, path: Optional[str] = None) -> Dict[str, List[str]]:
+    # File: {"evaluator": ["openai:gpt-4o", "anthropic:claude-3-5-sonnet-20240620"], ...}
+    # Env:  "evaluator=openai:gpt-4o,anthropic:claude-3-5-sonnet-20240620;hints=openai:gpt-4o-mini"
+    # Entries in the env string override the file
+    routes: Dict[str, List[str]] = {}
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            for agent, targets in json.load(f).items():
+                routes[agent.strip()] = _split_targets(targets)
+    for item in raw.split(";"):
+        if "=" in item:
+            agent, targets = item.split("=", 1)
+            routes[agent.strip()] = _split_targets(targets)
+    return routes
 
 
 def load_config() -> AppConfig:
@@ -27,6 +136,58 @@ def load_config() -> AppConfig:
         request_timeout_seconds=int(os.getenv("REQUEST_TIMEOUT_SECONDS", "30")),
         max_retries=int(os.getenv("MAX_RETRIES", "3")),
         log_level=os.getenv("LOG_LEVEL", "INFO"),
+        llm_max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "100")),
+        llm_max_keepalive_connections=int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20")),
+        llm_keepalive_expiry_seconds=float(os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", "30")),
+        llm_cache_enabled=os.getenv("LLM_CACHE_ENABLED", "0").lower() in {"1", "true", "yes"},
+        llm_cache_max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000")),
+        llm_cache_ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600")),
+        llm_cache_db_path=os.getenv("LLM_CACHE_DB_PATH") or None,
+        llm_cache_max_disk_entries=int(os.getenv("LLM_CACHE_MAX_DISK_ENTRIES", "50000")),
+        llm_backoff_base_seconds=float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "0.5")),
+        llm_backoff_max_seconds=float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "8")),
+        llm_circuit_failure_threshold=int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "5")),
+        llm_circuit_reset_seconds=float(os.getenv("LLM_CIRCUIT_RESET_SECONDS", "30")),
+        llm_hedge_requests=os.getenv("LLM_HEDGE_REQUESTS", "0").lower() in {"1", "true", "yes"},
+        llm_hedge_quantile=float(os.getenv("LLM_HEDGE_QUANTILE", "0.95")),
+        llm_hedge_min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20")),
+        llm_routes=_parse_routes(os.getenv("LLM_ROUTES", ""), os.getenv("LLM_ROUTES_FILE") or None),
+        llm_routing_strategy=os.getenv("LLM_ROUTING_STRATEGY", "ordered").lower(),
+        llm_route_min_samples=int(os.getenv("LLM_ROUTE_MIN_SAMPLES", "10")),
+        llm_failover_attempts=int(os.getenv("LLM_FAILOVER_ATTEMPTS", "1")),
+        llm_requests_per_minute=_parse_budgets(os.getenv("LLM_REQUESTS_PER_MINUTE", "")),
+        llm_tokens_per_minute=_parse_budgets(os.getenv("LLM_TOKENS_PER_MINUTE", "")),
+        llm_max_concurrency=_parse_budgets(os.getenv("LLM_MAX_CONCURRENCY", "")),
+        llm_queue_timeout_seconds=float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "30")),
+        llm_output_token_estimate=int(os.getenv("LLM_OUTPUT_TOKEN_ESTIMATE", "300")),
+        llm_transcript_record=os.getenv("LLM_TRANSCRIPT_RECORD") or None,
+        llm_transcript_replay=os.getenv("LLM_TRANSCRIPT_REPLAY") or None,
+        llm_transcript_replay_mode=os.getenv("LLM_TRANSCRIPT_REPLAY_MODE", "fast").lower(),
+        mock_llm_seed=int(os.getenv("MOCK_LLM_SEED", "0")),
+        mock_llm_latency_ms=float(os.getenv("MOCK_LLM_LATENCY_MS", "800")),
+        mock_llm_latency_sigma=float(os.getenv("MOCK_LLM_LATENCY_SIGMA", "0.5")),
+        mock_llm_tokens_per_second=float(os.getenv("MOCK_LLM_TOKENS_PER_SECOND", "60")),
+        mock_llm_error_rate=float(os.getenv("MOCK_LLM_ERROR_RATE", "0")),
+        hint_timeout_seconds=float(os.getenv("HINT_TIMEOUT_SECONDS", "5")),
+        rephrase_timeout_seconds=float(os.getenv("REPHRASE_TIMEOUT_SECONDS", "8")),
+        speculative_prefetch=os.getenv("SPECULATIVE_PREFETCH", "0").lower() in {"1", "true", "yes"},
+        fused_evaluation=os.getenv("FUSED_EVALUATION", "0").lower() in {"1", "true", "yes"},
+        question_planning=os.getenv("QUESTION_PLANNING", "0").lower() in {"1", "true", "yes"},
+        question_plan_per_depth=int(os.getenv("QUESTION_PLAN_PER_DEPTH", "2")),
+        question_plan_topics_per_call=int(os.getenv("QUESTION_PLAN_TOPICS_PER_CALL", "3")),
+        question_bank_path=os.getenv("QUESTION_BANK_PATH") or None,
+        question_dedup_threshold=float(os.getenv("QUESTION_DEDUP_THRESHOLD", "0")),
+        question_dedup_retries=int(os.getenv("QUESTION_DEDUP_RETRIES", "1")),
+        answer_screening=os.getenv("ANSWER_SCREENING", "0").lower() in {"1", "true", "yes"},
+        answer_token_budget=int(os.getenv("ANSWER_TOKEN_BUDGET", "0")),
+        session_store=os.getenv("SESSION_STORE", "memory").lower(),
+        session_db_path=os.getenv("SESSION_DB_PATH", os.path.join("data", "sessions.db")),
+        session_ttl_seconds=float(os.getenv("SESSION_TTL_SECONDS", str(6 * 3600))),
+        session_max_in_memory=int(os.getenv("SESSION_MAX_IN_MEMORY", "10000")),
+        session_evict_interval_seconds=float(os.getenv("SESSION_EVICT_INTERVAL_SECONDS", "60")),
+        web_workers=int(os.getenv("WEB_WORKERS", "1")),
+        prompt_token_budget=int(os.getenv("PROMPT_TOKEN_BUDGET", "1500")),
+        prompt_token_budgets=_parse_budgets(os.getenv("PROMPT_TOKEN_BUDGETS", "")),
+        prompt_cache_min_tokens=int(os.getenv("PROMPT_CACHE_MIN_TOKENS", "1024")),
     )
 
-
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class LogHistogram:
+    # Log-bucketed histogram: bucket i holds values in [min_value * g^i, min_value * g^(i+1)) with g = 1 + 2 * precision,
+    # so quantiles carry at most ~precision relative error and memory is bounded by the bucket count of the range
+    def __init__(self, precision: float = 0.01, min_value: float = 0.001, max_value: float = 3_600_000.0):
+        if precision <= 0 or min_value <= 0 or max_value <= min_value:
+            raise ValueError("invalid histogram parameters")
+        self.precision = precision
+        self.min_value = min_value
+        self.max_value = max_value
+        self._log_gamma = math.log1p(2 * precision)
+        self._max_index = int(math.log(max_value / min_value) / self._log_gamma)
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _index(self, value: float) -> int:
+        if value <= self.min_value:
+            return -1
+        return min(int(math.log(value / self.min_value) / self._log_gamma), self._max_index)
+
+    def _value(self, index: int) -> float:
+        if index < 0:
+            return self.min_value
+        # Geometric midpoint of the bucket
+        return self.min_value * math.exp((index + 0.5) * self._log_gamma)
+
+    def record(self, value: float, count: int = 1) -> None:
+        idx = self._index(value)
+        self.buckets[idx] = self.buckets.get(idx, 0) + count
+        self.count += count
+        self.total += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        q = min(max(q, 0.0), 1.0)
+        rank = q * (self.count - 1)
+        seen = 0
+        for idx in sorted(self.buckets):
+            seen += self.buckets[idx]
+            if seen > rank:
+                value = self._value(idx)
+                # Exact extremes are tracked separately; never report beyond them
+                return min(max(value, self.min), self.max)  # type: ignore[type-var]
+        return float(self.max or 0.0)
+
+    def quantiles(self, qs: Iterable[float]) -> List[float]:
+        return [self.quantile(q) for q in qs]
+
+    def cumulative_counts(self, bounds: Iterable[float]) -> List[int]:
+        # Observations at or below each bound (ascending), as Prometheus histogram buckets need them; a bin
+        # counts toward a bound when its midpoint does, so counts near a bound carry the ~precision error
+        items = sorted(self.buckets.items())
+        counts: List[int] = []
+        seen = 0
+        i = 0
+        for bound in bounds:
+            while i < len(items) and self._value(items[i][0]) <= bound:
+                seen += items[i][1]
+                i += 1
+            counts.append(seen)
+        return counts
+
+    @property
+    def mean(self) -> float:
+        return (self.total / self.count) if self.count else 0.0
+
+    def _compatible(self, other: "LogHistogram") -> bool:
+        return (self.precision, self.min_value, self.max_value) == (other.precision, other.min_value, other.max_value)
+
+    def merge(self, other: "LogHistogram") -> None:
+        if not self._compatible(other):
+            raise ValueError("cannot merge histograms with different bucket layouts")
+        for idx, n in other.buckets.items():
+            self.buckets[idx] = self.buckets.get(idx, 0) + n
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "precision": self.precision,
+            "min_value": self.min_value,
+            "max_value": self.max_value,
+            "buckets": {str(k): v for k, v in self.buckets.items()},
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "LogHistogram":
+        hist = LogHistogram(data["precision"], data["min_value"], data["max_value"])
+        hist.buckets = {int(k): int(v) for k, v in data["buckets"].items()}
+        hist.count = int(data["count"])
+        hist.total = float(data["total"])
+        hist.min = data["min"]
+        hist.max = data["max"]
+        return hist
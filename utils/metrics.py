@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.histogram import LogHistogram
+
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_NAME_RE = re.compile(r"[^a-zA-Z0-9_]")
+# Fixed `le` bounds in seconds, identical in every worker so buckets sum across workers and
+# histogram_quantile() works on the aggregate; each worker keeps finer log bins and only exports these
+HISTOGRAM_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def metric_name(raw: str) -> str:
+    name = _NAME_RE.sub("_", raw).strip("_")
+    return name if not name[:1].isdigit() else f"_{name}"
+
+
+def _labels(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    # Process-global counters, gauges and histograms rendered in the Prometheus text exposition format
+    def __init__(self, namespace: str = "mock_interview"):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._types: Dict[str, str] = {}
+        self._help: Dict[str, str] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, LogHistogram]] = {}
+        self._collectors: List[Callable[["MetricsRegistry"], None]] = []
+
+    def _name(self, name: str, kind: str, help_text: str) -> str:
+        full = metric_name(f"{self.namespace}_{name}" if self.namespace else name)
+        known = self._types.get(full)
+        if known is None:
+            self._types[full] = kind
+            self._help[full] = help_text or name.replace("_", " ")
+        elif known != kind:
+            raise ValueError(f"metric {full} already registered as {known}")
+        return full
+
+    def inc(self, name: str, value: float = 1.0, help: str = "", **labels: object) -> None:
+        with self._lock:
+            full = self._name(name, "counter", help)
+            series = self._counters.setdefault(full, {})
+            key = _labels(labels)
+            series[key] = series.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, help: str = "", **labels: object) -> None:
+        with self._lock:
+            full = self._name(name, "gauge", help)
+            self._gauges.setdefault(full, {})[_labels(labels)] = float(value)
+
+    def observe(self, name: str, value: float, help: str = "", **labels: object) -> None:
+        with self._lock:
+            full = self._name(name, "histogram", help)
+            series = self._histograms.setdefault(full, {})
+            key = _labels(labels)
+            hist = series.get(key)
+            if hist is None:
+                # Values are seconds: 1 us .. 1 h
+                hist = series[key] = LogHistogram(min_value=1e-6, max_value=3600.0)
+            hist.record(value)
+
+    def add_collector(self, collector: Callable[["MetricsRegistry"], None]) -> None:
+        # Collectors refresh gauges (pool sizes, sessions, RSS) right before rendering
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in list(self._collectors):
+            try:
+                collector(self)
+            except Exception:
+                pass
+        lines: List[str] = []
+        with self._lock:
+            for full in sorted(self._types):
+                kind = self._types[full]
+                lines.append(f"# HELP {full} {self._help[full]}")
+                lines.append(f"# TYPE {full} {kind}")
+                if kind == "counter":
+                    for key, value in sorted(self._counters.get(full, {}).items()):
+                        lines.append(f"{full}{_format_labels(key)} {_format_value(value)}")
+                elif kind == "gauge":
+                    for key, value in sorted(self._gauges.get(full, {}).items()):
+                        lines.append(f"{full}{_format_labels(key)} {_format_value(value)}")
+                else:
+                    for key, hist in sorted(self._histograms.get(full, {}).items()):
+                        counts = hist.cumulative_counts(HISTOGRAM_BUCKETS)
+                        for bound, count in zip(HISTOGRAM_BUCKETS, counts):
+                            lines.append(f"{full}_bucket{_format_labels(key, ('le', _format_value(bound)))} {count}")
+                        lines.append(f"{full}_bucket{_format_labels(key, ('le', '+Inf'))} {hist.count}")
+                        lines.append(f"{full}_sum{_format_labels(key)} {hist.total!r}")
+                        lines.append(f"{full}_count{_format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _rss_bytes() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return float(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE"))
+    except Exception:
+        import resource
+        # Not Linux: fall back to the peak RSS (kilobytes on Linux/BSD, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return float(peak if os.uname().sysname == "Darwin" else peak * 1024)
+
+
+def collect_process_metrics(metrics: MetricsRegistry) -> None:
+    metrics.set("process_resident_memory_bytes", _rss_bytes(), help="Resident set size of this worker")
+    metrics.set("process_cpu_seconds", time.process_time(), help="CPU time consumed by this worker")
+    metrics.set("process_threads", threading.active_count(), help="Python threads in this worker")
+
+
+_metrics: Optional[MetricsRegistry] = None
+
+
+def get_metrics() -> MetricsRegistry:
+    global _metrics
+    if _metrics is None:
+        _metrics = MetricsRegistry()
+        _metrics.add_collector(collect_process_metrics)
+    return _metrics
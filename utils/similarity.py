@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from array import array
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple
+import hashlib
+import re
+
+
+# Near-duplicate detection for short texts (interview questions): each text becomes a set of content-word
+# unigrams and bigrams, a MinHash signature estimates Jaccard similarity, and LSH banding over the signature
+# finds candidates without comparing against every indexed text. Candidates are confirmed with the exact
+# Jaccard of their shingle sets, so the threshold is precise and only recall depends on the banding.
+NUM_HASHES = 64
+BANDS = 16
+ROWS = NUM_HASHES // BANDS
+# With 16 bands of 4 rows, pairs at Jaccard 0.6 become candidates ~89% of the time, at 0.7 ~99%
+DEFAULT_THRESHOLD = 0.6
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+# Stopwords and question stems ("how would you") carry no meaning. Kept here rather than shared with the
+# prompt builder, so models can import this module without pulling in tools, metrics or tiktoken.
+_IGNORED = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on", "or",
+    "the", "to", "with", "your", "you", "we", "our", "will", "that", "this", "experience", "years",
+    "how", "what", "why", "when", "which", "would", "could", "can", "do", "did", "does", "me", "through",
+    "walk", "tell", "describe", "explain", "give", "example", "time", "had", "have", "about",
+})
+_EMPTY: Tuple[int, ...] = (0xFFFFFFFF,) * NUM_HASHES
+
+
+@lru_cache(maxsize=4096)
+def shingles(text: str) -> FrozenSet[str]:
+    # Only content words count
+    words = [w for w in _TOKEN_RE.findall(text.lower()) if len(w) > 1 and w not in _IGNORED]
+    return frozenset(words) | frozenset(f"{a} {b}" for a, b in zip(words, words[1:]))
+
+
+@lru_cache(maxsize=4096)
+def signature(text: str) -> Tuple[int, ...]:
+    hashes = [_hashes(s) for s in shingles(text)]
+    if not hashes:
+        return _EMPTY
+    # Position i of the signature is the minimum of every shingle's i-th hash
+    return tuple(map(min, zip(*hashes)))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter)
+
+
+@lru_cache(maxsize=16384)
+def _hashes(shingle: str) -> "array[int]":
+    # NUM_HASHES independent 32-bit hashes from one SHAKE digest; stable across processes, unlike hash()
+    return array("I", hashlib.shake_128(shingle.encode("utf-8")).digest(4 * NUM_HASHES))
+
+
+class SimilarityIndex:
+    # Append-only MinHash/LSH index. add() and match() cost one signature plus BANDS dict lookups, however
+    # many texts are indexed; exact comparisons only run for the few texts that share a band.
+    def __init__(self) -> None:
+        self.texts: List[str] = []
+        self._shingles: List[FrozenSet[str]] = []
+        self._buckets: List[Dict[Tuple[int, ...], List[int]]] = [{} for _ in range(BANDS)]
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def add(self, text: str) -> None:
+        index = len(self.texts)
+        self.texts.append(text)
+        self._shingles.append(shingles(text))
+        for band, key in enumerate(_bands(signature(text))):
+            self._buckets[band].setdefault(key, []).append(index)
+
+    def match(self, text: str, threshold: float = DEFAULT_THRESHOLD) -> Optional[Tuple[str, float]]:
+        # The most similar indexed text with Jaccard >= threshold, and its similarity
+        target = shingles(text)
+        if not target:
+            return None
+        seen = set()
+        best: Optional[Tuple[str, float]] = None
+        for band, key in enumerate(_bands(signature(text))):
+            for i in self._buckets[band].get(key, ()):
+                if i in seen:
+                    continue
+                seen.add(i)
+                score = jaccard(target, self._shingles[i])
+                if score >= threshold and (best is None or score > best[1]):
+                    best = (self.texts[i], score)
+        return best
+
+    def clear(self) -> None:
+        self.texts.clear()
+        self._shingles.clear()
+        for buckets in self._buckets:
+            buckets.clear()
+
+
+def _bands(sig: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+    return [sig[b * ROWS:(b + 1) * ROWS] for b in range(BANDS)]
@@ -4,12 +4,15 @@ import time
 from contextlib import contextmanager
 from typing import Dict
 
+from utils.histogram import LogHistogram
+
 
 class Telemetry:
     def __init__(self) -> None:
         self.counters: Dict[str, int] = {}
         self.timings_ms: Dict[str, float] = {}
-        self._timing_samples_ms: Dict[str, list] = {}
+        self.histograms: Dict[str, LogHistogram] = {}
+        self.gauges: Dict[str, float] = {}
 
     def incr(self, name: str, value: int = 1) -> None:
         self.counters[name] = self.counters.get(name, 0) + value
@@ -17,32 +20,51 @@ class Telemetry:
     def observe_ms(self, name: str, ms: float) -> None:
         self.timings_ms[name] = self.timings_ms.get(name, 0.0) + ms
         self.counters[f"{name}:count"] = self.counters.get(f"{name}:count", 0) + 1
-        self._timing_samples_ms.setdefault(name, []).append(ms)
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = LogHistogram()
+        hist.record(ms)
+
+    def set_gauge(self, name: str, value: float) -> None:
+        self.gauges[name] = value
 
     @contextmanager
     def timer(self, name: str):
-        start = time.time()
+        start = time.perf_counter()
         try:
             yield
         finally:
-            elapsed_ms = (time.time() - start) * 1000.0
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
             self.observe_ms(name, elapsed_ms)
 
+    def merge(self, other: "Telemetry") -> None:
+        for name, value in other.counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+        for name, total in other.timings_ms.items():
+            self.timings_ms[name] = self.timings_ms.get(name, 0.0) + total
+        for name, hist in other.histograms.items():
+            mine = self.histograms.get(name)
+            if mine is None:
+                mine = self.histograms[name] = LogHistogram(hist.precision, hist.min_value, hist.max_value)
+            mine.merge(hist)
+        self.gauges.update(other.gauges)
+
     def summary(self) -> Dict[str, Dict[str, float]]:
         out: Dict[str, Dict[str, float]] = {}
         for name, total in self.timings_ms.items():
             count = self.counters.get(f"{name}:count", 0)
-            samples = self._timing_samples_ms.get(name, [])
+            hist = self.histograms.get(name)
             avg = (total / count) if count else 0.0
-            mn = min(samples) if samples else 0.0
-            mx = max(samples) if samples else 0.0
+            p50, p90, p99, p999 = hist.quantiles((0.5, 0.9, 0.99, 0.999)) if hist else (0.0, 0.0, 0.0, 0.0)
             out[name] = {
                 "count": float(count),
                 "total_ms": float(total),
                 "avg_ms": float(avg),
-                "min_ms": float(mn),
-                "max_ms": float(mx),
+                "min_ms": float(hist.min or 0.0) if hist else 0.0,
+                "max_ms": float(hist.max or 0.0) if hist else 0.0,
+                "p50_ms": float(p50),
+                "p90_ms": float(p90),
+                "p99_ms": float(p99),
+                "p999_ms": float(p999),
             }
         return out
-
-